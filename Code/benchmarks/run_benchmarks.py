@@ -0,0 +1,216 @@
+"""
+run_benchmarks.py
+
+Ce script mesure chaque étape de la chaîne de traitement sur des jeux de voyages synthétiques de plusieurs tailles,
+pour détecter les régressions de performance :
+  - transformation des voyages en base SPMF (transform_to_integer_database + write_spmf_file),
+  - extraction des motifs (PrefixSpan, moteur Python par défaut, éventuellement réparti sur --workers processus,
+    ou jar SPMF avec --engine spmf) : extraction complète, dont la sortie alimente le filtrage, et, avec le moteur
+    Python, extraction contrainte par les critères de filtrage (étape `mining_constrained`),
+  - filtrage (process_results), décodage (replace_ids_with_port_names), parsing (parse_sequence_file),
+  - construction des chaînes de Markov (compute_transition_probabilities* et TransitionModel),
+  - évaluation (evaluate_multiple_sequences et evaluate_batch).
+
+Pour chaque étape et chaque taille, on enregistre le temps (meilleur de --repeat exécutions, après --warmup exécutions
+non mesurées qui absorbent les imports et initialisations paresseuses) et le pic de mémoire Python (tracemalloc,
+mesuré sur une exécution séparée). Ce pic ne concerne que le processus principal : la mémoire des processus de
+travail (--workers) et de la JVM SPMF n'est pas comptée.
+Les résultats peuvent être enregistrés comme référence (--save-baseline) puis comparés à cette référence :
+une étape plus lente, ou dont le pic de mémoire est plus élevé, que la référence au-delà de la tolérance est
+signalée et le script se termine avec le code 1.
+
+Usage (depuis Code/) :
+    python3 benchmarks/run_benchmarks.py --sizes 1000 5000 20000 --save-baseline
+    python3 benchmarks/run_benchmarks.py --sizes 1000 5000 20000
+"""
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from itertools import islice
+
+from models.baseEntier import transform_to_integer_database, write_spmf_file
+from models.generate_synthetic_voyages import PortNetwork, iter_synthetic_voyages
+from processing.runAlgoSPMF import run_prefixspan_algo
+from processing.filter_motifs import process_results
+from processing.decode_patterns import replace_ids_with_port_names
+from prediction.motif_to_json import parse_sequence_file
+from prediction.markov_from_patterns import compute_transition_probabilities
+from prediction.markov_from_sequences import compute_transition_probabilities_from_sequences, read_spmf_sequences, decode_sequences
+from prediction.evaluate import evaluate_multiple_sequences, evaluate_batch
+from prediction.transition_model import TransitionModel
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [1000, 5000, 20000]
+MIN_SUPPORT = 0.02
+ORDER = 2
+MEMORY_NOISE_KIB = 64  # écart de pic de mémoire (Kio) en dessous duquel aucune régression n'est signalée
+PORT_COUNT = 200
+VOYAGES_PER_VESSEL = 8
+REGION_COUNT = 8
+SERVICE_COUNT = 40
+
+def synthetic_voyages(count, seed=0):
+    """Génère `count` voyages synthétiques (voir models/generate_synthetic_voyages.py) et la liste des ports."""
+    network = PortNetwork(PORT_COUNT, REGION_COUNT, SERVICE_COUNT, seed)
+    voyages = list(islice(iter_synthetic_voyages(network, count, VOYAGES_PER_VESSEL, seed), count))
+    return voyages, network.ports
+
+def measure(function, repeat=1, warmup=1):
+    """
+    Mesure une étape : `warmup` exécutions non mesurées, meilleur temps sur `repeat` exécutions,
+    puis pic de mémoire sur une exécution tracée.
+
+    Returns:
+        tuple: (résultat, temps en ms, pic de mémoire en Kio)
+    """
+    for _ in range(warmup):
+        function()
+
+    best_ms = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start_time = time.perf_counter()
+        result = function()
+        best_ms = min(best_ms, (time.perf_counter() - start_time) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best_ms, peak / 1024
+
+def run_pipeline(size, workspace, engine="python", repeat=1, seed=0, workers=1, warmup=1):
+    """
+    Exécute et mesure toutes les étapes pour une taille de données.
+
+    Returns:
+        dict: {étape: {"time_ms": ..., "peak_kib": ...}}
+    """
+    voyages, ports = synthetic_voyages(size, seed)
+    port_to_id = {port: index + 1 for index, port in enumerate(ports)}
+    port_id_to_name = {port_id: port for port, port_id in port_to_id.items()}
+
+    spmf_input = os.path.join(workspace, "spmf_input.txt")
+    spmf_output = os.path.join(workspace, "spmf_output.txt")
+    constrained_output = os.path.join(workspace, "spmf_output_constrained.txt")
+    output_filtre = os.path.join(workspace, "outputfiltre.txt")
+    parsed_json = os.path.join(workspace, "parsed_output.json")
+    results = {}
+
+    def stage(name, function):
+        result, time_ms, peak_kib = measure(function, repeat, warmup)
+        results[name] = {"time_ms": round(time_ms, 3), "peak_kib": round(peak_kib, 1)}
+        return result
+
+    stage("transform_to_integer_database", lambda: write_spmf_file(transform_to_integer_database(voyages, port_to_id), spmf_input))
+    # Extraction complète : le filtrage mesuré ensuite travaille sur la sortie brute, comme dans la chaîne réelle
+    stage("mining", lambda: run_prefixspan_algo(spmf_input, spmf_output, MIN_SUPPORT, engine=engine, workers=workers))
+    if engine == "python":
+        stage("mining_constrained", lambda: run_prefixspan_algo(spmf_input, constrained_output, MIN_SUPPORT, engine=engine, constrained=True, workers=workers))
+    stage("process_results", lambda: process_results(spmf_output, output_filtre))
+
+    with open(output_filtre, 'r') as f:
+        patterns = f.readlines()
+    named_patterns = stage("replace_ids_with_port_names", lambda: replace_ids_with_port_names(patterns, port_id_to_name))
+
+    sequences_file = os.path.join(workspace, "sequences.txt")
+    with open(sequences_file, "w", encoding="utf-8") as f:
+        for pattern in named_patterns:
+            f.write(pattern.strip() + "\n")
+    stage("parse_sequence_file", lambda: parse_sequence_file(sequences_file, parsed_json))
+
+    with open(parsed_json, 'r') as f:
+        motifs = json.load(f)
+    sequences = decode_sequences(read_spmf_sequences(spmf_input), port_id_to_name)
+    split = int(len(sequences) * 0.8)
+    train_sequences, test_sequences = sequences[:split], sequences[split:]
+
+    stage("compute_transition_probabilities", lambda: compute_transition_probabilities(motifs, order=ORDER))
+    transition_probabilities = stage(
+        "compute_transition_probabilities_from_sequences",
+        lambda: compute_transition_probabilities_from_sequences(train_sequences, order=ORDER)
+    )
+    model = stage("TransitionModel.from_sequences", lambda: TransitionModel.from_sequences(train_sequences, order=ORDER))
+
+    stage("evaluate_multiple_sequences", lambda: evaluate_multiple_sequences(test_sequences, transition_probabilities, ORDER))
+    stage("evaluate_batch", lambda: evaluate_batch(test_sequences, model))
+
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    Affiche les résultats et les compare à la référence (temps et pic de mémoire, même tolérance).
+
+    Returns:
+        list[str]: Étapes en régression (« taille/étape »).
+    """
+    regressions = []
+    print("\nPic (Kio) : mémoire Python du processus principal (tracemalloc) ; "
+          "les processus de travail (--workers) et la JVM SPMF ne sont pas comptés.")
+    for size, stages in results.items():
+        print(f"\n=== {size} voyages ===")
+        print(f"{'Étape':<50}{'Temps (ms)':>12}{'Réf. (ms)':>12}{'Ratio':>8}{'Pic (Kio)':>12}{'Réf. (Kio)':>12}{'Ratio':>8}")
+        for name, values in stages.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference:
+                time_ratio = values["time_ms"] / max(reference["time_ms"], 1e-6)
+                memory_ratio = values["peak_kib"] / max(reference["peak_kib"], 1e-6)
+                # Sous MEMORY_NOISE_KIB d'écart, le pic de mémoire n'est pas comparé (petites allocations variables)
+                memory_regression = memory_ratio > 1 + tolerance and values["peak_kib"] - reference["peak_kib"] > MEMORY_NOISE_KIB
+                flags = [label for label, regressed in (("temps", time_ratio > 1 + tolerance), ("mémoire", memory_regression)) if regressed]
+                flag = f"  <-- régression ({', '.join(flags)})" if flags else ""
+                if flags:
+                    regressions.append(f"{size}/{name}")
+                print(f"{name:<50}{values['time_ms']:>12.2f}{reference['time_ms']:>12.2f}{time_ratio:>8.2f}"
+                      f"{values['peak_kib']:>12.1f}{reference['peak_kib']:>12.1f}{memory_ratio:>8.2f}{flag}")
+            else:
+                print(f"{name:<50}{values['time_ms']:>12.2f}{'-':>12}{'-':>8}{values['peak_kib']:>12.1f}{'-':>12}{'-':>8}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de la chaîne de traitement (temps et pic de mémoire).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="nombres de voyages synthétiques")
+    parser.add_argument("--engine", choices=["python", "spmf"], default="python", help="moteur PrefixSpan")
+    parser.add_argument("--workers", type=int, default=1, help="processus d'extraction du moteur Python (0 : un par cœur)")
+    parser.add_argument("--repeat", type=int, default=3, help="nombre d'exécutions chronométrées par étape")
+    parser.add_argument("--warmup", type=int, default=1, help="exécutions non mesurées de chaque étape avant la mesure")
+    parser.add_argument("--seed", type=int, default=0, help="graine des données synthétiques")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="fichier JSON de référence")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistrer les résultats comme nouvelle référence")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="hausse relative tolérée (temps et pic de mémoire) avant de signaler une régression")
+    parser.add_argument("--output", default=None, help="fichier JSON où écrire les résultats")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="benchmarks_") as workspace:
+        for size in args.sizes:
+            print(f"Mesure sur {size} voyages...", flush=True)
+            results[str(size)] = run_pipeline(size, workspace, engine=args.engine, repeat=args.repeat, seed=args.seed, workers=args.workers or None, warmup=args.warmup)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRéférence enregistrée dans {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) : {', '.join(regressions)}")
+        sys.exit(1)
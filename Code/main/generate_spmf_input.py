@@ -6,10 +6,12 @@ from models.baseEntier import *
 from processing.runAlgoSPMF import *
 from processing.decode_patterns import *
 from processing.filter_motifs import *
+from processing.instrumentation import start_run
 
-if __name__ == "__main__":
-    # Charger les données JSON
-    data = load_json("../Data/merged_voyages.json")
+def main():
+    """Écrit la base de séquences de toute la flotte au format SPMF."""
+    # Lire les voyages en flux (sans charger tout le fichier JSON)
+    data = iter_json_records("../Data/merged_voyages.json")
 
     # Mapper les ports à des IDs
     port_to_id = load_json("../Data/port_mapping.json")
@@ -20,8 +22,12 @@ if __name__ == "__main__":
 
     # Fichier pour SPMF
     spmf_input_file = "text_files/spmf_input.txt"
-    
+
     # Sauvegarder la base de données au format SPMF
     print(f"Enregistrement des données au format SPMF dans {spmf_input_file}...")
     write_spmf_file(db, spmf_input_file)
     print(f"Fichier {spmf_input_file} a été rempli avec les séquences.")
+
+if __name__ == "__main__":
+    with start_run("generate_spmf_input"):
+        main()
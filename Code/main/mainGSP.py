@@ -2,16 +2,17 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import time
 from processing.runAlgoSPMF import *
 from models.baseEntier import *
 from Code.processing.decode_patterns import *
 from Code.processing.filter_motifs import *
 from Code.processing.filter_motifs import *
+from processing.instrumentation import start_run, span
 
-if __name__ == "__main__":
-    # Charger les données JSON
-    data = load_json("../Data/merged_voyages.json")
+def main():
+    """Extrait, filtre et affiche les motifs fréquents de toute la flotte avec GSP (SPMF)."""
+    # Lire les voyages en flux (sans charger tout le fichier JSON)
+    data = iter_json_records("../Data/merged_voyages.json")
 
     # Mapper les ports à des IDs
     port_to_id = load_json("../Data/port_mapping.json")
@@ -32,9 +33,8 @@ if __name__ == "__main__":
     write_spmf_file(db, spmf_input_file)
 
     # Exécuter GSP via SPMF
-    start_time = time.time()
-    run_spmf("GSP", spmf_input_file, spmf_output_file, f"{min_support * 100}%")
-    end_time = time.time()
+    with span("mining", algorithm="GSP", min_support=min_support) as mining:
+        run_spmf("GSP", spmf_input_file, spmf_output_file, f"{min_support * 100}%")
 
     process_results(spmf_output_file,outputfiltre)
 
@@ -51,6 +51,10 @@ if __name__ == "__main__":
         print(pattern.strip())
 
     # Calcul du temps en millisecondes
-    spmf_time_ms = (end_time - start_time) * 1000
+    spmf_time_ms = mining.duration_ms
     print(f"\nTemps d'exécution GSP (via SPMF): {spmf_time_ms:.2f} ms")
     print("Nombre de motifs :", len(updated_patterns))
+
+if __name__ == "__main__":
+    with start_run("mainGSP"):
+        main()
@@ -0,0 +1,51 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.baseEntier import *
+from processing.decode_patterns import *
+from processing.filter_motifs import *
+from processing.prefixspan import format_pattern
+from processing.pattern_reduction import reduce_patterns
+from processing.instrumentation import start_run, span
+
+def main(mode="closed"):
+    """Réduit les motifs filtrés à leurs motifs fermés (ou maximaux) et les affiche."""
+    # Mapper les IDs des ports à leurs noms
+    port_to_id = load_json("../Data/port_mapping.json")
+    port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
+
+    # Fichiers d'entrée (motifs filtrés) et de sortie (motifs réduits)
+    outputfiltre = "text_files/outputfiltre.txt"
+    outputreduit = "text_files/outputreduit.txt"
+
+    # Charger les motifs filtrés
+    with open(outputfiltre, 'r') as f:
+        patterns = list(iter_patterns(f))
+
+    # Réduire les motifs avec l'index de contenance
+    with span("reduction", mode=mode) as reduction:
+        reduced = reduce_patterns(patterns, mode)
+        reduction.records = len(reduced)
+
+    with open(outputreduit, 'w') as f:
+        for ports, support in reduced:
+            f.write(format_pattern(ports, support) + "\n")
+
+    # Remplacer les IDs des ports par leurs noms
+    updated_patterns = replace_ids_with_port_names([format_pattern(ports, support) for ports, support in reduced], port_id_to_name)
+
+    # Afficher les motifs réduits avec noms des ports
+    label = "maximaux" if mode == "maximal" else "fermés"
+    print(f"\nMotifs {label} :")
+    for pattern in updated_patterns:
+        print(pattern.strip())
+
+    print(f"\nTemps de réduction : {reduction.duration_ms:.2f} ms")
+    print(f"Nombre de motifs : {len(patterns)} -> {len(reduced)}")
+
+# Réduction des motifs filtrés (sortie de mainPREFIXSPAN.py) à leurs motifs fermés, ou maximaux avec --maximal
+if __name__ == "__main__":
+    mode = "maximal" if "--maximal" in sys.argv else "closed"
+    with start_run("mainREDUCTION"):
+        main(mode)
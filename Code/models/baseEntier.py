@@ -1,20 +1,72 @@
 """
 Script de transformation des données de trajets maritimes en format SPMF pour analyse de séquences.
-- Lit des données JSON contenant les ports de départ et d'arrivée.
+- Lit des données JSON contenant les ports de départ et d'arrivée (en flux, voyage par voyage).
 - Transforme ces trajets en une base de séquences SPMF en format entier.
 - Gère les doublons et trie les événements par date pour chaque navire.
 - Offre des fonctions utilitaires pour afficher ou sauvegarder la base.
 """
 
 import json
-from collections import defaultdict
-from models.data_structures import Sequence, Itemset, Item
+import numpy as np
+from array import array
+from models.data_structures import SequenceDatabase
+from processing.instrumentation import instrumented
 
 def load_json(file_path):
     """Charge un fichier JSON depuis le chemin donné."""
     with open(file_path, 'r') as file:
         return json.load(file)
 
+def iter_json_records(file_path, chunk_size=1 << 16):
+    """
+    Lit un fichier de voyages enregistrement par enregistrement, sans le charger en entier.
+    Accepte un tableau JSON (`[{...}, {...}]`) ou du JSON Lines (un objet par ligne).
+
+    Args:
+        file_path (str): Chemin du fichier JSON ou JSON Lines.
+        chunk_size (int): Nombre de caractères lus à chaque fois.
+
+    Yields:
+        dict: Un voyage à la fois.
+    """
+    decoder = json.JSONDecoder()
+    separators = " \t\r\n,[]"
+
+    with open(file_path, 'r', encoding='utf-8') as file:
+        buffer = file.read(chunk_size)
+        position = 0
+
+        while True:
+            # Sauter les séparateurs entre deux enregistrements (et les crochets du tableau)
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position == len(buffer):
+                buffer = file.read(chunk_size)
+                position = 0
+                if not buffer:
+                    return
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Enregistrement incomplet : lire la suite du fichier
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield record
+            position = end
+
+            # Libérer la partie déjà lue du tampon
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+
+@instrumented(records=len)
 def transform_to_integer_database(data, port_to_id):
     """
     Transforme des données de trajets maritimes en une base de données de séquences SPMF.
@@ -23,14 +75,17 @@ def transform_to_integer_database(data, port_to_id):
     - Trie les événements par date pour chaque navire.
     
     Args:
-        data (list): Liste de trajets (dictionnaires JSON).
+        data (iterable): Trajets (dictionnaires JSON), liste ou générateur (voir iter_json_records).
         port_to_id (dict): Mapping des noms de ports vers des IDs entiers.
 
     Returns:
-        list[Sequence]: Base de données SPMF prête pour l'algorithme.
+        SequenceDatabase: Base de données SPMF (format compressé) prête pour l'algorithme.
     """
-    database = []
-    navire_sequences = defaultdict(list)
+    # Une entrée par escale : navire (code entier), date d'arrivée du trajet, ID du port
+    navire_codes = {}
+    escale_navires = array('i')
+    escale_dates = []
+    escale_ports = array('i')
     seen_trips = set()
     last_item = None
 
@@ -50,39 +105,41 @@ def transform_to_integer_database(data, port_to_id):
         if current_trip in seen_trips:
             continue
 
+        # Le code d'un navire est attribué à sa première escale gardée (ordre de première apparition),
+        # pour qu'un navire sans escale ne produise pas de séquence vide
         if departure_port and last_item != departure_port:
-            navire_sequences[navire_id].append((
-                arrival_date,
-                Itemset([Item(port_to_id[departure_port])])
-            ))
+            escale_navires.append(navire_codes.setdefault(navire_id, len(navire_codes)))
+            escale_dates.append(arrival_date)
+            escale_ports.append(port_to_id[departure_port])
             last_item = departure_port
 
         if arrival_port and last_item != arrival_port:
-            navire_sequences[navire_id].append((
-                arrival_date,
-                Itemset([Item(port_to_id[arrival_port])])
-            ))
+            escale_navires.append(navire_codes.setdefault(navire_id, len(navire_codes)))
+            escale_dates.append(arrival_date)
+            escale_ports.append(port_to_id[arrival_port])
             last_item = arrival_port
 
         seen_trips.add(current_trip)
 
-    for itemsets in navire_sequences.values():
-        itemsets.sort(key=lambda x: x[0])  # Trier par date
-        database.append(Sequence([itemset[1] for itemset in itemsets]))
+    # Regrouper par navire (ordre de première apparition) et trier par date (tri stable)
+    navires = np.frombuffer(escale_navires, dtype=np.int32)
+    order = np.lexsort((np.array(escale_dates, dtype=str), navires))
+    lengths = np.bincount(navires, minlength=len(navire_codes))
 
-    return database
+    return SequenceDatabase.from_item_sequences(np.frombuffer(escale_ports, dtype=np.int32)[order], lengths)
 
+@instrumented()
 def write_spmf_file(database, file_name):
     """
     Sauvegarde la base de données SPMF dans un fichier texte.
 
     Args:
-        database (list[Sequence]): Base de données à écrire.
+        database (SequenceDatabase): Base de données à écrire.
         file_name (str): Nom du fichier de sortie.
     """
     with open(file_name, 'w') as file:
-        for sequence in database:
-            file.write(str(sequence) + "\n")
+        for line in database.to_spmf_lines():
+            file.write(line + "\n")
 
 def print_database(database):
     """
@@ -96,7 +153,7 @@ def print_database_with_names(database, port_to_id):
     Affiche les séquences en remplaçant les IDs par les noms de ports.
 
     Args:
-        database (list[Sequence]): Base de données SPMF.
+        database (SequenceDatabase): Base de données SPMF.
         port_to_id (dict): Mapping des noms de ports vers IDs.
     """
     id_to_port = {v: k for k, v in port_to_id.items()}
@@ -105,7 +162,7 @@ def print_database_with_names(database, port_to_id):
     for i, sequence in enumerate(database, start=1):
         port_sequence = []
         for itemset in sequence.itemsets:
-            port_names = [id_to_port[item.value] for item in itemset.items]
+            port_names = [id_to_port[item] for item in itemset]
             port_sequence.append(f"{{{' '.join(port_names)}}}")
         print(f"Sequence {i}: {' -1 '.join(port_sequence)} -2\n")
     print("===================================================")
@@ -1,37 +1,105 @@
-class Item:
-    """Représente un item unique."""
-    def __init__(self, value):
-        self.value = value
+import numpy as np
 
-    def __eq__(self, other):
-        return isinstance(other, Item) and self.value == other.value
+class Sequence:
+    """Vue sur une séquence d'une SequenceDatabase (aucune copie des items)."""
+    def __init__(self, database, index):
+        self.database = database
+        self.index = index
 
-    def __lt__(self, other):
-        return isinstance(other, Item) and self.value < other.value
+    @property
+    def itemsets(self):
+        """Liste des itemsets de la séquence (chacun est une liste d'IDs triés)."""
+        db = self.database
+        first, last = db.sequence_offsets[self.index], db.sequence_offsets[self.index + 1]
+        bounds = db.itemset_offsets[first:last + 1].tolist()
+        items = db.items[bounds[0]:bounds[-1]].tolist()
+        base = bounds[0]
+        return [items[start - base:end - base] for start, end in zip(bounds[:-1], bounds[1:])]
 
-    def __hash__(self):
-        return hash(self.value)
+    def __str__(self):
+        return " -1 ".join(' '.join(map(str, itemset)) for itemset in self.itemsets) + " -2"
 
-    def __repr__(self):
-        return str(self.value)
+class SequenceDatabase:
+    """
+    Base de séquences stockée en format compressé (type CSR) :
+    - items : tous les IDs à la suite (int32),
+    - itemset_offsets : début de chaque itemset dans `items` (+ la fin du dernier),
+    - sequence_offsets : début de chaque séquence dans la liste des itemsets (+ la fin de la dernière).
+    Chaque itemset est trié et sans doublon, comme pour la sortie SPMF.
+    """
+    def __init__(self, items, itemset_offsets, sequence_offsets):
+        self.items = np.asarray(items, dtype=np.int32)
+        self.itemset_offsets = np.asarray(itemset_offsets, dtype=np.int64)
+        self.sequence_offsets = np.asarray(sequence_offsets, dtype=np.int64)
 
-class Itemset:
-    """Représente un ensemble d'items."""
-    def __init__(self, items):
-        self.items = set(items)
+    @classmethod
+    def from_item_sequences(cls, items, lengths):
+        """
+        Construit une base où chaque itemset contient un seul item (cas des séquences de ports).
 
-    def __eq__(self, other):
-        return isinstance(other, Itemset) and self.items == other.items
+        Args:
+            items (array-like): Tous les IDs à la suite.
+            lengths (array-like): Nombre d'items de chaque séquence.
+        """
+        items = np.asarray(items, dtype=np.int32)
+        sequence_offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        return cls(items, np.arange(len(items) + 1), sequence_offsets)
 
-    def __hash__(self):
-        return hash(tuple(sorted(self.items)))
+    @classmethod
+    def from_sequences(cls, sequences):
+        """
+        Construit une base à partir de séquences d'itemsets.
 
-    def __repr__(self):
-        return ' '.join(map(str, sorted(self.items)))
+        Args:
+            sequences (list[list[iterable]]): Séquences, chacune étant une liste d'itemsets d'IDs.
+        """
+        items, itemset_offsets, sequence_offsets = [], [0], [0]
+        for sequence in sequences:
+            for itemset in sequence:
+                items.extend(sorted(set(itemset)))
+                itemset_offsets.append(len(items))
+            sequence_offsets.append(len(itemset_offsets) - 1)
+        return cls(items, itemset_offsets, sequence_offsets)
 
-class Sequence:
-    def __init__(self, itemsets):
-        self.itemsets = itemsets
+    def __len__(self):
+        return len(self.sequence_offsets) - 1
 
-    def __str__(self):
-        return " -1 ".join(str(itemset) for itemset in self.itemsets) + " -2"
\ No newline at end of file
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("Indice de séquence hors limites.")
+        return Sequence(self, index % len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Sequence(self, index)
+
+    def spmf_tokens(self):
+        """
+        Construit d'un seul coup le tableau des tokens SPMF de toute la base
+        (IDs suivis de -1 à la fin de chaque itemset, -2 à la fin de chaque séquence).
+
+        Returns:
+            tuple: (tokens, fins de séquences dans `tokens`)
+        """
+        itemset_count = len(self.itemset_offsets) - 1
+        itemset_sizes = np.diff(self.itemset_offsets)
+
+        # Chaque itemset k décale ses items de k positions (les séparateurs qui le précèdent)
+        tokens = np.empty(len(self.items) + itemset_count, dtype=np.int64)
+        item_positions = np.arange(len(self.items)) + np.repeat(np.arange(itemset_count), itemset_sizes)
+        tokens[item_positions] = self.items
+
+        separator_positions = self.itemset_offsets[1:] + np.arange(itemset_count)
+        tokens[separator_positions] = -1
+        last_itemsets = self.sequence_offsets[1:][np.diff(self.sequence_offsets) > 0] - 1
+        tokens[separator_positions[last_itemsets]] = -2
+
+        sequence_ends = self.itemset_offsets[self.sequence_offsets[1:]] + self.sequence_offsets[1:]
+        return tokens, sequence_ends
+
+    def to_spmf_lines(self):
+        """Retourne les lignes SPMF de toutes les séquences (équivalent à str(sequence) pour chacune)."""
+        tokens, sequence_ends = self.spmf_tokens()
+        words = tokens.astype(str).tolist()
+        starts = np.concatenate(([0], sequence_ends[:-1])).tolist()
+        return [' '.join(words[start:end]) for start, end in zip(starts, sequence_ends.tolist())]
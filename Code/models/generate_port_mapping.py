@@ -15,14 +15,14 @@ import json
 
 # Ajouter le dossier parent au path pour les imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from models.baseEntier import load_json
+from models.baseEntier import iter_json_records
 
 def map_ports_to_integers(data):
     """
     Génère un mapping {nom_du_port: identifiant_entier}.
 
     Args:
-        data (list): Liste des voyages (dictionnaires contenant departure_port et arrival_port).
+        data (iterable): Voyages (dictionnaires contenant departure_port et arrival_port), liste ou générateur.
 
     Returns:
         dict: Mapping des noms de ports vers des entiers.
@@ -57,7 +57,7 @@ def save_json(data, file_path):
 
 # === Point d'entrée principal ===
 if __name__ == "__main__":
-    raw_data = load_json("../Data/merged_voyages.json")
+    raw_data = iter_json_records("../Data/merged_voyages.json")
     port_to_id = map_ports_to_integers(raw_data)
     save_json(port_to_id, "port_mapping.json")
     print("✅ Mapping sauvegardé dans 'port_mapping.json'")
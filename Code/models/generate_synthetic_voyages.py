@@ -0,0 +1,251 @@
+"""
+generate_synthetic_voyages.py
+
+Ce script génère une flotte synthétique et ses voyages au format de `merged_voyages.json`
+(id, imo, mmsi, departure_port, arrival_port, departure_date, arrival_date), pour tester la chaîne
+de traitement à 10× ou 100× la taille de la flotte réelle.
+- Réseau de ports configurable : ports répartis en régions, chacun avec une durée d'escale moyenne.
+- Lignes régulières (boucles) construites sur une à trois régions voisines, parcourues dans l'ordre géographique.
+- Chaque navire suit une ligne à sa vitesse propre, avec des escales imprévues dans la région et
+  des changements de ligne occasionnels ; durées de traversée tirées de la distance entre ports.
+- Déterministe : même graine, mêmes voyages (chaque navire a son propre générateur aléatoire,
+  initialisé à partir de la graine et de son numéro).
+- Les voyages sont écrits au fil de l'eau (tableau JSON ou JSON Lines) : rien n'est gardé en mémoire
+  à part le réseau de ports.
+
+Usage :
+    python3 models/generate_synthetic_voyages.py --vessels 50000 --output ../Data/synthetic_voyages.json \
+        --mapping ../Data/synthetic_port_mapping.json
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class PortNetwork:
+    """
+    Réseau de ports synthétique.
+
+    Attributs principaux :
+        ports (list[str]): Codes des ports (style UN/LOCODE, ex. "AB123").
+        positions (list[tuple]): Coordonnées de chaque port (milles nautiques, plan).
+        regions (list[list[int]]): Indices des ports de chaque région.
+        port_region (list[int]): Région de chaque port.
+        dwell_hours (list[float]): Durée d'escale moyenne de chaque port (heures).
+        services (list[list[int]]): Lignes régulières (boucles d'indices de ports).
+    """
+
+    def __init__(self, port_count=500, region_count=12, service_count=80, seed=0):
+        """
+        Args:
+            port_count (int): Nombre de ports.
+            region_count (int): Nombre de régions (groupes de ports proches).
+            service_count (int): Nombre de lignes régulières.
+            seed (int): Graine du réseau.
+        """
+        rng = random.Random(seed)
+        region_count = max(1, min(region_count, port_count))
+
+        # Centres des régions sur un plan de 10 000 × 5 000 milles, ports dispersés autour
+        centers = [(rng.uniform(0, 10000), rng.uniform(0, 5000)) for _ in range(region_count)]
+        self.ports = []
+        self.positions = []
+        self.port_region = []
+        self.regions = [[] for _ in range(region_count)]
+        self.dwell_hours = []
+        codes = set()
+
+        for index in range(port_count):
+            region = index % region_count
+            center_x, center_y = centers[region]
+            self.positions.append((rng.gauss(center_x, 300), rng.gauss(center_y, 300)))
+            self.port_region.append(region)
+            self.regions[region].append(index)
+            self.dwell_hours.append(rng.uniform(8, 72))
+
+            # Code unique : deux lettres de « pays » (une par région) puis trois caractères
+            while True:
+                code = LETTERS[region % 26] + LETTERS[(region // 26 + 7) % 26] + "".join(rng.choice(LETTERS + "23456789") for _ in range(3))
+                if code not in codes:
+                    codes.add(code)
+                    break
+            self.ports.append(code)
+
+        # Régions voisines de chaque région (par distance entre centres)
+        neighbours = [
+            sorted(range(region_count), key=lambda other: math.dist(centers[region], centers[other]))
+            for region in range(region_count)
+        ]
+
+        self.services = []
+        for _ in range(service_count):
+            home = rng.randrange(region_count)
+            served_regions = neighbours[home][:rng.randint(1, min(3, region_count))]
+            candidates = [port for region in served_regions for port in self.regions[region]]
+            calls = rng.sample(candidates, min(len(candidates), rng.randint(3, 9)))
+            self.services.append(self._route(calls))
+
+    def _route(self, calls):
+        """Ordonne les escales d'une ligne par plus proche voisin (tournée géographique plausible)."""
+        route = [calls[0]]
+        remaining = set(calls[1:])
+        while remaining:
+            last = self.positions[route[-1]]
+            nearest = min(remaining, key=lambda port: (math.dist(last, self.positions[port]), port))
+            route.append(nearest)
+            remaining.remove(nearest)
+        return route
+
+    def sailing_hours(self, origin, destination, speed_knots):
+        """Durée de traversée entre deux ports (distance en ligne droite allongée de 20 %)."""
+        return max(2.0, math.dist(self.positions[origin], self.positions[destination]) * 1.2 / speed_knots)
+
+    def port_mapping(self):
+        """Retourne un mapping {nom_du_port: identifiant_entier} au format de `port_mapping.json`."""
+        port_to_id = {"FICTIF": 1}
+        for port in self.ports:
+            port_to_id[port] = len(port_to_id) + 1
+        return port_to_id
+
+def iter_vessel_voyages(network, vessel, voyage_count, seed=0, start=datetime(2023, 1, 1),
+                        deviation_rate=0.08, switch_rate=0.01):
+    """
+    Génère les voyages d'un navire, dans l'ordre chronologique.
+
+    Args:
+        network (PortNetwork): Réseau de ports.
+        vessel (int): Numéro du navire (sert à son IMO, son MMSI et sa graine).
+        voyage_count (int): Nombre de voyages du navire.
+        seed (int): Graine globale.
+        start (datetime): Début de la période simulée.
+        deviation_rate (float): Probabilité d'une escale imprévue dans la région du port courant.
+        switch_rate (float): Probabilité de changer de ligne à chaque voyage.
+
+    Yields:
+        dict: Voyage (sans champ "id", attribué par iter_synthetic_voyages).
+    """
+    rng = random.Random(seed * 1_000_003 + vessel)
+    service = network.services[rng.randrange(len(network.services))]
+    step = rng.randrange(len(service))
+    port = service[step]
+    speed = rng.uniform(12, 22)
+    date = start + timedelta(hours=rng.uniform(0, 24 * 90))
+
+    for _ in range(voyage_count):
+        if rng.random() < switch_rate:
+            # Nouvelle ligne : le navire rejoint son escale la plus proche
+            service = network.services[rng.randrange(len(network.services))]
+            step = min(range(len(service)), key=lambda i: math.dist(network.positions[port], network.positions[service[i]]))
+            next_port = service[step]
+        elif rng.random() < deviation_rate:
+            next_port = rng.choice(network.regions[network.port_region[port]])
+        else:
+            step = (step + 1) % len(service)
+            next_port = service[step]
+
+        if next_port == port:
+            # Pas de voyage vers le même port : on passe à l'escale suivante de la ligne
+            step = (step + 1) % len(service)
+            next_port = service[step]
+            if next_port == port:
+                continue
+
+        arrival = date + timedelta(hours=network.sailing_hours(port, next_port, speed) * rng.uniform(0.9, 1.3))
+        yield {
+            "imo": 9000000 + vessel,
+            "mmsi": 200000000 + vessel,
+            "departure_port": network.ports[port],
+            "arrival_port": network.ports[next_port],
+            "departure_date": date.strftime(DATE_FORMAT),
+            "arrival_date": arrival.strftime(DATE_FORMAT),
+        }
+
+        # Escale : durée tirée autour de la moyenne du port
+        date = arrival + timedelta(hours=rng.gammavariate(4, network.dwell_hours[next_port] / 4))
+        port = next_port
+
+def iter_synthetic_voyages(network, vessel_count, voyages_per_vessel=40, seed=0, **kwargs):
+    """
+    Génère les voyages de toute la flotte, navire par navire (au format de `merged_voyages.json`).
+
+    Args:
+        network (PortNetwork): Réseau de ports.
+        vessel_count (int): Nombre de navires.
+        voyages_per_vessel (int): Nombre moyen de voyages par navire (±50 %).
+        seed (int): Graine globale.
+        **kwargs: Paramètres transmis à iter_vessel_voyages (start, deviation_rate, switch_rate).
+
+    Yields:
+        dict: Un voyage à la fois.
+    """
+    fleet_rng = random.Random(seed)
+    voyage_id = 0
+    for vessel in range(vessel_count):
+        count = fleet_rng.randint(max(1, voyages_per_vessel // 2), max(1, voyages_per_vessel * 3 // 2))
+        for voyage in iter_vessel_voyages(network, vessel, count, seed, **kwargs):
+            voyage_id += 1
+            yield {"id": voyage_id, **voyage}
+
+def write_voyages(voyages, file_path, json_lines=False):
+    """
+    Écrit les voyages au fil de l'eau, en tableau JSON (comme `merged_voyages.json`) ou en JSON Lines.
+    Les deux formats sont relus par iter_json_records.
+
+    Returns:
+        int: Nombre de voyages écrits.
+    """
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        if not json_lines:
+            f.write("[\n")
+        for voyage in voyages:
+            if count and not json_lines:
+                f.write(",\n")
+            f.write(json.dumps(voyage))
+            if json_lines:
+                f.write("\n")
+            count += 1
+        if not json_lines:
+            f.write("\n]\n")
+    return count
+
+# === Point d'entrée principal ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération d'une flotte et de voyages synthétiques.")
+    parser.add_argument("--vessels", type=int, default=10000, help="nombre de navires")
+    parser.add_argument("--voyages-per-vessel", type=int, default=40, help="nombre moyen de voyages par navire")
+    parser.add_argument("--ports", type=int, default=500, help="nombre de ports")
+    parser.add_argument("--regions", type=int, default=12, help="nombre de régions")
+    parser.add_argument("--services", type=int, default=80, help="nombre de lignes régulières")
+    parser.add_argument("--deviation-rate", type=float, default=0.08, help="probabilité d'une escale imprévue")
+    parser.add_argument("--switch-rate", type=float, default=0.01, help="probabilité de changer de ligne")
+    parser.add_argument("--seed", type=int, default=0, help="graine")
+    parser.add_argument("--start", default="2023-01-01", help="début de la période simulée (AAAA-MM-JJ)")
+    parser.add_argument("--jsonl", action="store_true", help="écrire en JSON Lines au lieu d'un tableau JSON")
+    parser.add_argument("--output", default="../Data/synthetic_voyages.json", help="fichier des voyages")
+    parser.add_argument("--mapping", default=None, help="fichier où écrire le mapping des ports (format port_mapping.json)")
+    args = parser.parse_args()
+
+    network = PortNetwork(args.ports, args.regions, args.services, args.seed)
+    voyages = iter_synthetic_voyages(
+        network, args.vessels, args.voyages_per_vessel, args.seed,
+        start=datetime.strptime(args.start, "%Y-%m-%d"),
+        deviation_rate=args.deviation_rate, switch_rate=args.switch_rate
+    )
+    count = write_voyages(voyages, args.output, json_lines=args.jsonl)
+    print(f"✅ {count} voyages de {args.vessels} navires écrits dans '{args.output}'")
+
+    if args.mapping:
+        with open(args.mapping, "w") as f:
+            json.dump(network.port_mapping(), f, indent=2)
+        print(f"✅ Mapping des {len(network.ports)} ports sauvegardé dans '{args.mapping}'")
@@ -14,8 +14,10 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import numpy as np
 from datetime import datetime
-from models.baseEntier import load_json
+from models.baseEntier import load_json, iter_json_records
+from models.voyage_store import VoyageStore, MISSING_PORT, store_exists
 
 # Ajout du dossier parent au chemin d'import
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -65,9 +67,37 @@ def find_optimal_duration(travel_data):
         return 50
     return best_cutoff
 
+def load_travel_chip_from_store(store, identifiant, mmsi=False):
+    """
+    Charge les trajets d'un navire depuis la base colonnaire (voir models/voyage_store.py).
+    Même résultat que la lecture du JSON, sans parcourir tous les voyages.
+
+    Args:
+        store (VoyageStore): Base colonnaire ouverte.
+        identifiant (int): Identifiant IMO ou MMSI.
+        mmsi (bool): Si True, utilise MMSI au lieu d'IMO.
+
+    Returns:
+        list[tuple]: Liste de (departure_port, arrival_port, duration)
+    """
+    rows = store.rows_for_vessel(identifiant, mmsi)
+    departure_codes = np.asarray(store.departure_port[rows])
+    arrival_codes = np.asarray(store.arrival_port[rows])
+
+    # Les ports manquants (FICTIF) prennent la date de référence, comme dans load_travel_chip
+    reference_date = np.datetime64("2022-01-01T00:00:00")
+    departure_dates = np.where(departure_codes == MISSING_PORT, reference_date, store.departure_date[rows])
+    arrival_dates = np.where(arrival_codes == MISSING_PORT, reference_date, store.arrival_date[rows])
+    durations = (arrival_dates - departure_dates) / np.timedelta64(1, "D")  # en jours
+
+    departure_ports = [port or "FICTIF" for port in store.port_names(departure_codes)]
+    arrival_ports = [port or "FICTIF" for port in store.port_names(arrival_codes)]
+    return list(zip(departure_ports, arrival_ports, durations.tolist()))
+
 def load_travel_chip(identifiant, mmsi=False):
     """
     Charge les trajets d'un navire identifié par IMO ou MMSI.
+    Utilise la base colonnaire si elle a été construite, sinon lit le JSON en flux.
 
     Args:
         identifiant (int): Identifiant IMO ou MMSI.
@@ -76,7 +106,11 @@ def load_travel_chip(identifiant, mmsi=False):
     Returns:
         list[tuple]: Liste de (departure_port, arrival_port, duration)
     """
-    data = load_json("../Data/merged_voyages.json")
+    if store_exists():
+        return load_travel_chip_from_store(VoyageStore(), identifiant, mmsi)
+
+    # Lecture en flux : seuls les voyages du navire sont gardés en mémoire
+    data = iter_json_records("../Data/merged_voyages.json")
     key = "mmsi" if mmsi else "imo"
     voyages = [v for v in data if v.get(key) == identifiant]
     voyages.sort(key=lambda v: parse_date(v["arrival_date"]))
@@ -1,39 +1,211 @@
-import time
 from models.baseEntier import *
 from processing.runAlgoSPMF import *
 from processing.decode_patterns import *
 from processing.filter_motifs import *
+from processing.prefixspan import mine_prefixspan, format_pattern
+from processing.pattern_cache import PatternCache, cache_key
+from processing.pattern_reduction import reduce_patterns
+from processing.instrumentation import span, instrumented
+
+"""
+Description du script :
+Chaîne de traitement des motifs PrefixSpan entièrement en mémoire : extraction -> parsing -> filtrage -> décodage.
+La sortie SPMF est parcourue une seule fois en flux (générateurs), sans fichiers intermédiaires relus ;
+les fichiers (motifs filtrés, motifs décodés) ne sont écrits que s'ils sont explicitement demandés.
+Un cache disque (PatternCache) peut être fourni pour ne pas relancer une extraction déjà faite.
+Les motifs filtrés peuvent être réduits à leurs motifs fermés ou maximaux avant le décodage (voir pattern_reduction.py).
+Chaque étape (cache, extraction, filtrage, décodage) est mesurée dans le rapport d'exécution (voir instrumentation.py).
+"""
+
+def _mine(min_support, spmf_input_file, spmf_output_file, engine, workers=1):
+    """
+    Lance PrefixSpan et retourne les motifs bruts (ports, support) à parcourir.
+    Avec le moteur Python et sans fichier de sortie demandé, les motifs restent en mémoire ;
+    sinon la sortie SPMF est lue en flux.
+
+    Returns:
+        tuple: (motifs bruts (itérable), fichier ouvert à fermer ou None, temps d'extraction en ms)
+    """
+    with span("mining", engine=engine, min_support=min_support, workers=workers) as mining:
+        if engine == "python" and spmf_output_file is None:
+            patterns, handle = mine_prefixspan(spmf_input_file, min_support, constrained=True, workers=workers), None
+            mining.records = len(patterns)
+        else:
+            if spmf_output_file is None:
+                raise ValueError("Le moteur SPMF a besoin d'un fichier de sortie (spmf_output_file).")
+            run_prefixspan_algo(spmf_input_file, spmf_output_file, min_support, engine=engine, constrained=True, workers=workers)
+            handle = open(spmf_output_file, 'r')
+            patterns = iter_patterns(handle)
+    return patterns, handle, mining.duration_ms
+
+@instrumented()
+def extract_patterns(
+    port_id_to_name=None,
+    min_support=0.02,
+    spmf_input_file="text_files/sequence_train.txt",
+    spmf_output_file="text_files/spmf_output.txt",
+    outputfiltre=None,
+    engine="spmf",
+    sequences_file=None,
+    cache=None,
+    reduction=None,
+    workers=1
+):
+    """
+    Extrait, filtre et (si un mapping est fourni) décode les motifs fréquents en un seul passage.
+
+    Args:
+        port_id_to_name (dict, optional): Mapping ID -> nom de port. Si absent, les motifs gardent les IDs entiers.
+        min_support (float): Support minimum relatif.
+        spmf_input_file (str): Base de séquences au format SPMF.
+        spmf_output_file (str | None): Sortie brute de PrefixSpan (obligatoire pour le moteur "spmf",
+            None avec le moteur "python" pour rester entièrement en mémoire). Non écrite si le cache répond.
+        outputfiltre (str, optional): Si fourni, écrit les motifs filtrés (format SPMF).
+        engine (str): "spmf" (Java) ou "python" (implémentation interne).
+        sequences_file (str, optional): Si fourni, écrit les motifs décodés (`{A} -> {B} #SUP: n`).
+        cache (PatternCache, optional): Cache des motifs filtrés ; l'extraction est sautée en cas de succès.
+        reduction (str, optional): "closed" ou "maximal" pour ne garder que les motifs fermés ou maximaux
+            (le cache garde l'ensemble filtré complet).
+        workers (int | None): Avec le moteur "python", nombre de processus d'extraction
+            (1 : séquentiel, None : un par cœur). Le résultat ne dépend pas du nombre de processus.
+
+    Returns:
+        tuple: (liste de (ports, support), temps d'exécution PrefixSpan (ou de lecture du cache) en ms)
+    """
+    if sequences_file is not None and port_id_to_name is None:
+        raise ValueError("Un mapping des ports est nécessaire pour écrire les motifs décodés.")
+
+    # Motifs filtrés (IDs entiers) : depuis le cache si possible, sinon extraction puis filtrage en flux
+    with span("pattern_cache", enabled=cache is not None) as lookup:
+        # Seul le moteur Python applique les contraintes pendant l'extraction ; le nombre de processus ne change pas les motifs
+        key = (
+            cache_key(spmf_input_file, "PrefixSpan", min_support, FILTER_SETTINGS, engine=engine, constrained=engine == "python")
+            if cache is not None else None
+        )
+        filtered = cache.get(key) if key is not None else None
+        lookup.attributes["hit"] = filtered is not None
+
+    if filtered is not None:
+        spmf_time_ms = lookup.duration_ms
+        source = "cache"
+    else:
+        patterns, handle, spmf_time_ms = _mine(min_support, spmf_input_file, spmf_output_file, engine, workers)
+        with span("filtering") as filtering:
+            try:
+                filtered = list(iter_relevant_patterns(patterns))
+            finally:
+                if handle:
+                    handle.close()
+            filtering.records = len(filtered)
+        if key is not None:
+            cache.put(key, filtered)
+        source = engine
+
+    if reduction is not None:
+        with span("reduction", mode=reduction) as reducing:
+            filtered = reduce_patterns(filtered, reduction)
+            reducing.records = len(filtered)
+
+    filtered_f = open(outputfiltre, 'w') if outputfiltre else None
+    sequences_f = open(sequences_file, 'w', encoding="utf-8") if sequences_file else None
+    records = []
+    try:
+        with span("decoding", decoded=port_id_to_name is not None) as decoding:
+            for ports, support in filtered:
+                if filtered_f:
+                    filtered_f.write(format_pattern(ports, support) + "\n")
+                if port_id_to_name is not None:
+                    ports = decode_pattern(ports, port_id_to_name)
+                    if sequences_f:
+                        sequences_f.write(format_named_pattern(ports, support) + "\n")
+                records.append((ports, support))
+            decoding.records = len(records)
+    finally:
+        for f in (filtered_f, sequences_f):
+            if f:
+                f.close()
+
+    print(f"\nTemps d'exécution PrefixSpan (via {source}): {spmf_time_ms:.2f} ms")
+    print("Nombre de motifs :", len(records))
+
+    return records, spmf_time_ms
 
 def run_prefixspan(
     port_id_to_name,
     min_support=0.02,
     spmf_input_file="text_files/sequence_train.txt",
     spmf_output_file="text_files/spmf_output.txt",
-    outputfiltre="text_files/outputfiltre.txt"
+    outputfiltre="text_files/outputfiltre.txt",
+    engine="spmf",
+    sequences_file="text_files/sequences.txt",
+    cache=None,
+    reduction=None,
+    workers=1
+):
+    """
+    Interface historique de `extract_patterns` : écrit les motifs filtrés (`outputfiltre.txt`) et
+    les motifs décodés (`sequences.txt`) et retourne les motifs décodés sous forme de lignes
+    (`{A} -> {B} #SUP: n`).
+
+    Args:
+        port_id_to_name (dict): Mapping ID -> nom de port.
+        Les autres arguments sont ceux de `extract_patterns`.
+
+    Returns:
+        tuple: (liste des motifs décodés (str), temps d'exécution PrefixSpan en ms)
+    """
+    records, spmf_time_ms = extract_patterns(
+        port_id_to_name,
+        min_support=min_support,
+        spmf_input_file=spmf_input_file,
+        spmf_output_file=spmf_output_file,
+        outputfiltre=outputfiltre,
+        engine=engine,
+        sequences_file=sequences_file,
+        cache=cache,
+        reduction=reduction,
+        workers=workers,
+    )
+    return [format_named_pattern(ports, support) + "\n" for ports, support in records], spmf_time_ms
+
+def mine_patterns(
+    min_support=0.02,
+    spmf_input_file="text_files/sequence_train.txt",
+    spmf_output_file="text_files/spmf_output.txt",
+    engine="spmf",
+    cache=None,
+    reduction=None,
+    workers=1,
+    port_id_to_name=None
 ):
-    
-    # Exécuter PrefixSpan via SPMF
-    start_time = time.time()
-    run_spmf("PrefixSpan", spmf_input_file, spmf_output_file, f"{min_support * 100}%")
-    end_time = time.time()
-
-    # Post-traitement
-    process_results(spmf_output_file, outputfiltre)
-
-    # Charger les résultats filtrés
-    with open(outputfiltre, 'r') as f:
-        patterns = f.readlines()
-
-    # Remplacer les IDs des ports par leurs noms
-    updated_patterns = replace_ids_with_port_names(patterns, port_id_to_name)
-    
-    # Sauvegarder les motifs mis à jour dans un fichier sequences.txt
-    with open("text_files/sequences.txt", "w", encoding="utf-8") as f:
-        for pattern in updated_patterns:
-            f.write(pattern.strip() + "\n")
-
-    spmf_time_ms = (end_time - start_time) * 1000
-    print(f"\nTemps d'exécution PrefixSpan (via SPMF): {spmf_time_ms:.2f} ms")
-    print("Nombre de motifs :", len(updated_patterns))
-
-    return updated_patterns, spmf_time_ms
+    """
+    Extrait et filtre les motifs fréquents en gardant les IDs entiers des ports
+    (ni décodage en noms, ni fichier sequences.txt, ni JSON intermédiaire).
+
+    Args:
+        min_support (float): Support minimum relatif.
+        spmf_input_file (str): Base de séquences au format SPMF.
+        spmf_output_file (str | None): Fichier de sortie brut de PrefixSpan (None possible avec le moteur "python").
+        engine (str): "spmf" (Java) ou "python" (implémentation interne).
+        cache (PatternCache, optional): Cache des motifs filtrés.
+        reduction (str, optional): "closed" ou "maximal" (voir extract_patterns).
+        workers (int | None): Nombre de processus d'extraction avec le moteur "python" (voir extract_patterns).
+        port_id_to_name (dict, optional): Si fourni, les motifs qui contiennent un port sans nom valide
+            sont écartés, comme lors du passage par `sequences.txt` et motif_to_json (mêmes scores).
+
+    Returns:
+        tuple: (motifs au format {"sequence": [IDs], "support": n}, temps d'exécution en ms)
+    """
+    records, spmf_time_ms = extract_patterns(
+        min_support=min_support,
+        spmf_input_file=spmf_input_file,
+        spmf_output_file=spmf_output_file,
+        engine=engine,
+        cache=cache,
+        reduction=reduction,
+        workers=workers,
+    )
+    if port_id_to_name is not None:
+        named_ports = named_port_ids(port_id_to_name)
+        records = [(ports, support) for ports, support in records if all(port in named_ports for port in ports)]
+    return [{"sequence": list(ports), "support": support} for ports, support in records], spmf_time_ms
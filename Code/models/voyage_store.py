@@ -0,0 +1,224 @@
+"""
+voyage_store.py
+
+Ce script convertit une seule fois `merged_voyages.json` en une base colonnaire binaire (fichiers NumPy .npy)
+pour éviter de relire et de parcourir tout le JSON à chaque recherche d'un navire.
+- Une colonne par champ : id, imo, mmsi, ports de départ/arrivée (codes entiers), dates de départ/arrivée.
+- Les lignes sont triées par IMO puis par date d'arrivée : les voyages d'un navire forment une plage contiguë,
+  trouvée par recherche dichotomique (O(log n)).
+- Un index secondaire (permutation triée par MMSI) permet la même recherche par MMSI.
+- Le rang de chaque voyage dans le fichier (`source_row`) et les identifiants absents (`<colonne>_null`)
+  sont conservés : les voyages relus sont identiques à ceux du JSON, dans le même ordre si on le demande.
+- Les colonnes sont ouvertes en mémoire partagée (memory-map) : seules les lignes lues sont chargées.
+- La taille et la date de modification du fichier source sont enregistrées (`meta.json`) : si `merged_voyages.json`
+  est régénéré, la base est considérée comme obsolète et les scripts relisent le JSON jusqu'à la reconstruction.
+
+Usage :
+    À exécuter directement pour produire `../Data/voyage_store/` à partir de `merged_voyages.json`.
+"""
+
+import os
+import sys
+import json
+import numpy as np
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.baseEntier import iter_json_records
+
+STORE_DIR = "../Data/voyage_store"
+VOYAGES_FILE = "../Data/merged_voyages.json"
+CHUNK_SIZE = 100_000
+MISSING_PORT = -1
+STORE_VERSION = 2
+
+# Identifiants entiers qui peuvent être absents (null) dans le JSON
+NULLABLE_COLUMNS = ("id", "imo", "mmsi")
+
+COLUMNS = {
+    "id": np.int64,
+    "imo": np.int64,
+    "mmsi": np.int64,
+    "departure_port": np.int32,
+    "arrival_port": np.int32,
+    "departure_date": "datetime64[s]",
+    "arrival_date": "datetime64[s]",
+}
+
+def _encode_chunk(records, port_codes):
+    """Convertit une liste de voyages (dictionnaires JSON) en colonnes NumPy."""
+    def port_code(name):
+        if not name:
+            return MISSING_PORT
+        return port_codes.setdefault(name, len(port_codes))
+
+    columns = {
+        "id": np.array([r.get("id") or 0 for r in records], dtype=np.int64),
+        "imo": np.array([r.get("imo") or 0 for r in records], dtype=np.int64),
+        "mmsi": np.array([r.get("mmsi") or 0 for r in records], dtype=np.int64),
+        "departure_port": np.array([port_code(r.get("departure_port")) for r in records], dtype=np.int32),
+        "arrival_port": np.array([port_code(r.get("arrival_port")) for r in records], dtype=np.int32),
+        # Conversion vectorisée des dates ISO (None -> NaT)
+        "departure_date": np.array([r.get("departure_date") or "NaT" for r in records], dtype="datetime64[s]"),
+        "arrival_date": np.array([r.get("arrival_date") or "NaT" for r in records], dtype="datetime64[s]"),
+    }
+    for name in NULLABLE_COLUMNS:
+        columns[f"{name}_null"] = np.array([r.get(name) is None for r in records], dtype=bool)
+    return columns
+
+def _source_signature(json_path):
+    """Taille et date de modification (ns) du fichier source, pour détecter une base obsolète."""
+    stat = os.stat(json_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+def build_voyage_store(json_path=VOYAGES_FILE, store_dir=STORE_DIR):
+    """
+    Construit la base colonnaire à partir du fichier de voyages (lu en flux, par blocs).
+
+    Args:
+        json_path (str): Fichier JSON ou JSON Lines des voyages.
+        store_dir (str): Dossier de sortie de la base.
+
+    Returns:
+        int: Nombre de voyages enregistrés.
+    """
+    signature = _source_signature(json_path)
+    if os.path.exists(os.path.join(store_dir, "meta.json")):
+        os.remove(os.path.join(store_dir, "meta.json"))
+    port_codes = {}
+    chunks = []
+    records = []
+
+    for record in iter_json_records(json_path):
+        records.append(record)
+        if len(records) == CHUNK_SIZE:
+            chunks.append(_encode_chunk(records, port_codes))
+            records = []
+    if records or not chunks:
+        chunks.append(_encode_chunk(records, port_codes))
+
+    columns = {
+        name: np.concatenate([chunk[name] for chunk in chunks]).astype(dtype)
+        for name, dtype in COLUMNS.items()
+    }
+    for name in NULLABLE_COLUMNS:
+        columns[f"{name}_null"] = np.concatenate([chunk[f"{name}_null"] for chunk in chunks])
+
+    # Tri par IMO puis date d'arrivée (tri stable : l'ordre du fichier départage les égalités)
+    order = np.lexsort((columns["arrival_date"], columns["imo"]))
+    columns = {name: values[order] for name, values in columns.items()}
+    columns["source_row"] = order.astype(np.int64)
+
+    # Index secondaire : lignes triées par MMSI puis date d'arrivée (puis ordre du fichier)
+    mmsi_order = np.lexsort((order, columns["arrival_date"], columns["mmsi"]))
+
+    os.makedirs(store_dir, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(store_dir, f"{name}.npy"), values)
+    np.save(os.path.join(store_dir, "mmsi_order.npy"), mmsi_order)
+    np.save(os.path.join(store_dir, "mmsi_sorted.npy"), columns["mmsi"][mmsi_order])
+
+    with open(os.path.join(store_dir, "ports.json"), "w") as f:
+        json.dump(list(port_codes), f)
+
+    # Écrit en dernier : une base interrompue pendant la construction n'est jamais considérée comme valide
+    with open(os.path.join(store_dir, "meta.json"), "w") as f:
+        json.dump({"version": STORE_VERSION, "source": json_path, "rows": int(len(order)), **signature}, f)
+
+    return len(order)
+
+def store_exists(store_dir=STORE_DIR, json_path=VOYAGES_FILE):
+    """
+    Indique si la base colonnaire a été construite et correspond toujours au fichier source
+    (même taille et même date de modification qu'à la construction).
+    """
+    try:
+        with open(os.path.join(store_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+        signature = _source_signature(json_path)
+    except (OSError, ValueError):
+        return False
+    return meta.get("version") == STORE_VERSION and all(meta.get(key) == value for key, value in signature.items())
+
+class VoyageStore:
+    """Accès en lecture à la base colonnaire (colonnes ouvertes en memory-map)."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        for name in list(COLUMNS) + [f"{name}_null" for name in NULLABLE_COLUMNS] + ["source_row"]:
+            setattr(self, name, np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r"))
+        self.mmsi_order = np.load(os.path.join(store_dir, "mmsi_order.npy"), mmap_mode="r")
+        self.mmsi_sorted = np.load(os.path.join(store_dir, "mmsi_sorted.npy"), mmap_mode="r")
+
+        with open(os.path.join(store_dir, "ports.json"), "r") as f:
+            self.ports = json.load(f)
+
+    def __len__(self):
+        return len(self.imo)
+
+    def rows_for_imo(self, imo):
+        """Retourne la plage de lignes (slice) des voyages d'un IMO, triés par date d'arrivée."""
+        start = np.searchsorted(self.imo, imo, side="left")
+        end = np.searchsorted(self.imo, imo, side="right")
+        return slice(int(start), int(end))
+
+    def rows_for_mmsi(self, mmsi):
+        """Retourne les indices de lignes des voyages d'un MMSI, triés par date d'arrivée."""
+        start = np.searchsorted(self.mmsi_sorted, mmsi, side="left")
+        end = np.searchsorted(self.mmsi_sorted, mmsi, side="right")
+        return np.asarray(self.mmsi_order[start:end])
+
+    def rows_for_vessel(self, identifiant, mmsi=False):
+        """Retourne les lignes d'un navire identifié par IMO ou MMSI."""
+        return self.rows_for_mmsi(identifiant) if mmsi else self.rows_for_imo(identifiant)
+
+    def in_source_order(self, rows=slice(None)):
+        """Retourne les lignes données (slice ou indices) triées dans l'ordre du fichier source."""
+        rows = np.arange(len(self))[rows] if isinstance(rows, slice) else np.asarray(rows)
+        return rows[np.argsort(self.source_row[rows], kind="stable")]
+
+    def port_names(self, codes):
+        """Convertit des codes de ports en noms (None pour un port manquant)."""
+        return [self.ports[code] if code != MISSING_PORT else None for code in codes.tolist()]
+
+    def records(self, rows):
+        """
+        Reconstruit les voyages des lignes données au format de `merged_voyages.json`.
+
+        Args:
+            rows (slice | np.ndarray): Lignes à lire.
+
+        Returns:
+            list[dict]: Voyages (id, imo, mmsi, ports et dates ISO).
+        """
+        def iso_dates(values):
+            return [None if date == "NaT" else date for date in np.datetime_as_string(values, unit="s").tolist()]
+
+        def identifiers(name):
+            return [None if is_null else value for value, is_null in zip(getattr(self, name)[rows].tolist(), getattr(self, f"{name}_null")[rows].tolist())]
+
+        columns = zip(
+            identifiers("id"),
+            identifiers("imo"),
+            identifiers("mmsi"),
+            self.port_names(self.departure_port[rows]),
+            self.port_names(self.arrival_port[rows]),
+            iso_dates(self.departure_date[rows]),
+            iso_dates(self.arrival_date[rows]),
+        )
+        return [
+            {
+                "id": voyage_id,
+                "imo": imo,
+                "mmsi": mmsi,
+                "departure_port": departure_port,
+                "arrival_port": arrival_port,
+                "departure_date": departure_date,
+                "arrival_date": arrival_date,
+            }
+            for voyage_id, imo, mmsi, departure_port, arrival_port, departure_date, arrival_date in columns
+        ]
+
+# === Point d'entrée principal ===
+if __name__ == "__main__":
+    count = build_voyage_store()
+    print(f"✅ Base colonnaire créée dans '{STORE_DIR}' ({count} voyages)")
@@ -1,71 +1,246 @@
+"""
+generate_planning.py
+
+Ce script génère le planning (format p2p_master) d'un navire ou de toute la flotte à partir de `merged_voyages.json`.
+- Mode interactif (par défaut) : demande l'IMO d'un navire et écrit `Data/planning/planning_<IMO>.json`.
+- Mode flotte (--flotte) : regroupe les voyages par IMO en une seule lecture et écrit tous les plannings
+  en parallèle dans plusieurs processus (--workers N), ou un seul fichier combiné (--combine).
+  Avec la base colonnaire, les navires sont lus un par un (plages de la colonne IMO triée) : seuls les voyages
+  des navires en cours de traitement sont convertis en dictionnaires.
+
+Les dates sont converties de façon vectorisée (NumPy) plutôt qu'avec un strptime par voyage.
+"""
 
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
-from datetime import datetime
+import argparse
+import numpy as np
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from models.baseEntier import iter_json_records
+from models.voyage_store import VoyageStore, store_exists
+
+OUTPUT_FOLDER = "../Data/planning"
+COMBINED_FILE = "planning_flotte.json"
+BATCH_VESSELS = 32  # navires par tâche envoyée à un processus de travail
+
+def format_dates(date_strings):
+    """
+    Convertit des dates ISO (`%Y-%m-%dT%H:%M:%S`) au format `%m/%d/%Y %H:%M`, en une seule opération.
 
-with open("../Data/merged_voyages.json", "r", encoding="utf-8") as f:
-    voyages = json.load(f)
+    Args:
+        date_strings (list[str | None]): Dates ISO (None si absente).
 
-imo_filter = input("Entrez l'IMO du navire que vous voulez voir : ").strip()
+    Returns:
+        tuple: (dates formatées (None si absente), dates en datetime64[s])
+    """
+    dates = np.array([date or "NaT" for date in date_strings], dtype="datetime64[s]")
+    formatted = [
+        None if iso == "NaT" else f"{iso[5:7]}/{iso[8:10]}/{iso[0:4]} {iso[11:16]}"
+        for iso in np.datetime_as_string(dates, unit="s").tolist()
+    ]
+    return formatted, dates
 
-#  pour formater les dates
-def format_date(date_str):
-    if date_str:
-        return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S").strftime("%m/%d/%Y %H:%M")
-    return None
+def build_planning_entries(voyages):
+    """
+    Construit les entrées de planning d'une liste de voyages.
 
-filtered_planning = []
+    Args:
+        voyages (list[dict]): Voyages au format de `merged_voyages.json`.
 
-for voyage in voyages:
-    if str(voyage["imo"]) == imo_filter:  
-        planning_entry = {
+    Returns:
+        list[dict]: Entrées de planning (une par voyage).
+    """
+    origin_dates, departure = format_dates([voyage["departure_date"] for voyage in voyages])
+    destination_dates, arrival = format_dates([voyage["arrival_date"] for voyage in voyages])
+
+    # Durée de trajet en jours entiers (arrondi vers le bas, comme timedelta.days)
+    transit_seconds = (arrival - departure).astype("timedelta64[s]").astype(np.int64)
+    missing = np.isnat(arrival) | np.isnat(departure)
+    transit_times = [
+        None if is_missing else days
+        for days, is_missing in zip((transit_seconds // 86400).tolist(), missing.tolist())
+    ]
+
+    return [
+        {
             "P2P_ID": voyage["id"],
             "VOYAGE_ID": None,
-            "CARRIER_ALIAS": "Unknown Carrier",  
+            "CARRIER_ALIAS": "Unknown Carrier",
             "SCAC_CODE": None,
             "CARRIER_SERVICE_DES": None,
             "VESSEL_NAME": f"Vessel {voyage['imo']}",
             "VESSEL_IMO": str(voyage["imo"]),
-            "VOYAGE": None,  
+            "VOYAGE": None,
             "ORIGIN": voyage["departure_port"],
             "ORIGIN_PORT_CODE": voyage["departure_port"],
             "ORIGIN_TYPE_CODE": None,
-            "ORIGIN_EVENTDATE": format_date(voyage["departure_date"]),
+            "ORIGIN_EVENTDATE": origin_date,
             "DESTINATION": voyage["arrival_port"],
             "DESTINATION_PORT_CODE": voyage["arrival_port"],
             "DESTINATION_TYPE_CODE": None,
-            "DESTINATION_EVENTDATE": format_date(voyage["arrival_date"]),
+            "DESTINATION_EVENTDATE": destination_date,
             "ROUTING": f"{voyage['departure_port']}-{voyage['arrival_port']}",
             "MODIFIED_DATE": None,
             "AMENDMENT_CODE": None,
             "NO_OF_TRANSSHIPMENTS": None,
-            "TRANSIT_TIME": (datetime.strptime(voyage["arrival_date"], "%Y-%m-%dT%H:%M:%S") - datetime.strptime(voyage["departure_date"], "%Y-%m-%dT%H:%M:%S")).days,  # durée de trajet
+            "TRANSIT_TIME": transit_time,  # durée de trajet
             "SCHEDULE_TYPE": None
         }
-        
-        filtered_planning.append(planning_entry)
+        for voyage, origin_date, destination_date, transit_time
+        in zip(voyages, origin_dates, destination_dates, transit_times)
+    ]
 
-if not filtered_planning:
-    print(f" Aucun voyage trouvé pour l'IMO {imo_filter}. Vérifiez l'IMO et réessayez.")
-else:
+def write_planning(entries, output_filename):
+    """Écrit un planning (en-tête p2p_master + entrées) dans un fichier JSON."""
     final_json = {
         "HEADER": {
             "DATASET": "p2p_master",
-            "RECORDS_RETURNED": len(filtered_planning),
+            "RECORDS_RETURNED": len(entries),
             "SCHEMA_PATH": "/get/schema/p2p_master"
         },
-        "DATA": filtered_planning
+        "DATA": entries
     }
 
-    output_folder = "../Data/planning"
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json.dump(final_json, f, indent=4)
+
+def iter_store_groups(store):
+    """
+    Parcourt les voyages de la base colonnaire navire par navire, sans reconstruire toute la base en mémoire.
+
+    Les lignes sont déjà triées par IMO : chaque navire est une plage contiguë de la colonne. Les navires
+    sont parcourus dans l'ordre de leur premier voyage dans le fichier source, et leurs voyages dans l'ordre
+    du fichier (comme `group_voyages_by_imo` sur le JSON) ; les voyages sans IMO sont ignorés.
+
+    Args:
+        store (VoyageStore): Base colonnaire.
+
+    Yields:
+        tuple: (IMO en chaîne de caractères, voyages du navire)
+    """
+    rows = np.flatnonzero(~np.asarray(store.imo_null))
+    imos = np.asarray(store.imo[rows])
+    starts = np.flatnonzero(np.r_[True, imos[1:] != imos[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+    ends = np.append(starts[1:], len(rows))
+    first_rows = np.minimum.reduceat(np.asarray(store.source_row[rows]), starts) if len(rows) else starts
+
+    for group in np.argsort(first_rows, kind="stable").tolist():
+        start, end = int(starts[group]), int(ends[group])
+        yield str(int(imos[start])), store.records(store.in_source_order(rows[start:end]))
+
+def load_vessel_groups():
+    """
+    Retourne les voyages regroupés par IMO : navire par navire depuis la base colonnaire si elle existe,
+    sinon en une lecture en flux du JSON (regroupement en mémoire).
+
+    Returns:
+        iterable: Couples (IMO en chaîne de caractères, voyages du navire).
+    """
+    if store_exists():
+        return iter_store_groups(VoyageStore())
+    return group_voyages_by_imo(iter_json_records("../Data/merged_voyages.json")).items()
+
+def group_voyages_by_imo(voyages):
+    """Regroupe les voyages par IMO (en chaîne de caractères) en un seul parcours ; les voyages sans IMO sont ignorés."""
+    groups = defaultdict(list)
+    for voyage in voyages:
+        if voyage.get("imo") is None:
+            continue
+        groups[str(voyage["imo"])].append(voyage)
+    return groups
+
+def _write_vessel_plannings(task):
+    """Construit et écrit les plannings d'un lot de navires (exécuté dans un processus de travail)."""
+    groups, output_folder = task
+    output_filenames = []
+    for imo, voyages in groups:
+        output_filename = os.path.join(output_folder, f"planning_{imo}.json")
+        write_planning(build_planning_entries(voyages), output_filename)
+        output_filenames.append(output_filename)
+    return output_filenames
+
+def _batches(groups, size):
+    """Regroupe les couples (IMO, voyages) par lots de `size` navires."""
+    batch = []
+    for group in groups:
+        batch.append(group)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_fleet_planning(groups, output_folder=OUTPUT_FOLDER, workers=None, combine=False):
+    """
+    Génère les plannings de toute la flotte.
+
+    Args:
+        groups (iterable): Couples (IMO, voyages du navire), ex. `load_vessel_groups()`.
+        output_folder (str): Dossier de sortie.
+        workers (int, optional): Nombre de processus (par défaut : nombre de cœurs).
+        combine (bool): Si True, écrit un seul fichier combiné au lieu d'un fichier par IMO.
+
+    Returns:
+        list[str]: Fichiers écrits.
+    """
     os.makedirs(output_folder, exist_ok=True)
 
+    if combine:
+        output_filename = os.path.join(output_folder, COMBINED_FILE)
+        entries = []
+        for _, voyages in groups:
+            entries.extend(build_planning_entries(voyages))
+        write_planning(entries, output_filename)
+        return [output_filename]
+
+    # Nombre borné de lots en attente : les navires sont lus au rythme de l'écriture des plannings
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    output_filenames = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in _batches(groups, BATCH_VESSELS):
+            pending.append(executor.submit(_write_vessel_plannings, (batch, output_folder)))
+            if len(pending) >= max_pending:
+                output_filenames.extend(pending.popleft().result())
+        for future in pending:
+            output_filenames.extend(future.result())
+    return output_filenames
+
+def generate_vessel_planning(imo_filter, output_folder=OUTPUT_FOLDER):
+    """Génère le planning d'un seul navire (mode interactif)."""
+    if store_exists() and imo_filter.isdigit():
+        # Base colonnaire : seuls les voyages du navire sont lus (recherche par index), dans l'ordre du fichier
+        store = VoyageStore()
+        rows = store.in_source_order(store.rows_for_imo(int(imo_filter)))
+        voyages = store.records(rows[~np.asarray(store.imo_null[rows])])
+    else:
+        # Lecture en flux : les voyages sont parcourus un par un sans charger tout le fichier
+        voyages = [voyage for voyage in iter_json_records("../Data/merged_voyages.json") if str(voyage["imo"]) == imo_filter]
+
+    if not voyages:
+        print(f" Aucun voyage trouvé pour l'IMO {imo_filter}. Vérifiez l'IMO et réessayez.")
+        return
+
+    os.makedirs(output_folder, exist_ok=True)
     output_filename = os.path.join(output_folder, f"planning_{imo_filter}.json")
+    write_planning(build_planning_entries(voyages), output_filename)
 
-    with open(output_filename, "w", encoding="utf-8") as f:
-        json.dump(final_json, f, indent=4)
+    print(f" Planning généré avec succès pour IMO {imo_filter} ! Fichier : {output_filename}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération des plannings de navires.")
+    parser.add_argument("--flotte", action="store_true", help="générer les plannings de toute la flotte")
+    parser.add_argument("--combine", action="store_true", help="avec --flotte : un seul fichier combiné")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : nombre de cœurs)")
+    args = parser.parse_args()
 
-    print(f" Planning généré avec succès pour IMO {imo_filter} ! Fichier : {output_filename}")
\ No newline at end of file
+    if args.flotte:
+        files = generate_fleet_planning(load_vessel_groups(), workers=args.workers, combine=args.combine)
+        print(f" {len(files)} fichier(s) de planning généré(s) dans {OUTPUT_FOLDER}")
+    else:
+        imo_filter = input("Entrez l'IMO du navire que vous voulez voir : ").strip()
+        generate_vessel_planning(imo_filter)
@@ -0,0 +1,144 @@
+import numpy as np
+from prediction.context_trie import ContextTrie, PADDING, reversed_context_rows
+from processing.instrumentation import instrumented
+
+"""
+Description du script :
+Ce module définit la classe BackoffPredictor, un prédicteur de Markov d'ordre variable construit sur un seul ContextTrie.
+Pour chaque position, on cherche d'abord le contexte des N derniers ports ; s'il n'a jamais été observé,
+on recule à l'ordre N-1, et ainsi de suite jusqu'à l'ordre 1. Si même le dernier port est inconnu, on prédit
+le port suivant le plus fréquent de tout l'entraînement (ordre 0). Toute position ayant au moins un port
+précédent reçoit donc une prédiction, au lieu d'être ignorée comme dans evaluate_batch.
+
+Tous les ordres partagent l'encodage des ports et les comptes du trie (une seule passe sur les données).
+La prédiction descend directement dans le trie, du dernier port vers les plus anciens : le nœud le plus
+profond atteint est le plus long contexte connu, et son meilleur enfant est le port prédit.
+"""
+
+class BackoffPredictor:
+    """
+    Prédicteur à repli (backoff) de l'ordre `max_order` jusqu'à l'ordre 0.
+
+    Attributs principaux :
+        max_order (int): Ordre maximal.
+        ports (list): Port associé à chaque code entier (commun à tous les ordres).
+        port_index (dict): Port -> code entier.
+        node_keys (list[np.ndarray]): Clés triées (parent * nombre de ports + port) des nœuds de chaque profondeur 1..max_order.
+        best_next (list[np.ndarray]): Code du port suivant le plus fréquent de chaque nœud, par profondeur.
+        fallback_port (int): Code du port suivant le plus fréquent (ordre 0), -1 si aucun.
+    """
+
+    def __init__(self, trie):
+        """
+        Args:
+            trie (ContextTrie): Trie des contextes (comptes de tous les ordres).
+        """
+        self.max_order = trie.max_order
+        self.ports = trie.ports
+        self.port_index = {port: code for code, port in enumerate(self.ports)}
+        self.node_keys, self.best_next = zip(*(trie.nodes(depth) for depth in range(1, self.max_order + 1)))
+
+        # Ordre 0 : port suivant le plus fréquent (égalités : première observation)
+        next_ports = trie.leaves[:, self.max_order]
+        if len(next_ports):
+            port_counts = np.bincount(next_ports, weights=trie.leaf_counts, minlength=len(self.ports))
+            port_first = np.full(len(self.ports), np.iinfo(np.int64).max)
+            np.minimum.at(port_first, next_ports, trie.leaf_first_seen)
+            self.fallback_port = int(np.lexsort((port_first, -port_counts))[0])
+        else:
+            self.fallback_port = -1
+
+    @classmethod
+    def from_sequences(cls, sequences, max_order):
+        """Construit le prédicteur à partir de séquences complètes."""
+        return cls(ContextTrie.from_sequences(sequences, max_order))
+
+    @classmethod
+    def from_patterns(cls, patterns, max_order):
+        """Construit le prédicteur à partir de motifs {"sequence": [...], "support": n}."""
+        return cls(ContextTrie.from_patterns(patterns, max_order))
+
+    def predict(self, context):
+        """
+        Retourne le port le plus probable après `context` (plus long suffixe connu, sinon ordre 0).
+
+        Args:
+            context (list): Derniers ports (du plus ancien au plus récent).
+
+        Returns:
+            tuple: (port prédit ou None, ordre utilisé)
+        """
+        recent = [self.port_index.get(port, PADDING) for port in list(context)[::-1][:self.max_order]]
+        row = np.full((1, self.max_order), PADDING, dtype=np.int64)
+        row[0, :len(recent)] = recent
+
+        predicted, order = self._walk(row)
+        if predicted[0] < 0:
+            return None, 0
+        return self.ports[predicted[0]], int(order[0])
+
+    def _walk(self, rows):
+        """
+        Descend dans le trie pour chaque contexte inversé (colonne j : port situé j + 1 positions avant).
+
+        Args:
+            rows (np.ndarray): Contextes inversés (Q × au moins max_order colonnes, PADDING si absent).
+
+        Returns:
+            tuple: (code prédit (meilleur enfant du nœud le plus profond, sinon ordre 0), profondeur atteinte)
+        """
+        port_count = max(len(self.ports), 1)
+        predicted = np.full(len(rows), self.fallback_port, dtype=np.int64)
+        depths = np.zeros(len(rows), dtype=np.int64)
+        nodes = np.zeros(len(rows), dtype=np.int64)
+        active = np.ones(len(rows), dtype=bool)
+
+        # Un niveau par port précédent : une position reste active tant que son contexte est dans le trie
+        for depth, (keys, best_next) in enumerate(zip(self.node_keys, self.best_next), start=1):
+            ports = rows[:, depth - 1].astype(np.int64)
+            active &= ports != PADDING
+            if len(keys) == 0 or not active.any():
+                break
+            wanted = nodes * port_count + ports
+            positions = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+            active &= keys[positions] == wanted
+            nodes = positions
+            predicted[active] = best_next[positions[active]]
+            depths[active] = depth
+
+        return predicted, depths
+
+    def predict_positions(self, sequences):
+        """
+        Prédit en bloc le port de chaque position ayant au moins un port précédent.
+
+        Args:
+            sequences (list[list]): Séquences de ports.
+
+        Returns:
+            tuple: (codes prédits, codes réels (-1 si port inconnu), ordre utilisé pour chaque position)
+        """
+        encoded = [
+            np.array([self.port_index.get(port, PADDING) for port in sequence], dtype=np.int32)
+            for sequence in sequences
+        ]
+        rows, _ = reversed_context_rows(encoded, self.max_order)
+        predicted, orders_used = self._walk(rows)
+        return predicted, rows[:, self.max_order].astype(np.int64), orders_used
+
+    @instrumented("BackoffPredictor.evaluate", records=lambda result: result[1])
+    def evaluate(self, test_sequences):
+        """
+        Évalue le prédicteur sur toutes les positions des séquences de test.
+
+        Returns:
+            tuple: (score, total, précision, nombre de prédictions faites à chaque ordre 0..max_order)
+        """
+        predicted, actual_next, orders_used = self.predict_positions(test_sequences)
+        total_predictions = len(actual_next)
+        if total_predictions == 0:
+            return 0, 0, 0.0, np.zeros(self.max_order + 1, dtype=np.int64)
+
+        total_score = int(np.count_nonzero((predicted == actual_next) & (actual_next >= 0)))
+        order_counts = np.bincount(orders_used, minlength=self.max_order + 1)
+        return total_score, total_predictions, total_score / total_predictions, order_counts
@@ -0,0 +1,178 @@
+import numpy as np
+from prediction.transition_model import TransitionModel, encode_sequences
+from processing.instrumentation import instrumented
+
+"""
+Description du script :
+Ce module définit la classe ContextTrie, qui compte en une seule passe les transitions de tous les ordres 1..N.
+
+Pour chaque position d'une séquence, on garde les N ports précédents du plus récent au plus ancien
+(complétés par -1 en début de séquence) suivis du port réel. Ces lignes sont dédupliquées et triées
+une seule fois : elles forment les feuilles d'un trie des contextes inversés. Les contextes d'ordre k
+sont alors exactement les préfixes de longueur k de ces feuilles, si bien que le modèle d'ordre k
+se lit directement sur les feuilles, sans reparcourir les séquences d'entraînement.
+"""
+
+PADDING = -1
+
+def reversed_context_rows(encoded_sequences, max_order):
+    """
+    Construit, pour chaque position ayant au moins un port précédent, la ligne des `max_order` ports
+    précédents du plus récent au plus ancien (PADDING avant le début de la séquence) suivie du port réel.
+
+    Args:
+        encoded_sequences (list[np.ndarray]): Séquences encodées.
+        max_order (int): Nombre de ports précédents gardés.
+
+    Returns:
+        tuple: (lignes (M × (max_order + 1)), nombre de lignes de chaque séquence)
+    """
+    lengths = np.array([len(sequence) for sequence in encoded_sequences], dtype=np.int64)
+    flat = np.concatenate(encoded_sequences) if len(encoded_sequences) else np.empty(0, dtype=np.int32)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))[:-1]
+
+    # Une transition par position ayant au moins un port précédent, dans l'ordre des séquences
+    counts = np.maximum(lengths - 1, 0)
+    total = int(counts.sum())
+    sequence_starts = np.repeat(offsets, counts)
+    positions = np.arange(total) + np.repeat(offsets + 1 - (np.cumsum(counts) - counts), counts)
+
+    # Colonne j : port situé j + 1 positions avant (PADDING avant le début de la séquence)
+    previous = positions[:, None] - 1 - np.arange(max_order)
+    rows = np.full((total, max_order + 1), PADDING, dtype=np.int32)
+    inside = previous >= sequence_starts[:, None]
+    rows[:, :max_order][inside] = flat[previous[inside]]
+    rows[:, max_order] = flat[positions]
+    return rows, counts
+
+class ContextTrie:
+    """
+    Comptes de transitions pour tous les ordres de 1 à `max_order`.
+
+    Attributs principaux :
+        max_order (int): Ordre maximal.
+        ports (list): Port associé à chaque code entier.
+        leaves (np.ndarray): Contextes inversés uniques suivis du port suivant (L × (max_order + 1)),
+            triés lexicographiquement.
+        leaf_counts (np.ndarray): Compte (pondéré) de chaque feuille.
+        leaf_first_seen (np.ndarray): Rang de première observation de chaque feuille.
+    """
+
+    def __init__(self, max_order, ports, encoded_sequences, weights=None):
+        """
+        Construit le trie à partir de séquences déjà encodées.
+
+        Args:
+            max_order (int): Ordre maximal des contextes.
+            ports (list): Port associé à chaque code entier.
+            encoded_sequences (list[np.ndarray]): Séquences encodées.
+            weights (list, optional): Poids de chaque séquence (ex. support d'un motif), 1 par défaut.
+        """
+        if max_order < 1:
+            raise ValueError("L'ordre de la chaîne de Markov doit être au moins 1.")
+
+        self.max_order = max_order
+        self.ports = list(ports)
+
+        rows, counts = reversed_context_rows(encoded_sequences, max_order)
+        total = len(rows)
+
+        if weights is None:
+            row_weights = np.ones(total)
+        else:
+            row_weights = np.repeat(np.asarray(weights, dtype=np.float64), counts)
+
+        # Feuilles : lignes uniques (triées), comptes et première observation
+        self.leaves, inverse = np.unique(rows, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        self.leaf_counts = np.bincount(inverse, weights=row_weights, minlength=len(self.leaves))
+        self.leaf_first_seen = np.full(len(self.leaves), np.iinfo(np.int64).max)
+        np.minimum.at(self.leaf_first_seen, inverse, np.arange(total))
+
+    @classmethod
+    @instrumented("ContextTrie.from_sequences", records=lambda trie: len(trie.leaves))
+    def from_sequences(cls, sequences, max_order):
+        """Construit le trie à partir de séquences complètes (chaque transition compte 1)."""
+        port_index = {}
+        encoded = encode_sequences(sequences, port_index)
+        return cls(max_order, port_index, encoded)
+
+    @classmethod
+    @instrumented("ContextTrie.from_patterns", records=lambda trie: len(trie.leaves))
+    def from_patterns(cls, patterns, max_order):
+        """Construit le trie à partir de motifs {"sequence": [...], "support": n} (pondération par le support)."""
+        port_index = {}
+        encoded = encode_sequences([pattern["sequence"] for pattern in patterns], port_index)
+        return cls(max_order, port_index, encoded, [pattern["support"] for pattern in patterns])
+
+    def nodes(self, depth):
+        """
+        Lit les nœuds de profondeur `depth` du trie (contextes inversés de `depth` ports) sur les feuilles.
+
+        Les nœuds sont numérotés dans l'ordre lexicographique de leur contexte : les enfants d'un même
+        parent sont contigus et triés par port, si bien que les clés `parent * nombre de ports + port`
+        sont croissantes et se cherchent par dichotomie.
+
+        Args:
+            depth (int): Profondeur souhaitée (entre 1 et max_order).
+
+        Returns:
+            tuple: (clés des nœuds (triées), port suivant le plus fréquent de chaque nœud
+                (égalités : première observation))
+        """
+        if not 1 <= depth <= self.max_order:
+            raise ValueError(f"La profondeur doit être comprise entre 1 et {self.max_order}.")
+
+        port_count = max(len(self.ports), 1)
+        parent_nodes = np.zeros(len(self.leaves), dtype=np.int64)
+        for level in range(1, depth + 1):
+            valid = self.leaves[:, level - 1] != PADDING
+            leaves = self.leaves[valid]
+
+            # Nouveau nœud à chaque changement de préfixe (les feuilles sont triées)
+            is_first = np.ones(len(leaves), dtype=bool)
+            is_first[1:] = np.any(leaves[1:, :level] != leaves[:-1, :level], axis=1)
+            leaf_nodes = np.full(len(self.leaves), -1, dtype=np.int64)
+            leaf_nodes[valid] = np.cumsum(is_first) - 1
+            keys = parent_nodes[valid][is_first] * port_count + leaves[is_first, level - 1]
+            parent_nodes = leaf_nodes
+
+        # Meilleur enfant : agrégation des couples (nœud, port suivant) comme dans TransitionModel
+        nodes = leaf_nodes[valid]
+        pair_keys, pair_inverse = np.unique(nodes * port_count + self.leaves[valid, self.max_order], return_inverse=True)
+        pair_inverse = pair_inverse.reshape(-1)
+        pair_counts = np.bincount(pair_inverse, weights=self.leaf_counts[valid], minlength=len(pair_keys))
+        pair_first = np.full(len(pair_keys), np.iinfo(np.int64).max)
+        np.minimum.at(pair_first, pair_inverse, self.leaf_first_seen[valid])
+
+        pair_nodes = pair_keys // port_count
+        ranking = np.lexsort((pair_first, -pair_counts, pair_nodes))
+        best_next = (pair_keys % port_count)[ranking][np.searchsorted(pair_nodes[ranking], np.arange(len(keys)))]
+        return keys, best_next
+
+    def model(self, order):
+        """
+        Lit le modèle d'ordre `order` sur les feuilles du trie.
+        Équivalent à TransitionModel.from_sequences / from_patterns avec le même ordre.
+
+        Args:
+            order (int): Ordre souhaité (entre 1 et max_order).
+
+        Returns:
+            TransitionModel: Modèle de transition d'ordre `order`.
+        """
+        if not 1 <= order <= self.max_order:
+            raise ValueError(f"L'ordre doit être compris entre 1 et {self.max_order}.")
+
+        # Feuilles dont les `order` ports précédents existent (le remplissage est toujours en fin de ligne)
+        valid = self.leaves[:, order - 1] != PADDING
+        leaves = self.leaves[valid]
+
+        return TransitionModel(
+            order,
+            self.ports,
+            leaves[:, order - 1::-1],
+            leaves[:, self.max_order],
+            self.leaf_counts[valid],
+            first_seen=self.leaf_first_seen[valid],
+        )
@@ -2,15 +2,18 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import json
+import argparse
+import tempfile
 import numpy as np
-from prediction.markov_from_patterns import compute_transition_probabilities
-from prediction.sequence_splitter import read_sequences, write_sequences, split_sequences
-from prediction.motif_to_json import parse_sequence_file
-from prediction.evaluate import evaluate_multiple_sequences
-from models.runPrefixSpan import run_prefixspan
+from concurrent.futures import ProcessPoolExecutor
+from prediction.transition_model import TransitionModel
+from prediction.sequence_splitter import read_sequences, write_sequences, cross_validation_folds
+from prediction.evaluate import evaluate_batch
+from models.runPrefixSpan import mine_patterns
+from processing.pattern_cache import PatternCache
 from models.baseEntier import load_json
-from prediction.markov_from_sequences import decode_sequences,read_spmf_sequences
+from prediction.markov_from_sequences import read_spmf_sequences
+from processing.instrumentation import start_run, span, current_report, add_report_arguments
 
 """
 Description du script :
@@ -19,73 +22,98 @@ par l'algorithme PrefixSpan. Pour chaque fold, il divise les séquences, extrait
 et évalue la performance du modèle sur les séquences de test.
 
 Ce processus est répété K fois (cross-validation), et les scores moyens et écart-type sont affichés à la fin.
+Tout le traitement se fait sur les IDs entiers des ports (pas de décodage en noms ni de JSON intermédiaire).
+Les folds sont exécutés en parallèle (un processus par fold, --workers N pour limiter), chacun dans son propre
+dossier temporaire : aucun fichier intermédiaire n'est partagé entre deux folds. Les motifs extraits sont mis
+en cache (--no-cache pour forcer une nouvelle extraction).
 """
 
 # === CONFIGURATION ===
 INPUT_FILE = "text_files/spmf_input.txt"
+PORT_MAPPING_FILE = "../Data/port_mapping.json"
 
-while True:
-    try:
-        ORDER = int(input("Veuillez entrer l'ordre de la chaîne de Markov (un entier >= 1) : "))
-        if ORDER >= 1:
-            break
-        else:
-            print("L'ordre doit être un entier strictement supérieur ou égal à 1.")
-    except ValueError:
-        print("Entrée invalide. Veuillez entrer un entier valide.")
-
-# === FICHIERS TEMPORAIRES ===
-TRAIN_FILE = "text_files/temp_train.txt"
-TEST_FILE = "text_files/temp_test.txt"
-OUTPUT_SPMF = "text_files/spmf_output.txt"
-OUTPUT_FILE = "text_files/outputfiltre.txt"
-PARSED_JSON = "../Data/temp_parsed_output.json"
-
-def run_cross_validation():
-    """Effectue une validation croisée sur les chaînes de Markov générées à partir de motifs fréquents."""
+def ask_order():
+    """Demande l'ordre de la chaîne de Markov jusqu'à obtenir un entier >= 1."""
+    while True:
+        try:
+            order = int(input("Veuillez entrer l'ordre de la chaîne de Markov (un entier >= 1) : "))
+            if order >= 1:
+                return order
+            else:
+                print("L'ordre doit être un entier strictement supérieur ou égal à 1.")
+        except ValueError:
+            print("Entrée invalide. Veuillez entrer un entier valide.")
+
+def run_fold(task):
+    """
+    Exécute un fold complet dans un dossier temporaire qui lui est propre (exécuté dans un processus de travail).
+
+    Args:
+        task (tuple): (numéro du fold, séquences d'entraînement, séquences de test, ordre, utilisation du cache).
+
+    Returns:
+        tuple: (numéro du fold, score, total, mesures des étapes du fold)
+    """
+    fold, train_sequences, test_sequences, order, use_cache = task
+
+    with start_run(f"fold{fold + 1}", report_dir=None) as fold_report, tempfile.TemporaryDirectory(prefix=f"cv_fold{fold + 1}_") as workspace:
+        # === FICHIERS TEMPORAIRES DU FOLD ===
+        train_file = os.path.join(workspace, "temp_train.txt")
+        test_file = os.path.join(workspace, "temp_test.txt")
+        output_spmf = os.path.join(workspace, "spmf_output.txt")
+
+        write_sequences(train_sequences, train_file)
+        write_sequences(test_sequences, test_file)
+
+        # Les séquences de test restent en IDs entiers, comme les motifs
+        test_sequences = read_spmf_sequences(test_file, as_int=True)
+
+        # Étape 1 : Extraction et filtrage des motifs avec PrefixSpan (IDs entiers)
+        # (les motifs dont un port n'a pas de nom valide sont écartés, comme avec sequences.txt)
+        port_to_id = load_json(PORT_MAPPING_FILE)
+        port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
+        cache = PatternCache() if use_cache else None
+        motifs, _ = mine_patterns(spmf_input_file=train_file, spmf_output_file=output_spmf, cache=cache, port_id_to_name=port_id_to_name)
+
+        # Étape 2 : Construction de la matrice de transition
+        model = TransitionModel.from_patterns(motifs, order=order)
+
+        # Étape 3 : Évaluation du modèle sur les séquences de test
+        score, total, avg = evaluate_batch(test_sequences, model)
+
+    return fold, score, total, fold_report.to_dict()
+
+def run_cross_validation(order, workers=None, use_cache=True):
+    """
+    Effectue une validation croisée sur les chaînes de Markov générées à partir de motifs fréquents.
+
+    Args:
+        order (int): Ordre de la chaîne de Markov.
+        workers (int, optional): Nombre de processus (par défaut : un par fold).
+        use_cache (bool): Réutiliser les motifs déjà extraits pour un même fold (cache disque).
+    """
     sequences = read_sequences(INPUT_FILE)
     scores = []
 
     K = int(1 / (1 - 0.8))  # K = 5 si test = 20%
-    
-    for fold in range(K):
-        print(f"\n[Fold {fold + 1}/{K}]")
-        
-        if fold == 0:
-            train_sequences, test_sequences = split_sequences(sequences, train_ratio=0.8, test_window_index=fold, shuffle=True, seed=2)
-        else:
-            train_sequences, test_sequences = split_sequences(sequences, train_ratio=0.8, test_window_index=fold, shuffle=False)
-        
-        write_sequences(train_sequences, TRAIN_FILE)
-        write_sequences(test_sequences, TEST_FILE)
-
-        port_to_id = load_json("../Data/port_mapping.json")
-        port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
-
-        test_encoded = read_spmf_sequences(TEST_FILE)
-        test_sequences = decode_sequences(test_encoded, port_id_to_name)
 
-        # Étape 1 : Extraction de motifs avec PrefixSpan
-        _, _ = run_prefixspan(port_id_to_name, spmf_input_file=TRAIN_FILE, spmf_output_file=OUTPUT_SPMF)
+    # Découpage séquentiel (le premier fold mélange les séquences), puis exécution parallèle
+    folds = cross_validation_folds(sequences, k=K, train_ratio=0.8, seed=2)
+    tasks = [(fold, train_sequences, test_sequences, order, use_cache) for fold, (train_sequences, test_sequences) in enumerate(folds)]
 
-        # Étape 2 : Parsing des motifs extraits
-        parse_sequence_file("text_files/sequences.txt", PARSED_JSON)
+    with span("folds", folds=K, workers=workers or K), ProcessPoolExecutor(max_workers=workers or K) as executor:
+        results = list(executor.map(run_fold, tasks))
 
-        # Étape 3 : Construction de la matrice de transition
-        try:
-            with open(PARSED_JSON, "r") as f:
-                sequences1 = json.load(f)
-        except FileNotFoundError:
-            print("Le fichier 'output_sequences.json' est introuvable.")
-            exit()
-
-        transition_probabilities = compute_transition_probabilities(sequences1, order=ORDER)
+    # Mesures des étapes de chaque fold (processus de travail), ajoutées au rapport de l'exécution
+    report = current_report()
+    if report is not None:
+        for *_, fold_report in results:
+            report.add_child(fold_report)
 
-        # Étape 4 : Évaluation du modèle sur les séquences de test
-        score, total, avg = evaluate_multiple_sequences(test_sequences, transition_probabilities, x=ORDER)
-        
+    for fold, score, total, _ in results:
+        print(f"\n[Fold {fold + 1}/{K}]")
         avg_prec = score / total * 100
-        print(f"\nScore total : {score}/{total} → Précision moyenne : {avg_prec:.2f}%")
+        print(f"Score total : {score}/{total} → Précision moyenne : {avg_prec:.2f}%")
         scores.append(avg_prec)
         print(f"[Score] Fold {fold+1}: {avg_prec:.4f}%")
 
@@ -97,4 +125,13 @@ def run_cross_validation():
     print(f"Écart type : {std_score:.4f}%")
 
 if __name__ == "__main__":
-    run_cross_validation()
+    parser = argparse.ArgumentParser(description="Validation croisée des chaînes de Markov construites sur les motifs fréquents.")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : un par fold)")
+    parser.add_argument("--no-cache", action="store_true", help="toujours relancer l'extraction des motifs")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    order = ask_order()
+    with start_run("cross_validation_markov_from_patterns") as report:
+        report.metadata["order"] = order
+        run_cross_validation(order, workers=args.workers, use_cache=not args.no_cache)
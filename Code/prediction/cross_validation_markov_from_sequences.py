@@ -2,12 +2,15 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import tempfile
 import numpy as np
-from prediction.markov_from_sequences import compute_transition_probabilities_from_sequences
-from prediction.sequence_splitter import read_sequences, write_sequences, split_sequences
-from prediction.evaluate import evaluate_multiple_sequences
-from models.baseEntier import load_json
-from prediction.markov_from_sequences import decode_sequences,read_spmf_sequences
+from concurrent.futures import ProcessPoolExecutor
+from prediction.transition_model import TransitionModel
+from prediction.sequence_splitter import read_sequences, write_sequences, cross_validation_folds
+from prediction.evaluate import evaluate_batch
+from prediction.markov_from_sequences import read_spmf_sequences
+from processing.instrumentation import start_run, span, current_report, add_report_arguments
 
 """
 Description du script :
@@ -16,62 +19,86 @@ sans extraction de motifs. Il divise les données, construit un modèle de trans
 sur les séquences de test.
 
 Les résultats sont agrégés sur K folds pour produire une évaluation moyenne.
+Les folds sont exécutés en parallèle (un processus par fold, --workers N pour limiter), chacun dans son propre
+dossier temporaire.
 """
 
 # === CONFIGURATION ===
 INPUT_FILE = "text_files/spmf_input.txt"
 
-while True:
-    try:
-        ORDER = int(input("Veuillez entrer l'ordre de la chaîne de Markov (un entier >= 1) : "))
-        if ORDER >= 1:
-            break
-        else:
-            print("L'ordre doit être un entier strictement supérieur ou égal à 1.")
-    except ValueError:
-        print("Entrée invalide. Veuillez entrer un entier valide.")
-
-# === FICHIERS TEMPORAIRES ===
-TRAIN_FILE = "text_files/temp_train.txt"
-TEST_FILE = "text_files/temp_test.txt"
-
-def run_cross_validation():
-    """Effectue la validation croisée sur chaînes de Markov basées sur des séquences complètes (brutes)."""
-    sequences = read_sequences(INPUT_FILE)
-    scores = []
+def ask_order():
+    """Demande l'ordre de la chaîne de Markov jusqu'à obtenir un entier >= 1."""
+    while True:
+        try:
+            order = int(input("Veuillez entrer l'ordre de la chaîne de Markov (un entier >= 1) : "))
+            if order >= 1:
+                return order
+            else:
+                print("L'ordre doit être un entier strictement supérieur ou égal à 1.")
+        except ValueError:
+            print("Entrée invalide. Veuillez entrer un entier valide.")
+
+def run_fold(task):
+    """
+    Exécute un fold dans un dossier temporaire qui lui est propre (exécuté dans un processus de travail).
+
+    Args:
+        task (tuple): (numéro du fold, séquences d'entraînement, séquences de test, ordre).
+
+    Returns:
+        tuple: (numéro du fold, score, total, mesures des étapes du fold)
+    """
+    fold, train_sequences, test_sequences, order = task
+
+    with start_run(f"fold{fold + 1}", report_dir=None) as fold_report, tempfile.TemporaryDirectory(prefix=f"cv_fold{fold + 1}_") as workspace:
+        # === FICHIERS TEMPORAIRES DU FOLD ===
+        train_file = os.path.join(workspace, "temp_train.txt")
+        test_file = os.path.join(workspace, "temp_test.txt")
+
+        write_sequences(train_sequences, train_file)
+        write_sequences(test_sequences, test_file)
+
+        # Lire les séquences (IDs entiers, sans décodage en noms de ports)
+        train_sequences = read_spmf_sequences(train_file, as_int=True)
+        test_sequences = read_spmf_sequences(test_file, as_int=True)
 
-    K = int(1 / (1 - 0.8))  # Si 80% entraînement, alors K = 5
+        # Modèle de Markov sur séquences brutes
+        model = TransitionModel.from_sequences(train_sequences, order=order)
 
-    for fold in range(K):
-        print(f"\n[Fold {fold + 1}/{K}]")
-        
-        if fold == 0:
-            train_sequences, test_sequences = split_sequences(sequences, train_ratio=0.8, test_window_index=fold, shuffle=True, seed=2)
-        else:
-            train_sequences, test_sequences = split_sequences(sequences, train_ratio=0.8, test_window_index=fold, shuffle=False)
+        # Évaluation
+        score, total, avg = evaluate_batch(test_sequences, model)
+    return fold, score, total, fold_report.to_dict()
+
+def run_cross_validation(order, workers=None):
+    """
+    Effectue la validation croisée sur chaînes de Markov basées sur des séquences complètes (brutes).
 
-        write_sequences(train_sequences, TRAIN_FILE)
-        write_sequences(test_sequences, TEST_FILE)
+    Args:
+        order (int): Ordre de la chaîne de Markov.
+        workers (int, optional): Nombre de processus (par défaut : un par fold).
+    """
+    sequences = read_sequences(INPUT_FILE)
+    scores = []
 
-        # Charger le mapping ID → nom de port
-        port_to_id = load_json("../Data/port_mapping.json")
-        id_to_port = {v: k for k, v in port_to_id.items()}
+    K = int(1 / (1 - 0.8))  # Si 80% entraînement, alors K = 5
 
-        # Lire et décoder les séquences
-        train_encoded = read_spmf_sequences(TRAIN_FILE)
-        train_sequences = decode_sequences(train_encoded, id_to_port)
+    # Découpage séquentiel (le premier fold mélange les séquences), puis exécution parallèle
+    folds = cross_validation_folds(sequences, k=K, train_ratio=0.8, seed=2)
+    tasks = [(fold, train_sequences, test_sequences, order) for fold, (train_sequences, test_sequences) in enumerate(folds)]
 
-        test_encoded = read_spmf_sequences(TEST_FILE)
-        test_sequences = decode_sequences(test_encoded, id_to_port)
+    with span("folds", folds=K, workers=workers or K), ProcessPoolExecutor(max_workers=workers or K) as executor:
+        results = list(executor.map(run_fold, tasks))
 
-        # Modèle de Markov sur séquences brutes
-        transition_probabilities = compute_transition_probabilities_from_sequences(train_sequences, order=ORDER)
+    # Mesures des étapes de chaque fold (processus de travail), ajoutées au rapport de l'exécution
+    report = current_report()
+    if report is not None:
+        for *_, fold_report in results:
+            report.add_child(fold_report)
 
-        # Évaluation
-        score, total, avg = evaluate_multiple_sequences(test_sequences, transition_probabilities, x=ORDER)
+    for fold, score, total, _ in results:
+        print(f"\n[Fold {fold + 1}/{K}]")
         avg_prec = score / total * 100
-
-        print(f"\nScore total : {score}/{total} → Précision moyenne : {avg_prec:.2f}%")
+        print(f"Score total : {score}/{total} → Précision moyenne : {avg_prec:.2f}%")
         scores.append(avg_prec)
         print(f"[Score] Fold {fold+1}: {avg_prec:.4f}%")
 
@@ -83,4 +110,12 @@ def run_cross_validation():
     print(f"Écart type : {std_score:.4f}%")
 
 if __name__ == "__main__":
-    run_cross_validation()
+    parser = argparse.ArgumentParser(description="Validation croisée des chaînes de Markov construites sur les séquences brutes.")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : un par fold)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    order = ask_order()
+    with start_run("cross_validation_markov_from_sequences") as report:
+        report.metadata["order"] = order
+        run_cross_validation(order, workers=args.workers)
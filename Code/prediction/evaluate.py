@@ -1,5 +1,8 @@
+import numpy as np
 from prediction.markov_from_patterns import *
 from prediction.markov_from_sequences import *
+from prediction.transition_model import TransitionModel, sliding_windows
+from processing.instrumentation import instrumented
 
 def read_spmf_sequences(file_path):
     """Lit un fichier SPMF et retourne une liste de séquences (chaque séquence est une liste d'IDs en string)."""
@@ -45,6 +48,7 @@ def evaluate_prediction_on_test_sequence(test_sequence, transition_probabilities
             total += 1
     return score, total
 
+@instrumented(records=lambda result: result[1])
 def evaluate_multiple_sequences(test_sequences, transition_probabilities, x):
     total_score = 0
     total_predictions = 0
@@ -57,3 +61,70 @@ def evaluate_multiple_sequences(test_sequences, transition_probabilities, x):
         return 0, 0, 0.0
     average_precision = total_score / total_predictions
     return total_score, total_predictions, average_precision
+
+@instrumented(records=lambda result: result[1])
+def evaluate_batch(test_sequences, model):
+    """
+    Évalue un TransitionModel sur toutes les séquences de test en une seule passe vectorisée.
+    Donne le même résultat que evaluate_multiple_sequences(test_sequences, model.to_dict(), model.order).
+
+    Les séquences de test sont découpées une seule fois en fenêtres glissantes (contexte -> port réel),
+    les contextes sont retrouvés en bloc, et la prédiction de chaque contexte est lue dans
+    les argmax précalculés du modèle.
+
+    Args:
+        test_sequences (list[list]): Séquences de test (mêmes ports que l'entraînement).
+        model (TransitionModel): Modèle de transition.
+
+    Returns:
+        tuple: (score, total, average_precision)
+    """
+    contexts, actual_next, _ = sliding_windows(model.encode(test_sequences), model.order)
+    context_ids = model.lookup_contexts(contexts)
+
+    # Seules les positions dont le contexte est connu sont évaluées (comme evaluate_multiple_sequences)
+    known = context_ids >= 0
+    total_predictions = int(known.sum())
+    if total_predictions == 0:
+        return 0, 0, 0.0
+
+    total_score = int((model.best_ports[context_ids[known]] == actual_next[known]).sum())
+    average_precision = total_score / total_predictions
+    return total_score, total_predictions, average_precision
+
+@instrumented(records=lambda result: result["total"])
+def evaluate_ranking(test_sequences, model, ks=(1, 3, 5)):
+    """
+    Calcule en une seule passe vectorisée la précision top-k (pour plusieurs k) et le rang réciproque moyen (MRR).
+
+    Les candidats de chaque contexte sont déjà triés dans le modèle (ranked_ports) : le rang du port réel
+    est lu directement (recherche dichotomique du couple contexte/port), sans retrier les listes (port, probabilité).
+    Comme evaluate_batch, seules les positions dont le contexte est connu sont évaluées ; le top-1 est
+    donc identique à la précision de evaluate_batch.
+
+    Args:
+        test_sequences (list[list]): Séquences de test (mêmes ports que l'entraînement).
+        model (TransitionModel): Modèle de transition.
+        ks (tuple[int]): Valeurs de k pour la précision top-k.
+
+    Returns:
+        dict: {"total": n, "top_k": {k: précision}, "mrr": rang réciproque moyen}
+    """
+    contexts, actual_next, _ = sliding_windows(model.encode(test_sequences), model.order)
+    context_ids = model.lookup_contexts(contexts)
+
+    known = context_ids >= 0
+    total_predictions = int(known.sum())
+    if total_predictions == 0:
+        return {"total": 0, "top_k": {k: 0.0 for k in ks}, "mrr": 0.0}
+
+    ranks = model.ranks(context_ids[known], actual_next[known])
+    hits = ranks > 0
+    reciprocal = np.zeros(len(ranks))
+    reciprocal[hits] = 1.0 / ranks[hits]
+
+    return {
+        "total": total_predictions,
+        "top_k": {k: float(np.count_nonzero(hits & (ranks <= k)) / total_predictions) for k in ks},
+        "mrr": float(reciprocal.mean()),
+    }
@@ -2,52 +2,45 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import json
-from prediction.markov_from_patterns import compute_transition_probabilities
+from prediction.context_trie import ContextTrie
+from prediction.backoff_predictor import BackoffPredictor
+from prediction.evaluate import evaluate_batch, evaluate_ranking
+from prediction.markov_from_sequences import read_spmf_sequences
+from models.runPrefixSpan import mine_patterns
+from processing.pattern_cache import PatternCache
 from models.baseEntier import load_json
-from prediction.evaluate import evaluate_multiple_sequences
-from prediction.markov_from_sequences import read_spmf_sequences, decode_sequences
-from prediction.markov_from_sequences import decode_sequences,read_spmf_sequences
-from models.runPrefixSpan import run_prefixspan
-from prediction.motif_to_json import parse_sequence_file
+from processing.instrumentation import start_run
 
 # === CONFIGURATION ===
 ORDERS_TO_TEST = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+TOP_K = (1, 3, 5)
 TRAIN_FILE = "text_files/sequence_train.txt"
 TEST_FILE = "text_files/sequence_test.txt"
 SPMF_OUTPUT = "text_files/spmf_output.txt"
-SEQUENCES_JSON = "../Data/temp_parsed_output.json"
+PORT_MAPPING_FILE = "../Data/port_mapping.json"
 
-def run_evaluation_for_multiple_orders_motifs():
-    # Charger le mapping port
-    port_to_id = load_json("../Data/port_mapping.json")
-    id_to_port = {v: k for k, v in port_to_id.items()}
-
-    # Charger et décoder les séquences de test
-    test_encoded = read_spmf_sequences(TEST_FILE)
-    test_sequences = decode_sequences(test_encoded, id_to_port)
+def run_evaluation_for_multiple_orders_motifs(use_cache=True):
+    # Charger les séquences de test (IDs entiers, comme les motifs)
+    test_sequences = read_spmf_sequences(TEST_FILE, as_int=True)
 
     print("\n=== ÉVALUATION À PARTIR DE MOTIFS POUR DIFFÉRENTS ORDRES ===")
     results = []
 
-    # Générer les motifs à partir de l'entraînement
+    # Générer et filtrer les motifs à partir de l'entraînement, sans passer par les noms de ports
     print("[Étape 1] Extraction des motifs avec PrefixSpan...")
-    run_prefixspan(id_to_port, spmf_input_file=TRAIN_FILE, spmf_output_file=SPMF_OUTPUT)
-
-    print("[Étape 2] Parsing du fichier motifs en JSON...")
-    parse_sequence_file("text_files/sequences.txt", SEQUENCES_JSON)
+    # (les motifs dont un port n'a pas de nom valide sont écartés, comme avec sequences.txt)
+    port_to_id = load_json(PORT_MAPPING_FILE)
+    port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
+    cache = PatternCache() if use_cache else None
+    motifs, _ = mine_patterns(spmf_input_file=TRAIN_FILE, spmf_output_file=SPMF_OUTPUT, cache=cache, port_id_to_name=port_id_to_name)
 
-    try:
-        with open(SEQUENCES_JSON, "r") as f:
-            motifs = json.load(f)
-    except FileNotFoundError:
-        print("Le fichier JSON des motifs est introuvable.")
-        return
+    # Comptage unique de tous les ordres, chaque modèle est ensuite lu sur le trie
+    trie = ContextTrie.from_patterns(motifs, max_order=max(ORDERS_TO_TEST))
 
     for order in ORDERS_TO_TEST:
         print(f"\n[Ordre {order}]")
-        transition_probabilities = compute_transition_probabilities(motifs, order=order)
-        score, total, avg = evaluate_multiple_sequences(test_sequences, transition_probabilities, x=order)
+        model = trie.model(order)
+        score, total, avg = evaluate_batch(test_sequences, model)
         # Vérifier la division par zéro
         if total > 0:
             precision = score / total * 100
@@ -56,9 +49,23 @@ def run_evaluation_for_multiple_orders_motifs():
         results.append((order, precision))
         print(f"Score : {score}/{total} → Précision : {precision:.2f}%")
 
+        # Précision top-k et rang réciproque moyen (même passe sur les candidats triés du modèle)
+        ranking = evaluate_ranking(test_sequences, model, TOP_K)
+        top_k = " | ".join(f"Top-{k} : {accuracy * 100:.2f}%" for k, accuracy in ranking["top_k"].items())
+        print(f"{top_k} | MRR : {ranking['mrr']:.4f}")
+
+    # Prédicteur à repli sur le même trie : toutes les positions de test reçoivent une prédiction
+    score, total, precision, order_counts = BackoffPredictor(trie).evaluate(test_sequences)
+    print(f"\n[Repli de l'ordre {trie.max_order} à 0]")
+    print(f"Score : {score}/{total} → Précision : {precision * 100:.2f}%")
+    print("Prédictions par ordre utilisé : " + ", ".join(f"{order}: {count}" for order, count in enumerate(order_counts.tolist())))
+
     print("\n--- Résumé ---")
     for order, prec in results:
         print(f"Ordre {order} : {prec:.2f}%")
+    print(f"Repli (ordre max {trie.max_order}) : {precision * 100:.2f}%")
 
 if __name__ == "__main__":
-    run_evaluation_for_multiple_orders_motifs()
+    # --no-cache : toujours relancer l'extraction des motifs
+    with start_run("evaluate_markov_patern_multiple_orders"):
+        run_evaluation_for_multiple_orders_motifs(use_cache="--no-cache" not in sys.argv)
@@ -2,34 +2,33 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from prediction.markov_from_sequences import compute_transition_probabilities_from_sequences
-from models.baseEntier import load_json
-from prediction.evaluate import evaluate_multiple_sequences
-from prediction.markov_from_sequences import read_spmf_sequences, decode_sequences
+from prediction.context_trie import ContextTrie
+from prediction.backoff_predictor import BackoffPredictor
+from prediction.evaluate import evaluate_batch, evaluate_ranking
+from prediction.markov_from_sequences import read_spmf_sequences
+from processing.instrumentation import start_run
 
 # === CONFIGURATION ===
 ORDERS_TO_TEST = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+TOP_K = (1, 3, 5)
 TRAIN_FILE = "text_files/sequence_train.txt"
 TEST_FILE = "text_files/sequence_test.txt"
 
 def run_evaluation_for_multiple_orders():
-    # Charger le mapping ID -> nom port
-    port_to_id = load_json("../Data/port_mapping.json")
-    id_to_port = {v: k for k, v in port_to_id.items()}
-
-    # Charger et décoder les séquences
-    train_encoded = read_spmf_sequences(TRAIN_FILE)
-    test_encoded = read_spmf_sequences(TEST_FILE)
-    train_sequences = decode_sequences(train_encoded, id_to_port)
-    test_sequences = decode_sequences(test_encoded, id_to_port)
+    # Charger les séquences (IDs entiers, sans décodage en noms de ports)
+    train_sequences = read_spmf_sequences(TRAIN_FILE, as_int=True)
+    test_sequences = read_spmf_sequences(TEST_FILE, as_int=True)
 
     print("\n=== ÉVALUATION POUR DIFFÉRENTS ORDRES ===")
     results = []
 
+    # Comptage unique de tous les ordres, chaque modèle est ensuite lu sur le trie
+    trie = ContextTrie.from_sequences(train_sequences, max_order=max(ORDERS_TO_TEST))
+
     for order in ORDERS_TO_TEST:
         print(f"\n[Ordre {order}]")
-        transition_probabilities = compute_transition_probabilities_from_sequences(train_sequences, order=order)
-        score, total, avg = evaluate_multiple_sequences(test_sequences, transition_probabilities, x=order)
+        model = trie.model(order)
+        score, total, avg = evaluate_batch(test_sequences, model)
         # Vérifier la division par zéro
         if total > 0:
             precision = score / total * 100
@@ -38,9 +37,22 @@ def run_evaluation_for_multiple_orders():
         results.append((order, precision))
         print(f"Score : {score}/{total} → Précision : {precision:.2f}%")
 
+        # Précision top-k et rang réciproque moyen (même passe sur les candidats triés du modèle)
+        ranking = evaluate_ranking(test_sequences, model, TOP_K)
+        top_k = " | ".join(f"Top-{k} : {accuracy * 100:.2f}%" for k, accuracy in ranking["top_k"].items())
+        print(f"{top_k} | MRR : {ranking['mrr']:.4f}")
+
+    # Prédicteur à repli sur le même trie : toutes les positions de test reçoivent une prédiction
+    score, total, precision, order_counts = BackoffPredictor(trie).evaluate(test_sequences)
+    print(f"\n[Repli de l'ordre {trie.max_order} à 0]")
+    print(f"Score : {score}/{total} → Précision : {precision * 100:.2f}%")
+    print("Prédictions par ordre utilisé : " + ", ".join(f"{order}: {count}" for order, count in enumerate(order_counts.tolist())))
+
     print("\n--- Résumé ---")
     for order, prec in results:
         print(f"Ordre {order} : {prec:.2f}%")
+    print(f"Repli (ordre max {trie.max_order}) : {precision * 100:.2f}%")
 
 if __name__ == "__main__":
-    run_evaluation_for_multiple_orders()
+    with start_run("evaluate_markov_sequence_multiple_orders"):
+        run_evaluation_for_multiple_orders()
@@ -3,6 +3,7 @@ from collections import defaultdict
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
+from processing.instrumentation import instrumented
 
 """ 
 Description du script :
@@ -58,6 +59,7 @@ def plot_transition_matrix(transition_probabilities,file_name):
     print(f"Matrice enregistrée dans '../Data/{file_name}.png'")
 
 
+@instrumented(records=len)
 def compute_transition_probabilities(sequences, order=2):
     """
     Calcule les probabilités de transition pour une chaîne de Markov à partir des séquences de motifs.
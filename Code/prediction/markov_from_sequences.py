@@ -5,6 +5,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from collections import defaultdict
 from models.baseEntier import load_json
 from prediction.markov_from_patterns import plot_transition_matrix
+from processing.instrumentation import instrumented
 """
 Description du script :
 Ce script lit un fichier SPMF contenant des séquences de ports codées par des identifiants numériques,
@@ -13,8 +14,12 @@ d'une chaîne de Markov d'ordre n sur ces séquences. Le script permet de modél
 entre les ports selon un ordre spécifié par l'utilisateur.
 """
 
-def read_spmf_sequences(file_path):
-    """Lit un fichier SPMF (séparateurs -1 et -2) et retourne une liste de séquences (de strings)."""
+@instrumented(records=len)
+def read_spmf_sequences(file_path, as_int=False):
+    """
+    Lit un fichier SPMF (séparateurs -1 et -2) et retourne une liste de séquences
+    (de strings, ou d'IDs entiers si `as_int` est vrai).
+    """
     sequences = []
     with open(file_path, 'r') as file:
         current_seq = []
@@ -26,7 +31,7 @@ def read_spmf_sequences(file_path):
                     sequences.append(current_seq)
                     current_seq = []
             else:
-                current_seq.append(token)
+                current_seq.append(int(token) if as_int else token)
         if current_seq:
             sequences.append(current_seq)
     return sequences
@@ -39,6 +44,7 @@ def decode_sequences(sequences, id_to_port):
         decoded.append(decoded_seq)
     return decoded
 
+@instrumented(records=len)
 def compute_transition_probabilities_from_sequences(sequences, order=2):
     """Calcule les probabilités de transition d'ordre n sur un ensemble de séquences."""
     transition_counts = defaultdict(lambda: defaultdict(int))
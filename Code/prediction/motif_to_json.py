@@ -1,5 +1,10 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import json
 import re
+from processing.instrumentation import span, start_run
 
 """ 
 Description du script :
@@ -16,6 +21,18 @@ def parse_sequence_file(input_file_path, output_json_path):
         input_file_path (str): Le chemin du fichier source contenant les séquences.
         output_json_path (str): Le chemin du fichier JSON de sortie.
     """
+    with span("parse_sequence_file") as stage:
+        sequences = _parse_sequences(input_file_path)
+
+        # Écriture dans un fichier JSON
+        with open(output_json_path, 'w', encoding='utf-8') as out_file:
+            json.dump(sequences, out_file, indent=2)
+        stage.records = len(sequences)
+
+    print(f"{len(sequences)} motifs valides enregistrés dans '{output_json_path}'.")
+
+def _parse_sequences(input_file_path):
+    """Lit les motifs décodés (`{A} -> {B} #SUP: n`) d'un fichier et retourne la liste {"sequence", "support"}."""
     sequences = []
 
     with open(input_file_path, 'r', encoding='utf-8') as f:
@@ -33,15 +50,11 @@ def parse_sequence_file(input_file_path, output_json_path):
                     "sequence": items,
                     "support": int(support)
                 })
-
-    # Écriture dans un fichier JSON
-    with open(output_json_path, 'w', encoding='utf-8') as out_file:
-        json.dump(sequences, out_file, indent=2)
-
-    print(f"{len(sequences)} motifs valides enregistrés dans '{output_json_path}'.")
+    return sequences
 
 # Exemple d’utilisation :
 if __name__ == "__main__":
     input_path = "text_files/sequences.txt"
     output_path = "../Data/output_sequences.json"
-    parse_sequence_file(input_path, output_path)
+    with start_run("motif_to_json"):
+        parse_sequence_file(input_path, output_path)
@@ -0,0 +1,215 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pickle
+import argparse
+from collections import deque
+from models.baseEntier import load_json
+from prediction.transition_model import TransitionModel
+from prediction.markov_from_sequences import read_spmf_sequences
+from processing.atomic_file import atomic_write
+
+"""
+Description du script :
+Ce module définit la classe OnlineMarkovModel, une chaîne de Markov d'ordre n mise à jour au fil de l'eau.
+Chaque navire garde ses `order` derniers ports (deque) ; une nouvelle escale incrémente un seul compte
+de transition et met à jour le port le plus probable du contexte en O(order), sans reconstruire la table.
+Les égalités sont départagées par ordre de première observation, comme dans compute_transition_probabilities*
+et TransitionModel. Le modèle peut être sauvegardé périodiquement (instantané pickle écrit de façon atomique).
+
+Utilisé en script, il lit un flux de voyages (une ligne JSON par voyage, au format de `merged_voyages.json`)
+sur l'entrée standard et affiche la prédiction du prochain port après chaque voyage.
+"""
+
+class OnlineMarkovModel:
+    """
+    Chaîne de Markov d'ordre n mise à jour escale par escale.
+
+    Attributs principaux :
+        order (int): Ordre de la chaîne.
+        counts (dict): {contexte: {port suivant: [compte, rang de première observation]}}.
+        totals (dict): {contexte: nombre total de transitions observées}.
+        best (dict): {contexte: port suivant le plus probable}.
+        history (dict): {navire: deque des `order` derniers ports}.
+    """
+
+    def __init__(self, order=2, snapshot_path=None, snapshot_every=0):
+        """
+        Args:
+            order (int): Ordre de la chaîne.
+            snapshot_path (str, optional): Fichier des instantanés.
+            snapshot_every (int): Nombre d'escales entre deux instantanés (0 : jamais automatiquement).
+        """
+        if order < 1:
+            raise ValueError("L'ordre de la chaîne de Markov doit être au moins 1.")
+
+        self.order = order
+        self.counts = {}
+        self.totals = {}
+        self.best = {}
+        self.history = {}
+        self.events = 0
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+
+    @classmethod
+    def from_sequences(cls, sequences, order=2, **kwargs):
+        """
+        Initialise le modèle à partir de séquences complètes (équivalent à compute_transition_probabilities_from_sequences).
+        Les séquences servent uniquement à l'apprentissage : aucun historique de navire n'est conservé.
+        """
+        model = cls(order, **kwargs)
+        for sequence in sequences:
+            for i in range(len(sequence) - order):
+                model.observe(tuple(sequence[i:i + order]), sequence[i + order])
+        return model
+
+    def observe(self, context, next_port):
+        """
+        Ajoute une transition `context` -> `next_port` et met à jour le port le plus probable du contexte.
+
+        Args:
+            context (tuple): Les `order` ports précédents.
+            next_port: Port suivant.
+        """
+        next_ports = self.counts.get(context)
+        if next_ports is None:
+            next_ports = self.counts[context] = {}
+            self.totals[context] = 0
+
+        entry = next_ports.get(next_port)
+        if entry is None:
+            entry = next_ports[next_port] = [0, len(next_ports)]
+        entry[0] += 1
+        self.totals[context] += 1
+
+        # Seul le port incrémenté peut devenir le meilleur (égalité : le premier observé l'emporte)
+        best_port = self.best.get(context)
+        if best_port is None or best_port == next_port:
+            self.best[context] = next_port
+        else:
+            best_count, best_rank = next_ports[best_port]
+            if entry[0] > best_count or (entry[0] == best_count and entry[1] < best_rank):
+                self.best[context] = next_port
+
+    def update(self, vessel, port):
+        """
+        Enregistre une escale d'un navire (les escales consécutives dans le même port sont ignorées,
+        comme dans transform_to_integer_database).
+
+        Args:
+            vessel: Identifiant du navire (IMO ou MMSI).
+            port: Port d'escale.
+
+        Returns:
+            bool: True si l'escale a été prise en compte.
+        """
+        history = self.history.get(vessel)
+        if history is None:
+            history = self.history[vessel] = deque(maxlen=self.order)
+        elif history and history[-1] == port:
+            return False
+
+        if len(history) == self.order:
+            self.observe(tuple(history), port)
+        history.append(port)
+
+        self.events += 1
+        if self.snapshot_every and self.snapshot_path and self.events % self.snapshot_every == 0:
+            self.save(self.snapshot_path)
+        return True
+
+    def predict(self, context):
+        """Retourne le port le plus probable après `context`, ou None si le contexte est inconnu."""
+        return self.best.get(tuple(context))
+
+    def predict_next(self, vessel):
+        """Retourne le prochain port le plus probable d'un navire, ou None si son historique est trop court."""
+        history = self.history.get(vessel)
+        if history is None or len(history) < self.order:
+            return None
+        return self.best.get(tuple(history))
+
+    def candidates(self, context):
+        """Retourne la liste des (port, probabilité) après `context`, dans l'ordre de première observation."""
+        context = tuple(context)
+        next_ports = self.counts.get(context, {})
+        total = self.totals.get(context, 0)
+        return [(port, count / total) for port, (count, _) in next_ports.items()]
+
+    def to_dict(self):
+        """Convertit le modèle au format des fonctions compute_transition_probabilities*."""
+        return {context: self.candidates(context) for context in self.counts}
+
+    def to_transition_model(self):
+        """Fige l'état courant en TransitionModel (pour l'évaluation vectorisée, voir evaluate_batch)."""
+        port_index = {}
+        contexts, next_ports, weights = [], [], []
+        for context, entries in self.counts.items():
+            for port, (count, _) in entries.items():
+                contexts.append([port_index.setdefault(p, len(port_index)) for p in context])
+                next_ports.append(port_index.setdefault(port, len(port_index)))
+                weights.append(count)
+        return TransitionModel(self.order, port_index, contexts, next_ports, weights)
+
+    def save(self, path):
+        """Écrit un instantané du modèle de façon atomique (fichier temporaire puis renommage)."""
+        with atomic_write(path) as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        """Recharge un instantané écrit par `save`."""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+# === Point d'entrée principal : flux de voyages sur l'entrée standard ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mise à jour en ligne d'une chaîne de Markov à partir d'un flux de voyages (JSON Lines sur stdin).")
+    parser.add_argument("--order", type=int, default=2, help="ordre de la chaîne de Markov")
+    parser.add_argument("--train", default=None, help="fichier SPMF d'initialisation (ex. text_files/spmf_input.txt)")
+    parser.add_argument("--snapshot", default="../Data/online_model.pkl", help="fichier des instantanés")
+    parser.add_argument("--snapshot-every", type=int, default=1000, help="escales entre deux instantanés")
+    parser.add_argument("--resume", action="store_true", help="repartir du dernier instantané")
+    args = parser.parse_args()
+
+    # Classe importée depuis son module pour que les instantanés soient relisibles hors de ce script
+    from prediction.online_model import OnlineMarkovModel
+
+    port_to_id = load_json("../Data/port_mapping.json")
+    id_to_port = {port_id: port_name for port_name, port_id in port_to_id.items()}
+
+    if args.resume and os.path.exists(args.snapshot):
+        model = OnlineMarkovModel.load(args.snapshot)
+        model.snapshot_path, model.snapshot_every = args.snapshot, args.snapshot_every
+    elif args.train:
+        model = OnlineMarkovModel.from_sequences(
+            read_spmf_sequences(args.train, as_int=True), args.order,
+            snapshot_path=args.snapshot, snapshot_every=args.snapshot_every
+        )
+    else:
+        model = OnlineMarkovModel(args.order, snapshot_path=args.snapshot, snapshot_every=args.snapshot_every)
+
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            voyage = json.loads(line)
+            vessel = voyage.get("imo") or voyage.get("mmsi")
+            if not vessel:
+                continue
+
+            # Un voyage = escale au départ puis à l'arrivée (ports inconnus du mapping ignorés)
+            for port_name in (voyage.get("departure_port"), voyage.get("arrival_port")):
+                if port_name in port_to_id:
+                    model.update(vessel, port_to_id[port_name])
+
+            prediction = model.predict_next(vessel)
+            print(json.dumps({
+                "vessel": vessel,
+                "next_port": id_to_port.get(prediction) if prediction is not None else None
+            }), flush=True)
+    finally:
+        model.save(args.snapshot)
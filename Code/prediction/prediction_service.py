@@ -0,0 +1,295 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gc
+import json
+import time
+import random
+import pickle
+import signal
+import asyncio
+import argparse
+import tempfile
+from models.baseEntier import load_json
+from prediction.transition_model import TransitionModel
+from prediction.markov_from_sequences import read_spmf_sequences
+from processing.atomic_file import atomic_write
+
+"""
+Description du script :
+Service local de prédiction du prochain port, qui garde en mémoire un modèle de transition précompilé.
+
+- `--build` : construit le modèle (TransitionModel sur les IDs entiers) à partir d'un fichier SPMF et l'écrit
+  dans un fichier pickle (écriture atomique). Un instantané d'OnlineMarkovModel est aussi accepté au chargement.
+- Sans `--build` : démarre un serveur asyncio (socket Unix avec --socket, sinon TCP) qui échange des lignes JSON :
+    {"ports": ["FRLEH", "GBFXT"], "top": 3}          -> {"next_ports": [["NLRTM", 0.5], ...]}
+    {"batch": [{"ports": [...]}, {"ports": [...]}]}  -> {"results": [{"next_ports": ...}, ...]}
+    {"vessel": "9300000", "ports": ["NLRTM"]}        -> {"vessel": "9300000", "next_ports": [...]}
+    {"reload": true}                                 -> {"reloaded": true, "contexts": n}
+  Seuls les `order` derniers ports envoyés sont utilisés. Avec "vessel", les ports envoyés complètent les
+  dernières escales déjà connues de ce navire (une escale répétée à la suite n'est comptée qu'une fois) :
+  il suffit d'envoyer la nouvelle escale pour obtenir la prédiction sur tout le contexte du navire. Une réponse ne demande qu'une recherche dans un
+  dictionnaire et une tranche des candidats déjà triés du modèle (convertis en listes Python au chargement).
+- Rechargement à chaud : requête "reload" ou signal SIGHUP. Le nouveau modèle est chargé dans un thread puis
+  remplace l'ancien en une seule affectation ; les requêtes en cours ne sont jamais interrompues. Si le
+  chargement échoue, l'erreur est signalée (réponse ou sortie d'erreur) et l'ancien modèle reste actif.
+- `--latency N` : mesure la latence de bout en bout (aller-retour sur un socket local) de N requêtes simples
+  sur des contextes du modèle et affiche p50/p99/max ; code de sortie 1 si le p99 dépasse LATENCY_TARGET_MS.
+"""
+
+MODEL_FILE = "../Data/transition_model.pkl"
+PORT_MAPPING_FILE = "../Data/port_mapping.json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TOP = 3
+MAX_REQUEST_BYTES = 16 * 1024 * 1024  # taille maximale d'une ligne de requête (lots volumineux)
+HISTORY_LENGTH = 16  # dernières escales gardées par navire (au-delà de l'ordre de tout modèle réaliste)
+LATENCY_TARGET_MS = 1.0  # objectif de latence (p99) d'une requête simple
+LATENCY_WARMUP = 200  # requêtes non mesurées avant la mesure de latence
+
+def build_model(train_file, order=2):
+    """Construit un TransitionModel sur les IDs entiers des ports d'un fichier SPMF."""
+    return TransitionModel.from_sequences(read_spmf_sequences(train_file, as_int=True), order=order)
+
+def save_model(model, path=MODEL_FILE):
+    """Écrit un modèle dans un fichier pickle de façon atomique (fichier temporaire puis renommage)."""
+    with atomic_write(path) as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_model(path=MODEL_FILE):
+    """Charge un TransitionModel (ou un instantané d'OnlineMarkovModel, figé en TransitionModel)."""
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    if hasattr(model, "to_transition_model"):
+        model = model.to_transition_model()
+    return model
+
+class PredictionService:
+    """Répond aux requêtes de prédiction à partir d'un modèle gardé en mémoire et rechargeable à chaud."""
+
+    def __init__(self, model_path=MODEL_FILE, port_mapping_file=PORT_MAPPING_FILE):
+        self.model_path = model_path
+        self.port_mapping_file = port_mapping_file
+        self.state = self._load_state()
+        self.history = {}  # navire -> dernières escales connues
+        self._reload_task = None
+
+        # Le modèle chargé vit longtemps : l'exclure du ramasse-miettes évite des pauses en cours de requête
+        gc.freeze()
+
+    def _load_state(self):
+        """
+        Charge le modèle et le mapping des ports, puis prépare des listes Python (sans NumPy dans le
+        chemin de réponse) : un seul tuple, remplacé d'un bloc au rechargement.
+        """
+        port_to_id = load_json(self.port_mapping_file)
+        id_to_port = {port_id: port_name for port_name, port_id in port_to_id.items()}
+        model = load_model(self.model_path)
+
+        # Contextes indexés par noms de ports, candidats déjà triés par probabilité décroissante
+        names = [id_to_port.get(port, str(port)) for port in model.ports]
+        contexts = {tuple(names[code] for code in row): context_id for context_id, row in enumerate(model.context_rows.tolist())}
+        ranked = list(zip([names[code] for code in model.ranked_ports.tolist()], model.ranked_probabilities.tolist()))
+        return model, contexts, model.probabilities.indptr.tolist(), ranked
+
+    async def reload(self):
+        """Recharge le modèle dans un thread puis l'active pour les requêtes suivantes."""
+        state = await asyncio.get_running_loop().run_in_executor(None, self._load_state)
+
+        # L'ancien modèle a été gelé (gc.freeze) : le dégeler avant de le remplacer pour qu'il puisse être libéré
+        gc.unfreeze()
+        self.state = state
+        gc.collect()
+        gc.freeze()
+        return len(self.state[0])
+
+    async def _reload_on_signal(self):
+        """Rechargement déclenché par SIGHUP : une erreur est signalée et l'ancien modèle reste actif."""
+        try:
+            contexts = await self.reload()
+            print(f"Modèle rechargé ({contexts} contextes)", flush=True)
+        except Exception as error:
+            print(f"Échec du rechargement, ancien modèle conservé : {type(error).__name__}: {error}", file=sys.stderr, flush=True)
+
+    def _on_sighup(self):
+        """Lance le rechargement (un seul à la fois) en gardant une référence à la tâche."""
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_running_loop().create_task(self._reload_on_signal())
+
+    def vessel_ports(self, vessel, ports):
+        """
+        Ajoute les ports envoyés aux dernières escales connues d'un navire et retourne son contexte.
+
+        Args:
+            vessel (str): Identifiant du navire (IMO ou MMSI).
+            ports (list[str]): Nouvelles escales (de la plus ancienne à la plus récente).
+
+        Returns:
+            list[str]: Dernières escales du navire (au plus HISTORY_LENGTH).
+        """
+        known = self.history.get(vessel, [])
+        for port in ports:
+            if not known or known[-1] != port:
+                known.append(port)
+        self.history[vessel] = known = known[-HISTORY_LENGTH:]
+        return known
+
+    def predict(self, ports, top=DEFAULT_TOP):
+        """
+        Retourne les `top` ports suivants les plus probables après les derniers ports donnés.
+
+        Args:
+            ports (list[str]): Derniers ports du navire (du plus ancien au plus récent).
+            top (int): Nombre de candidats à retourner.
+
+        Returns:
+            list: Liste de [port, probabilité] par probabilité décroissante (vide si le contexte est inconnu).
+        """
+        model, contexts, indptr, ranked = self.state
+        if len(ports) < model.order:
+            return []
+
+        context_id = contexts.get(tuple(ports[-model.order:]))
+        if context_id is None:
+            return []
+
+        start = indptr[context_id]
+        return [list(candidate) for candidate in ranked[start:min(start + top, indptr[context_id + 1])]]
+
+    def _answer(self, request):
+        """Répond à une requête simple {"ports": [...], "top": n}, éventuellement pour un navire ("vessel")."""
+        top = int(request.get("top", DEFAULT_TOP))
+        if "vessel" not in request:
+            return {"next_ports": self.predict(request["ports"], top)}
+
+        vessel = str(request["vessel"])
+        return {"vessel": vessel, "next_ports": self.predict(self.vessel_ports(vessel, request.get("ports", [])), top)}
+
+    async def handle(self, request):
+        """Traite une requête décodée (simple, par lot ou rechargement)."""
+        try:
+            if request.get("reload"):
+                return {"reloaded": True, "contexts": await self.reload()}
+            if "batch" in request:
+                return {"results": [self._answer(item) for item in request["batch"]]}
+            return self._answer(request)
+        except Exception as error:
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    async def serve_client(self, reader, writer):
+        """Traite les requêtes d'un client (une ligne JSON par requête et par réponse)."""
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    response = await self.handle(json.loads(line))
+                except json.JSONDecodeError as error:
+                    response = {"error": f"JSON invalide : {error}"}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def measure_latency(self, count=10000, top=DEFAULT_TOP, seed=0):
+        """
+        Mesure la latence de bout en bout de requêtes simples envoyées une à une sur un socket local
+        (socket Unix si disponible, sinon TCP), client et serveur dans le même processus.
+
+        Args:
+            count (int): Nombre de requêtes mesurées (contextes tirés au hasard parmi ceux du modèle).
+            top (int): Nombre de candidats demandés.
+            seed (int): Graine du tirage des contextes.
+
+        Returns:
+            dict: Latences en ms (p50, p99, max) et nombre de requêtes.
+        """
+        contexts = list(self.state[1]) or [()]
+        rng = random.Random(seed)
+        requests = [
+            json.dumps({"ports": list(rng.choice(contexts)), "top": top}).encode("utf-8") + b"\n"
+            for _ in range(LATENCY_WARMUP + count)
+        ]
+
+        with tempfile.TemporaryDirectory(prefix="prediction_service_") as workspace:
+            if hasattr(asyncio, "start_unix_server"):
+                socket_path = os.path.join(workspace, "latency.sock")
+                server = await asyncio.start_unix_server(self.serve_client, path=socket_path, limit=MAX_REQUEST_BYTES)
+                reader, writer = await asyncio.open_unix_connection(socket_path, limit=MAX_REQUEST_BYTES)
+            else:
+                server = await asyncio.start_server(self.serve_client, host=DEFAULT_HOST, port=0, limit=MAX_REQUEST_BYTES)
+                reader, writer = await asyncio.open_connection(DEFAULT_HOST, server.sockets[0].getsockname()[1], limit=MAX_REQUEST_BYTES)
+
+            latencies = []
+            async with server:
+                for index, request in enumerate(requests):
+                    start_time = time.perf_counter()
+                    writer.write(request)
+                    await writer.drain()
+                    await reader.readline()
+                    if index >= LATENCY_WARMUP:
+                        latencies.append((time.perf_counter() - start_time) * 1000)
+                writer.close()
+                await writer.wait_closed()
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "p50_ms": latencies[len(latencies) // 2],
+            "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            "max_ms": latencies[-1],
+        }
+
+    async def serve(self, socket_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Démarre le serveur (socket Unix si `socket_path` est donné, sinon TCP) jusqu'à interruption."""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self.serve_client, path=socket_path, limit=MAX_REQUEST_BYTES)
+            address = socket_path
+        else:
+            server = await asyncio.start_server(self.serve_client, host=host, port=port, limit=MAX_REQUEST_BYTES)
+            address = f"{host}:{port}"
+
+        # SIGHUP : rechargement à chaud du modèle
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(signal.SIGHUP, self._on_sighup)
+
+        print(f"Service de prédiction prêt sur {address} (ordre {self.state[0].order}, {len(self.state[0])} contextes)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+# === Point d'entrée principal ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service local de prédiction du prochain port.")
+    parser.add_argument("--build", action="store_true", help="construire le modèle puis quitter")
+    parser.add_argument("--train", default="text_files/spmf_input.txt", help="avec --build : fichier SPMF d'entraînement")
+    parser.add_argument("--order", type=int, default=2, help="avec --build : ordre de la chaîne de Markov")
+    parser.add_argument("--model", default=MODEL_FILE, help="fichier du modèle précompilé")
+    parser.add_argument("--socket", default=None, help="chemin d'un socket Unix (sinon TCP)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=int, default=None, metavar="N", help="mesurer la latence de N requêtes puis quitter")
+    args = parser.parse_args()
+
+    if args.build:
+        start_time = time.time()
+        model = build_model(args.train, args.order)
+        save_model(model, args.model)
+        print(f"Modèle d'ordre {args.order} ({len(model)} contextes) écrit dans {args.model} en {(time.time() - start_time) * 1000:.2f} ms")
+    elif args.latency:
+        latency = asyncio.run(PredictionService(args.model).measure_latency(args.latency))
+        print(f"Latence sur {latency['requests']} requêtes : p50 {latency['p50_ms'] * 1000:.0f} µs, "
+              f"p99 {latency['p99_ms'] * 1000:.0f} µs, max {latency['max_ms'] * 1000:.0f} µs "
+              f"(objectif p99 < {LATENCY_TARGET_MS * 1000:.0f} µs)")
+        if latency["p99_ms"] >= LATENCY_TARGET_MS:
+            sys.exit(1)
+    else:
+        try:
+            asyncio.run(PredictionService(args.model).serve(args.socket, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
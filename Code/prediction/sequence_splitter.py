@@ -1,4 +1,9 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import random
+from processing.instrumentation import start_run, span
 
 """ 
 Description du script :
@@ -57,6 +62,27 @@ def split_sequences(sequences, train_ratio=0.8, test_window_index=0, shuffle=Fal
     return train_seqs, test_seqs
 
 
+def cross_validation_folds(sequences, k=5, train_ratio=0.8, seed=2):
+    """
+    Prépare d'avance les K couples (entraînement, test) de la validation croisée.
+    Le premier fold mélange les séquences (en place), les suivants réutilisent cet ordre :
+    les folds doivent donc être découpés dans l'ordre avant d'être évalués en parallèle.
+
+    Args:
+        sequences (list): Liste des séquences à diviser.
+        k (int): Nombre de folds.
+        train_ratio (float): Proportion des séquences utilisées pour l'entraînement.
+        seed (int): Graine du mélange effectué au premier fold.
+
+    Returns:
+        list: Liste de K tuples (train_seqs, test_seqs).
+    """
+    return [
+        split_sequences(sequences, train_ratio=train_ratio, test_window_index=fold, shuffle=(fold == 0), seed=seed)
+        for fold in range(k)
+    ]
+
+
 def write_sequences(sequences, file_path):
     """
     Écrit les séquences dans un fichier.
@@ -81,8 +107,10 @@ def main():
     train_file = 'text_files/sequence_train.txt'
     test_file = 'text_files/sequence_test.txt'
 
-    sequences = read_sequences(input_file)  
-    train_sequences, test_sequences = split_sequences(sequences,shuffle=True)  
+    with span("split_sequences") as stage:
+        sequences = read_sequences(input_file)
+        train_sequences, test_sequences = split_sequences(sequences,shuffle=True)
+        stage.records = len(sequences)
 
     write_sequences(train_sequences, train_file)  
     write_sequences(test_sequences, test_file)  
@@ -92,4 +120,5 @@ def main():
     print(f"Test: {len(test_sequences)} -> {test_file}")
 
 if __name__ == "__main__":
-    main()
+    with start_run("sequence_splitter"):
+        main()
@@ -0,0 +1,321 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from processing.instrumentation import instrumented
+
+"""
+Description du script :
+Ce module définit la classe TransitionModel, une chaîne de Markov d'ordre n stockée sous forme de matrice creuse.
+Les ports sont encodés en entiers, chaque contexte (suite des n derniers ports) reçoit un identifiant entier,
+et les comptes de transitions sont rangés dans une matrice SciPy CSR (contextes × ports). Les probabilités
+normalisées par ligne et le port le plus probable de chaque contexte sont précalculés à la construction.
+
+Le comptage est vectorisé (NumPy) et la mémoire ne dépend que des transitions réellement observées.
+Les égalités de probabilité sont départagées par ordre de première observation, comme dans les
+fonctions compute_transition_probabilities*.
+
+Dépendances :
+- NumPy
+- SciPy (scipy.sparse)
+"""
+
+def encode_sequences(sequences, port_index):
+    """
+    Encode des séquences de ports (noms ou IDs) en tableaux d'entiers.
+    Les ports inconnus sont ajoutés à `port_index` dans l'ordre de première apparition.
+
+    Args:
+        sequences (list[list]): Séquences de ports.
+        port_index (dict): Mapping port -> code entier (complété en place).
+
+    Returns:
+        list[np.ndarray]: Séquences encodées.
+    """
+    return [
+        np.array([port_index.setdefault(port, len(port_index)) for port in sequence], dtype=np.int32)
+        for sequence in sequences
+    ]
+
+def sliding_windows(encoded_sequences, order, weights=None):
+    """
+    Extrait toutes les transitions (contexte de `order` ports -> port suivant) en une seule opération.
+
+    Args:
+        encoded_sequences (list[np.ndarray]): Séquences encodées.
+        order (int): Longueur des contextes.
+        weights (list, optional): Poids de chaque séquence (ex. support d'un motif), 1 par défaut.
+
+    Returns:
+        tuple: (contextes (M × order), ports suivants (M,), poids (M,))
+    """
+    lengths = np.array([len(sequence) for sequence in encoded_sequences], dtype=np.int64)
+    flat = np.concatenate(encoded_sequences) if len(encoded_sequences) else np.empty(0, dtype=np.int32)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))[:-1]
+
+    # Nombre de transitions par séquence, puis position de début de chaque contexte
+    counts = np.maximum(lengths - order, 0)
+    total = int(counts.sum())
+    starts = np.arange(total) + np.repeat(offsets - (np.cumsum(counts) - counts), counts)
+
+    contexts = flat[starts[:, None] + np.arange(order)]
+    next_ports = flat[starts + order]
+
+    if weights is None:
+        transition_weights = np.ones(total)
+    else:
+        transition_weights = np.repeat(np.asarray(weights, dtype=np.float64), counts)
+
+    return contexts, next_ports, transition_weights
+
+class TransitionModel:
+    """
+    Chaîne de Markov d'ordre n sur des ports, stockée en matrice creuse.
+
+    Attributs principaux :
+        order (int): Ordre de la chaîne.
+        ports (list): Port associé à chaque code entier (colonnes de la matrice).
+        context_rows (np.ndarray): Codes des ports de chaque contexte (une ligne par contexte).
+        counts (csr_matrix): Comptes (pondérés) des transitions, contextes × ports.
+        probabilities (csr_matrix): Probabilités normalisées par ligne.
+        best_ports (np.ndarray): Code du port le plus probable de chaque contexte.
+        pair_ranks (np.ndarray): Rang de chaque transition parmi les candidats de son contexte (ordre CSR).
+    """
+
+    def __init__(self, order, ports, contexts, next_ports, weights, first_seen=None):
+        """
+        Construit le modèle à partir de transitions déjà encodées.
+
+        Args:
+            order (int): Ordre de la chaîne.
+            ports (list): Port associé à chaque code entier.
+            contexts (np.ndarray): Contextes des transitions (M × order).
+            next_ports (np.ndarray): Port suivant de chaque transition (M,).
+            weights (np.ndarray): Poids de chaque transition (M,).
+            first_seen (np.ndarray, optional): Rang de première observation de chaque transition
+                (sert à départager les égalités), par défaut l'ordre des transitions.
+        """
+        if order < 1:
+            raise ValueError("L'ordre de la chaîne de Markov doit être au moins 1.")
+
+        self.order = order
+        self.ports = list(ports)
+        self.port_index = {port: code for code, port in enumerate(self.ports)}
+        port_count = len(self.ports)
+
+        contexts = np.asarray(contexts, dtype=np.int32).reshape(-1, order)
+        next_ports = np.asarray(next_ports, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if first_seen is None:
+            first_seen = np.arange(len(next_ports))
+
+        # Identifiants de contextes, numérotés par ordre de première observation
+        unique_rows, inverse = np.unique(contexts, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        context_first = np.full(len(unique_rows), np.iinfo(np.int64).max)
+        np.minimum.at(context_first, inverse, first_seen)
+        by_first_seen = np.argsort(context_first, kind="stable")
+        new_ids = np.empty(len(unique_rows), dtype=np.int64)
+        new_ids[by_first_seen] = np.arange(len(unique_rows))
+
+        self.context_rows = unique_rows[by_first_seen]
+        context_ids = new_ids[inverse]
+        context_count = len(self.context_rows)
+
+        # Agrégation des couples (contexte, port) : clés triées = ordre canonique CSR
+        keys = context_ids * port_count + next_ports
+        unique_keys, pair_inverse = np.unique(keys, return_inverse=True)
+        pair_inverse = pair_inverse.reshape(-1)
+        pair_counts = np.bincount(pair_inverse, weights=weights, minlength=len(unique_keys))
+        pair_first = np.full(len(unique_keys), np.iinfo(np.int64).max)
+        np.minimum.at(pair_first, pair_inverse, first_seen)
+
+        rows = unique_keys // max(port_count, 1)
+        columns = unique_keys % max(port_count, 1)
+        indptr = np.searchsorted(rows, np.arange(context_count + 1))
+        shape = (context_count, port_count)
+
+        row_totals = np.add.reduceat(pair_counts, indptr[:-1]) if context_count else np.empty(0)
+        pair_probabilities = pair_counts / np.repeat(row_totals, np.diff(indptr))
+
+        self.counts = csr_matrix((pair_counts, columns, indptr), shape=shape)
+        self.probabilities = csr_matrix((pair_probabilities, columns, indptr), shape=shape)
+
+        # Candidats de chaque contexte triés par probabilité décroissante (égalités : première observation)
+        ranking = np.lexsort((pair_first, -pair_counts, rows))
+        self.ranked_ports = columns[ranking]
+        self.ranked_probabilities = pair_probabilities[ranking]
+        self.best_ports = self.ranked_ports[indptr[:-1]]
+
+        # Rang (1 = plus probable) de chaque couple (contexte, port), dans l'ordre CSR
+        self.pair_ranks = np.empty(len(unique_keys), dtype=np.int64)
+        self.pair_ranks[ranking] = np.arange(len(unique_keys)) - np.repeat(indptr[:-1], np.diff(indptr)) + 1
+        self._pair_keys = unique_keys
+
+        # Ordre de première observation (ordre des listes des fonctions compute_transition_probabilities*)
+        self._first_seen_order = np.lexsort((pair_first, rows))
+
+        # Index des contextes (dictionnaire et hachages triés), construits au premier besoin
+        self._context_index = None
+        self._sorted_hashes = None
+        self._sorted_ids = None
+        self._colliding_contexts = None
+
+    @classmethod
+    @instrumented("TransitionModel.from_sequences", records=len)
+    def from_sequences(cls, sequences, order=2):
+        """
+        Construit le modèle à partir de séquences complètes (chaque transition compte 1).
+
+        Args:
+            sequences (list[list]): Séquences de ports (noms ou IDs).
+            order (int): Ordre de la chaîne.
+        """
+        port_index = {}
+        encoded = encode_sequences(sequences, port_index)
+        contexts, next_ports, weights = sliding_windows(encoded, order)
+        return cls(order, port_index, contexts, next_ports, weights)
+
+    @classmethod
+    @instrumented("TransitionModel.from_patterns", records=len)
+    def from_patterns(cls, patterns, order=2):
+        """
+        Construit le modèle à partir de motifs fréquents (chaque transition est pondérée par le support).
+
+        Args:
+            patterns (list[dict]): Motifs au format {"sequence": [...], "support": n}.
+            order (int): Ordre de la chaîne.
+        """
+        port_index = {}
+        encoded = encode_sequences([pattern["sequence"] for pattern in patterns], port_index)
+        supports = [pattern["support"] for pattern in patterns]
+        contexts, next_ports, weights = sliding_windows(encoded, order, supports)
+        return cls(order, port_index, contexts, next_ports, weights)
+
+    def __len__(self):
+        return len(self.context_rows)
+
+    @property
+    def context_index(self):
+        """Dictionnaire contexte (tuple de ports) -> identifiant du contexte."""
+        if self._context_index is None:
+            self._context_index = {
+                tuple(self.ports[code] for code in row): context_id
+                for context_id, row in enumerate(self.context_rows.tolist())
+            }
+        return self._context_index
+
+    def encode(self, sequences):
+        """Encode des séquences avec les codes du modèle (-1 pour un port jamais vu)."""
+        return [
+            np.array([self.port_index.get(port, -1) for port in sequence], dtype=np.int32)
+            for sequence in sequences
+        ]
+
+    @staticmethod
+    def _hash_contexts(contexts):
+        """Hache chaque contexte encodé en un entier 64 bits (FNV-1a appliqué colonne par colonne)."""
+        hashes = np.full(len(contexts), 0xCBF29CE484222325, dtype=np.uint64)
+        for column in np.asarray(contexts, dtype=np.int64).T:
+            hashes ^= column.astype(np.uint64)
+            hashes *= np.uint64(0x100000001B3)
+        return hashes
+
+    def _build_lookup_index(self):
+        """
+        Trie une seule fois les hachages des contextes du modèle. Les contextes dont le hachage est partagé
+        par un autre contexte (collision) sont aussi rangés dans un dictionnaire, consulté en repli.
+        """
+        hashes = self._hash_contexts(self.context_rows)
+        self._sorted_ids = np.argsort(hashes, kind="stable")
+        self._sorted_hashes = hashes[self._sorted_ids]
+
+        same_as_next = self._sorted_hashes[1:] == self._sorted_hashes[:-1]
+        colliding = np.zeros(len(hashes), dtype=bool)
+        colliding[:-1] |= same_as_next
+        colliding[1:] |= same_as_next
+        self._colliding_contexts = {
+            tuple(self.context_rows[context_id].tolist()): context_id
+            for context_id in self._sorted_ids[colliding].tolist()
+        }
+
+    def lookup_contexts(self, contexts):
+        """
+        Retrouve en une seule opération les identifiants de nombreux contextes encodés
+        (recherche dichotomique des hachages, puis vérification des contextes trouvés).
+
+        Args:
+            contexts (np.ndarray): Contextes encodés (Q × order).
+
+        Returns:
+            np.ndarray: Identifiant de chaque contexte, -1 s'il n'a jamais été observé.
+        """
+        contexts = np.asarray(contexts, dtype=np.int32).reshape(-1, self.order)
+        if len(self.context_rows) == 0:
+            return np.full(len(contexts), -1, dtype=np.int64)
+        if self._sorted_hashes is None:
+            self._build_lookup_index()
+
+        hashes = self._hash_contexts(contexts)
+        positions = np.minimum(np.searchsorted(self._sorted_hashes, hashes), len(self._sorted_hashes) - 1)
+        candidates = self._sorted_ids[positions]
+        same_hash = self._sorted_hashes[positions] == hashes
+        found = same_hash & np.all(self.context_rows[candidates] == contexts, axis=1)
+        context_ids = np.where(found, candidates, -1)
+
+        # Hachage partagé par plusieurs contextes : le premier de la plage n'est pas forcément le bon
+        if self._colliding_contexts:
+            for query in np.flatnonzero(same_hash & ~found).tolist():
+                context_ids[query] = self._colliding_contexts.get(tuple(contexts[query].tolist()), -1)
+        return context_ids
+
+    def ranks(self, context_ids, ports):
+        """
+        Rang de chaque port réel parmi les candidats triés de son contexte, en une seule opération.
+
+        Args:
+            context_ids (np.ndarray): Identifiants de contextes (>= 0).
+            ports (np.ndarray): Codes des ports réels (-1 pour un port jamais vu).
+
+        Returns:
+            np.ndarray: Rang (1 = port le plus probable), 0 si le port n'a jamais suivi ce contexte.
+        """
+        context_ids = np.asarray(context_ids, dtype=np.int64)
+        ports = np.asarray(ports, dtype=np.int64)
+        if len(self._pair_keys) == 0:
+            return np.zeros(len(ports), dtype=np.int64)
+
+        keys = context_ids * len(self.ports) + ports
+        positions = np.minimum(np.searchsorted(self._pair_keys, keys), len(self._pair_keys) - 1)
+        found = (ports >= 0) & (self._pair_keys[positions] == keys)
+        return np.where(found, self.pair_ranks[positions], 0)
+
+    def context_id(self, context):
+        """Retourne l'identifiant d'un contexte (tuple de ports), ou None s'il n'a jamais été observé."""
+        return self.context_index.get(tuple(context))
+
+    def predict(self, context):
+        """Retourne le port le plus probable après `context`, ou None si le contexte est inconnu."""
+        context_id = self.context_id(context)
+        if context_id is None:
+            return None
+        return self.ports[self.best_ports[context_id]]
+
+    def candidates(self, context):
+        """Retourne la liste des (port, probabilité) après `context` (vide si le contexte est inconnu)."""
+        context_id = self.context_id(context)
+        if context_id is None:
+            return []
+        start, end = self.probabilities.indptr[context_id], self.probabilities.indptr[context_id + 1]
+        pairs = self._first_seen_order[start:end]
+        return [
+            (self.ports[code], probability)
+            for code, probability in zip(
+                self.probabilities.indices[pairs].tolist(), self.probabilities.data[pairs].tolist()
+            )
+        ]
+
+    def to_dict(self):
+        """
+        Convertit le modèle au format des fonctions compute_transition_probabilities* :
+        {contexte: [(port, probabilité), ...]}.
+        """
+        return {context: self.candidates(context) for context in self.context_index}
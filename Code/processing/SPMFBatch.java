@@ -0,0 +1,50 @@
+import java.io.BufferedReader;
+import java.io.InputStreamReader;
+import java.lang.reflect.Method;
+
+/**
+ * SPMFBatch
+ *
+ * Petit programme qui garde une seule JVM SPMF ouverte pour enchaîner plusieurs exécutions.
+ * Lancé par `processing/runAlgoSPMF.SPMFBatchRunner` avec :
+ *     java -cp ../Data/spmf.jar processing/SPMFBatch.java
+ *
+ * Chaque ligne lue sur l'entrée standard décrit une tâche (champs séparés par des tabulations) :
+ *     algorithme  fichier_entree  fichier_sortie  parametre1  parametre2 ...
+ * La tâche est exécutée comme `java -jar spmf.jar run ...`, puis la ligne
+ * "@@SPMF_BATCH_DONE <code>" est écrite sur la sortie standard (0 = succès).
+ */
+public class SPMFBatch {
+
+    private static final String DONE_MARKER = "@@SPMF_BATCH_DONE";
+
+    public static void main(String[] args) throws Exception {
+        // Appel par réflexion : le point d'entrée du jar n'est connu qu'à l'exécution
+        Class<?> spmfMainClass = Class.forName("ca.pfv.spmf.gui.Main");
+        Method spmfMain = spmfMainClass.getMethod("main", String[].class);
+
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in));
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.isEmpty()) {
+                continue;
+            }
+
+            String[] job = line.split("\t");
+            String[] spmfArgs = new String[job.length + 1];
+            spmfArgs[0] = "run";
+            System.arraycopy(job, 0, spmfArgs, 1, job.length);
+
+            int status = 0;
+            try {
+                spmfMain.invoke(null, (Object) spmfArgs);
+            } catch (Exception e) {
+                e.printStackTrace();
+                status = 1;
+            }
+
+            System.out.println(DONE_MARKER + " " + status);
+            System.out.flush();
+        }
+    }
+}
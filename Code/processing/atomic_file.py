@@ -0,0 +1,37 @@
+"""
+atomic_file.py
+
+Écriture atomique de fichiers partagés (cache de motifs, modèles, instantanés, rapports d'exécution) :
+le contenu est écrit dans un fichier temporaire du même dossier, puis renommé sur le fichier final.
+Un lecteur (autre processus, rechargement à chaud) ne voit donc jamais un fichier à moitié écrit,
+et le fichier temporaire est supprimé si l'écriture échoue.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(path, mode='wb', **open_kwargs):
+    """
+    Ouvre un fichier temporaire qui remplace `path` à la sortie du bloc `with` (rien n'est remplacé en cas d'erreur).
+
+    Args:
+        path (str): Fichier final (son dossier est créé si besoin).
+        mode (str): Mode d'ouverture ('wb' ou 'w').
+        **open_kwargs: Autres paramètres d'ouverture (ex. encoding).
+
+    Yields:
+        file: Fichier temporaire ouvert en écriture.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -6,8 +6,25 @@ minés à partir de séquences numériques (IDs de ports) en une version lisible
 où chaque ID est remplacé par le nom du port correspondant.
 
 Typiquement utilisé pour post-traiter les résultats d’un algorithme de type PrefixSpan.
+Les fonctions `decode_pattern` et `iter_decoded_patterns` travaillent directement sur des motifs
+déjà parsés (ports, support), sans repasser par le texte SPMF.
 """
 
+from processing.instrumentation import instrumented
+
+def decode_pattern(ports, port_id_to_name):
+    """Remplace les IDs d'un motif par les noms des ports (ou "Unknown(ID)" si manquant)."""
+    return tuple(port_id_to_name.get(port, f"Unknown({port})") for port in ports)
+
+def iter_decoded_patterns(patterns, port_id_to_name):
+    """Décode en flux des motifs (ports, support) en (noms de ports, support)."""
+    return ((decode_pattern(ports, port_id_to_name), support) for ports, support in patterns)
+
+def format_named_pattern(names, support):
+    """Formate un motif décodé comme `replace_ids_with_port_names` (ex. `{FRLEH} -> {GBFXT} #SUP: 12`)."""
+    return " -> ".join("{" + name + "}" for name in names) + f" #SUP: {support}"
+
+@instrumented(records=len)
 def replace_ids_with_port_names(patterns, port_id_to_name):
     """
     Convertit une liste de motifs contenant des IDs de ports en motifs lisibles avec noms de ports.
@@ -5,25 +5,37 @@ Ce script exécute des expériences de minage de motifs séquentiels à partir d
 Il utilise l’algorithme PrefixSpan via la librairie SPMF, applique un filtrage sur les motifs extraits, 
 et calcule des métriques de performance et de complexité pour différentes valeurs de support minimum.
 
+Par défaut, les motifs sont extraits une seule fois au plus petit support, puis les motifs de chaque
+support plus élevé sont déduits par sélection dans un index trié par support (option --remine pour
+relancer l'extraction à chaque support). Les motifs de l'extraction unique sont conservés dans un cache disque
+adressé par contenu (--no-cache pour l'ignorer).
+
 Sorties :
 - Fichier contenant les motifs filtrés et traduits en noms de ports
 - Fichier avec des statistiques (nombre de motifs, temps, taille moyenne, écart type)
 
 Dépendances :
-- SPMF (via run_spmf)
+- SPMF (via run_spmf, dans une seule JVM grâce à SPMFBatchRunner)
 - NumPy
 - Modules internes : baseEntier, decode_patterns, filter_motifs
 """
 
 import os
-import time
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bisect import bisect_right
 from datetime import datetime
 import numpy as np
 
-from Code.processing.decode_patterns import replace_ids_with_port_names
-from Code.processing.filter_motifs import process_results
-from models.baseEntier import load_json, transform_to_integer_database, write_spmf_file
-from runAlgoSPMF import run_spmf
+from processing.decode_patterns import replace_ids_with_port_names
+from processing.filter_motifs import process_results
+from models.baseEntier import load_json, iter_json_records, transform_to_integer_database, write_spmf_file
+from processing.runAlgoSPMF import run_spmf, SPMFBatchRunner
+from processing.prefixspan import absolute_support, format_pattern
+from processing.pattern_cache import PatternCache
+from models.runPrefixSpan import extract_patterns
+from processing.instrumentation import start_run, span
 
 
 def calculate_metrics(patterns):
@@ -42,38 +54,82 @@ def calculate_metrics(patterns):
     return mean_length, std_dev
 
 
-if __name__ == "__main__":
-    # === Préparation des données ===
-    data = load_json("../Data/merged_voyages.json")
-    port_to_id = load_json("../Data/port_mapping.json")
-    db = transform_to_integer_database(data, port_to_id)
-    write_spmf_file(db, "text_files/spmf_input_file.txt")
+def build_support_index(patterns):
+    """
+    Construit un index des motifs trié par support décroissant.
 
-    spmf_input_file = "text_files/spmf_input_file.txt"
-    port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
+    Args:
+        patterns (List[str]): Motifs filtrés au format SPMF (`... -1 #SUP: n`).
 
-    # === Paramètres d'expérience ===
-    min_supports = np.round(np.arange(0.02, 0.21, 0.01), 2)
-    today_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    Returns:
+        tuple: (supports négatifs triés par ordre croissant, motifs dans le même ordre)
+    """
+    entries = sorted(
+        ((-int(pattern.split("#SUP:")[1]), pattern) for pattern in patterns),
+        key=lambda entry: entry[0]
+    )
+    return [key for key, _ in entries], [pattern for _, pattern in entries]
 
-    os.makedirs("experiment_results", exist_ok=True)
 
-    metrics_file = f"./experiment_results/{today_datetime}_metrics.txt"
-    patterns_file = f"./experiment_results/{today_datetime}_patterns.txt"
+def patterns_at_support(index, min_count):
+    """
+    Retourne les motifs dont le support est au moins `min_count`.
 
-    # === Boucle principale des expériences ===
-    with open(metrics_file, 'w') as metrics_f, open(patterns_file, 'w') as patterns_f:
+    Les motifs fréquents à un support s sont exactement ceux, extraits à un support plus bas,
+    dont le support vaut au moins s : il suffit donc de prendre un préfixe de l'index.
+
+    Args:
+        index (tuple): Index construit par `build_support_index`.
+        min_count (int): Support minimal absolu (nombre de séquences).
+
+    Returns:
+        List[str]: Motifs retenus, par support décroissant.
+    """
+    negated_supports, patterns = index
+    return patterns[:bisect_right(negated_supports, -min_count)]
+
+
+def count_sequences(spmf_file):
+    """Compte les séquences d'un fichier SPMF (lignes non vides), comme le fait SPMF."""
+    with open(spmf_file, 'r') as f:
+        return sum(1 for line in f if line.strip() and line.strip()[0] not in "#%@")
+
+
+def write_results(metrics_f, patterns_f, min_support, time_ms, patterns, port_id_to_name):
+    """Écrit les métriques et les motifs traduits pour un support minimum donné."""
+    updated_patterns = replace_ids_with_port_names(patterns, port_id_to_name)
+
+    # Calcul des métriques
+    num_patterns = len(patterns)
+    mean_length, std_dev = calculate_metrics(patterns)
+
+    # Sauvegarde des métriques
+    metrics_f.write(f"Support minimum: {min_support}\n")
+    metrics_f.write(f"Temps pris (ms): {time_ms:.2f}\n")
+    metrics_f.write(f"Nombre de motifs trouvés: {num_patterns}\n")
+    metrics_f.write(f"Taille moyenne des motifs: {mean_length:.2f}\n")
+    metrics_f.write(f"Écart type: {std_dev:.2f}\n\n")
+
+    # Sauvegarde des motifs
+    patterns_f.write(f"Support minimum: {min_support}\n")
+    patterns_f.writelines(updated_patterns)
+    patterns_f.write("\n")
+
+
+def run_sweep_remine(spmf_input_file, min_supports, port_id_to_name, metrics_f, patterns_f):
+    """Relance PrefixSpan (via SPMF) pour chaque support minimum."""
+    spmf_output_file = "text_files/output.txt"
+    output_file_filtre = "text_files/outputfiltre.txt"
+
+    # Une seule JVM SPMF pour tous les supports (démarrage payé une seule fois)
+    with SPMFBatchRunner() as runner:
         for min_support in min_supports:
             min_support_percentage = min_support * 100
 
-            spmf_output_file = "text_files/output.txt"
-            output_file_filtre = "text_files/outputfiltre.txt"
-
             # Lancer PrefixSpan
-            start_time = time.time()
-            run_spmf("PrefixSpan", spmf_input_file, spmf_output_file, f"{min_support_percentage}%")
-            end_time = time.time()
-            prefixspan_time_ms = (end_time - start_time) * 1000
+            with span("mining", min_support=float(min_support)) as mining:
+                run_spmf("PrefixSpan", spmf_input_file, spmf_output_file, f"{min_support_percentage}%", runner=runner)
+            prefixspan_time_ms = mining.duration_ms
 
             # Filtrage des motifs
             process_results(spmf_output_file, output_file_filtre)
@@ -81,22 +137,83 @@ if __name__ == "__main__":
             with open(output_file_filtre, 'r') as f:
                 patterns = f.readlines()
 
-            updated_patterns = replace_ids_with_port_names(patterns, port_id_to_name)
+            write_results(metrics_f, patterns_f, min_support, prefixspan_time_ms, patterns, port_id_to_name)
+
+
+def run_sweep_from_lowest_support(spmf_input_file, min_supports, port_id_to_name, metrics_f, patterns_f, engine="spmf", cache=None, workers=1):
+    """
+    Extrait les motifs une seule fois au plus petit support, puis déduit chaque support
+    plus élevé par simple sélection dans un index trié par support.
+
+    Le temps écrit pour chaque support est celui de la sélection ; le temps de l'extraction
+    unique (ou de la lecture du cache de motifs) est écrit en tête du fichier de métriques.
+    """
+    spmf_output_file = "text_files/output.txt"
+
+    # Extraction unique au support le plus bas, puis filtrage (indépendant du support)
+    with span("single_mining", min_support=float(min(min_supports))) as mining:
+        records, _ = extract_patterns(
+            min_support=min(min_supports),
+            spmf_input_file=spmf_input_file,
+            spmf_output_file=spmf_output_file,
+            engine=engine,
+            cache=cache,
+            workers=workers,
+        )
+        index = build_support_index([format_pattern(ports, support) + "\n" for ports, support in records])
+        mining.records = len(records)
+    mining_time_ms = mining.duration_ms
+
+    metrics_f.write(f"Extraction unique au support {min(min_supports)} (ms): {mining_time_ms:.2f}\n\n")
+
+    sequence_count = count_sequences(spmf_input_file)
+    for min_support in min_supports:
+        with span("selection", min_support=float(min_support)) as selection:
+            patterns = patterns_at_support(index, absolute_support(min_support, sequence_count))
+            selection.records = len(patterns)
+        selection_time_ms = selection.duration_ms
+
+        write_results(metrics_f, patterns_f, min_support, selection_time_ms, patterns, port_id_to_name)
+
+def main(remine=False, engine="spmf", cache=None, workers=1):
+    """Lance le balayage des supports minimaux et écrit les métriques et les motifs de chaque support."""
+    # === Préparation des données ===
+    data = iter_json_records("../Data/merged_voyages.json")
+    port_to_id = load_json("../Data/port_mapping.json")
+    db = transform_to_integer_database(data, port_to_id)
+    write_spmf_file(db, "text_files/spmf_input_file.txt")
+
+    spmf_input_file = "text_files/spmf_input_file.txt"
+    port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
 
-            # Calcul des métriques
-            num_patterns = len(patterns)
-            mean_length, std_dev = calculate_metrics(patterns)
+    # === Paramètres d'expérience ===
+    min_supports = np.round(np.arange(0.02, 0.21, 0.01), 2)
+    today_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-            # Sauvegarde des métriques
-            metrics_f.write(f"Support minimum: {min_support}\n")
-            metrics_f.write(f"Temps pris (ms): {prefixspan_time_ms:.2f}\n")
-            metrics_f.write(f"Nombre de motifs trouvés: {num_patterns}\n")
-            metrics_f.write(f"Taille moyenne des motifs: {mean_length:.2f}\n")
-            metrics_f.write(f"Écart type: {std_dev:.2f}\n\n")
+    os.makedirs("experiment_results", exist_ok=True)
 
-            # Sauvegarde des motifs
-            patterns_f.write(f"Support minimum: {min_support}\n")
-            patterns_f.writelines(updated_patterns)
-            patterns_f.write("\n")
+    metrics_file = f"./experiment_results/{today_datetime}_metrics.txt"
+    patterns_file = f"./experiment_results/{today_datetime}_patterns.txt"
+
+    # === Boucle principale des expériences ===
+    with open(metrics_file, 'w') as metrics_f, open(patterns_file, 'w') as patterns_f:
+        if remine:
+            run_sweep_remine(spmf_input_file, min_supports, port_id_to_name, metrics_f, patterns_f)
+        else:
+            run_sweep_from_lowest_support(spmf_input_file, min_supports, port_id_to_name, metrics_f, patterns_f, engine=engine, cache=cache, workers=workers)
 
     print("✅ L'expérience est terminée.")
+
+if __name__ == "__main__":
+    # --remine : relancer l'extraction pour chaque support (ancien comportement)
+    # --python : utiliser le moteur PrefixSpan interne pour l'extraction unique
+    # --parallel : moteur interne réparti sur tous les cœurs
+    # --no-cache : ne pas réutiliser les motifs d'une extraction identique déjà faite
+    remine = "--remine" in sys.argv
+    parallel = "--parallel" in sys.argv
+    engine = "python" if "--python" in sys.argv or parallel else "spmf"
+    workers = None if parallel else 1
+    cache = None if "--no-cache" in sys.argv else PatternCache()
+
+    with start_run("experiment"):
+        main(remine, engine, cache, workers)
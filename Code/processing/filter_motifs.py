@@ -8,41 +8,120 @@ par exemple :
   - motifs ne contenant qu’un seul port unique,
   - motifs avec moins de deux ports différents.
 
-Le résultat filtré est écrit dans un fichier de sortie.
+Le résultat filtré est écrit dans un fichier de sortie, ou renvoyé en mémoire sous forme
+de motifs d'IDs entiers (sans décodage en noms de ports).
 """
 
-def process_results(input_file, output_file):
+import re
+from processing.instrumentation import instrumented, span
+
+# Nombre minimal de ports distincts d'un motif pertinent (critère aussi appliqué pendant l'extraction, voir prefixspan.py)
+MIN_DISTINCT_PORTS = 2
+
+# Description des filtres appliqués (fait partie de la clé du cache de motifs : à modifier avec les critères)
+FILTER_SETTINGS = f"no-consecutive-repeat;min-distinct-ports={MIN_DISTINCT_PORTS}"
+
+# Noms de ports reconnus par le parsing de `sequences.txt` (motif_to_json.py : `{[A-Z0-9]+}`)
+VALID_PORT_NAME = re.compile(r"[A-Z0-9]+")
+
+def parse_pattern_line(line):
+    """
+    Lit une ligne de motif au format SPMF (ex. `5 -1 8 -1 #SUP: 12`).
+
+    Args:
+        line (str): Ligne de la sortie SPMF.
+
+    Returns:
+        tuple | None: (ports (tuple d'IDs entiers), support), ou None pour une ligne vide.
+    """
+    if not line.strip():
+        return None
+
+    # Séparer motif et support
+    motif, support = line.split("#SUP:")
+
+    # Extraire les ports (IDs numériques séparés par -1)
+    ports = tuple(int(x) for x in motif.split("-1") if x.strip().isdigit())
+    return ports, int(support)
+
+def is_relevant_pattern(ports):
     """
-    Filtre les motifs fréquents en supprimant ceux qui ne respectent pas certains critères de qualité.
+    Indique si un motif respecte les critères de qualité.
 
     Critères d'exclusion :
       1. Présence de ports consécutifs répétés (e.g., 5 -1 5)
       2. Moins de deux ports uniques (motif trivial ou vide)
-    
+    """
+    has_consecutive_repetition = any(
+        ports[i] == ports[i + 1] for i in range(len(ports) - 1)
+    )
+    return not has_consecutive_repetition and len(set(ports)) >= MIN_DISTINCT_PORTS
+
+def named_port_ids(port_id_to_name):
+    """
+    Retourne les IDs des ports dont le nom serait gardé par le parsing de `sequences.txt` : un motif qui
+    contient un autre ID (port inconnu, décodé en `Unknown(ID)`, ou nom hors `[A-Z0-9]`) y était ignoré.
+
     Args:
-        input_file (str): Chemin vers le fichier d’entrée contenant les motifs minés (format SPMF).
-        output_file (str): Chemin vers le fichier de sortie avec les motifs filtrés.
+        port_id_to_name (dict): Mapping ID -> nom de port.
+
+    Returns:
+        set[int]: IDs des ports dont le nom est valide.
     """
-    with open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
-        for line in infile:
-            if not line.strip():
-                continue  # Sauter les lignes vides
+    return {port_id for port_id, name in port_id_to_name.items() if VALID_PORT_NAME.fullmatch(name)}
+
+def iter_patterns(lines):
+    """
+    Parcourt en flux des lignes de motifs au format SPMF.
+
+    Args:
+        lines (iterable[str]): Lignes de la sortie SPMF (ex. un fichier ouvert).
+
+    Yields:
+        tuple: (ports (tuple d'IDs entiers), support) pour chaque ligne non vide.
+    """
+    for line in lines:
+        parsed = parse_pattern_line(line)
+        if parsed is not None:
+            yield parsed
+
+def iter_relevant_patterns(patterns):
+    """Ne laisse passer que les motifs (ports, support) qui respectent les critères de qualité."""
+    return (pattern for pattern in patterns if is_relevant_pattern(pattern[0]))
+
+@instrumented(records=len)
+def read_filtered_patterns(input_file):
+    """
+    Lit et filtre les motifs d'un fichier SPMF en gardant les IDs entiers.
 
-            # Séparer motif et support
-            motif, _ = line.split("#SUP:")
+    Args:
+        input_file (str): Chemin vers le fichier d’entrée contenant les motifs minés (format SPMF).
 
-            # Extraire les ports (IDs numériques séparés par -1)
-            ports = [int(x) for x in motif.split("-1") if x.strip().isdigit()]
+    Returns:
+        list[dict]: Motifs valides au format {"sequence": [IDs], "support": n}.
+    """
+    with open(input_file, 'r') as infile:
+        return [
+            {"sequence": list(ports), "support": support}
+            for ports, support in iter_relevant_patterns(iter_patterns(infile))
+        ]
 
-            # Vérifications
-            unique_ports = set(ports)
-            has_consecutive_repetition = any(
-                ports[i] == ports[i + 1] for i in range(len(ports) - 1)
-            )
+def process_results(input_file, output_file):
+    """
+    Filtre les motifs fréquents en supprimant ceux qui ne respectent pas certains critères de qualité
+    (voir `is_relevant_pattern`).
 
-            # Filtrage selon les critères
-            if has_consecutive_repetition or len(unique_ports) < 2:
-                continue  # Motif exclu
+    Args:
+        input_file (str): Chemin vers le fichier d’entrée contenant les motifs minés (format SPMF).
+        output_file (str): Chemin vers le fichier de sortie avec les motifs filtrés.
+    """
+    with span("process_results") as stage, open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
+        stage.records = 0
+        for line in infile:
+            parsed = parse_pattern_line(line)
+            if parsed is None or not is_relevant_pattern(parsed[0]):
+                continue  # Ligne vide ou motif exclu
 
             # Motif valide : écrire dans le fichier de sortie
             outfile.write(line)
+            stage.records += 1
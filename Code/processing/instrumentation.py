@@ -0,0 +1,296 @@
+"""
+instrumentation.py
+
+Ce module mesure les étapes de la chaîne de traitement et écrit un rapport JSON par exécution
+(dans `../Data/run_reports/`), pour savoir où partent le temps et la mémoire sur les vraies données.
+- `start_run(nom)` : ouvre le rapport d'un script ; il est écrit à la sortie du bloc `with`, même en cas d'erreur.
+- `span(nom, **attributs)` : mesure une étape (bloc `with`) : durée sur horloge monotone, nombre d'enregistrements
+  traités (`stage.records`), pic de mémoire Python (tracemalloc, option --trace-memory). Les étapes imbriquées
+  sont repérées par leur chemin (ex. "extract_patterns/mining").
+- `@instrumented(nom, records=...)` : même mesure pour un appel de fonction.
+- Option --profile : profil cProfile de toute l'exécution (fichier .prof à côté du rapport et fonctions
+  les plus coûteuses dans le rapport).
+- Processus de travail : `start_run(nom, report_dir=None)` mesure sans écrire de fichier ; le rapport
+  (`report.to_dict()`) est renvoyé au processus principal, qui l'ajoute au sien avec `add_child`.
+
+Sans rapport ouvert (module importé par un autre script, processus de travail), les étapes sont seulement
+chronométrées et rien n'est enregistré : le surcoût est négligeable.
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import functools
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+from processing.atomic_file import atomic_write
+
+REPORT_DIR = "../Data/run_reports"
+PROFILE_TOP = 30  # nombre de fonctions du profil gardées dans le rapport
+
+_current_report = None
+
+class Span:
+    """
+    Mesure d'une étape, utilisable comme bloc `with`.
+
+    Attributs principaux :
+        name (str): Nom de l'étape.
+        path (str): Chemin de l'étape dans l'arbre des étapes ("parent/enfant").
+        attributes (dict): Paramètres de l'étape (support, ordre, moteur...).
+        records (int | None): Nombre d'enregistrements traités, renseigné par l'appelant.
+        duration_ms (float): Durée de l'étape.
+        peak_kib (float | None): Pic de mémoire Python pendant l'étape (avec --trace-memory).
+    """
+
+    def __init__(self, name, report=None, **attributes):
+        self.name = name
+        self.path = name
+        self.attributes = attributes
+        self.records = None
+        self.offset_ms = 0.0
+        self.duration_ms = 0.0
+        self.peak_kib = None
+        self.error = None
+        self.report = report
+        self._start = None
+
+    def __enter__(self):
+        if self.report is not None:
+            self.report._enter(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        if self.report is not None:
+            self.report._exit(self)
+        return False
+
+    def to_dict(self):
+        """Retourne la mesure au format du rapport JSON."""
+        entry = {
+            "name": self.name,
+            "path": self.path,
+            "offset_ms": round(self.offset_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.records is not None:
+            entry["records"] = self.records
+        if self.peak_kib is not None:
+            entry["peak_kib"] = round(self.peak_kib, 1)
+        if self.attributes:
+            entry["attributes"] = self.attributes
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+class RunReport:
+    """Rapport d'une exécution : étapes mesurées dans l'ordre de leur début, métadonnées et profil."""
+
+    def __init__(self, name, memory=False, profile=False):
+        """
+        Args:
+            name (str): Nom de l'exécution (nom du script).
+            memory (bool): Mesurer le pic de mémoire de chaque étape (tracemalloc, ralentit l'exécution).
+            profile (bool): Profiler toute l'exécution avec cProfile.
+        """
+        self.name = name
+        self.memory = memory
+        self.profile = profile
+        self.started_at = datetime.now()
+        self.metadata = {}
+        self.spans = []
+        self.status = "ok"
+        self.duration_ms = 0.0
+        self.peak_kib = None
+        self.profile_stats = None
+        self.children = []
+        self._stack = []
+        self._start = time.perf_counter()
+        self._run_peak = 0
+
+    def span(self, name, **attributes):
+        """Crée une étape rattachée à ce rapport."""
+        return Span(name, self, **attributes)
+
+    def _enter(self, span):
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            span.path = f"{parent.path}/{span.name}"
+        span.offset_ms = (time.perf_counter() - self._start) * 1000
+        self.spans.append(span)
+        self._stack.append(span)
+
+        if self.memory:
+            # Le pic est remis à zéro pour l'étape : on reporte d'abord le pic courant sur les étapes ouvertes
+            self._carry_peak(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            span.peak_kib = 0.0
+
+    def _exit(self, span):
+        if self._stack and self._stack[-1] is span:
+            self._stack.pop()
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            span.peak_kib = max(span.peak_kib or 0.0, peak / 1024)
+            self._carry_peak(peak)
+
+    def _carry_peak(self, peak):
+        """Reporte un pic mesuré sur toutes les étapes ouvertes et sur l'exécution."""
+        self._run_peak = max(self._run_peak, peak)
+        for open_span in self._stack:
+            open_span.peak_kib = max(open_span.peak_kib or 0.0, peak / 1024)
+
+    def add_child(self, child_report):
+        """Ajoute le rapport (dictionnaire) d'un processus de travail à ce rapport."""
+        self.children.append(child_report)
+
+    def finish(self, profiler=None):
+        """Termine l'exécution : durée totale, pic de mémoire et résumé du profil."""
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if self.memory:
+            self._carry_peak(tracemalloc.get_traced_memory()[1])
+            self.peak_kib = self._run_peak / 1024
+        if profiler is not None:
+            stats = pstats.Stats(profiler).stats
+            top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+            self.profile_stats = [
+                {
+                    "function": f"{os.path.basename(file_name)}:{line}({function})",
+                    "calls": calls,
+                    "own_ms": round(own_time * 1000, 3),
+                    "cumulative_ms": round(cumulative_time * 1000, 3),
+                }
+                for (file_name, line, function), (_, calls, own_time, cumulative_time, _) in top
+            ]
+
+    def to_dict(self):
+        """Retourne le rapport complet au format JSON."""
+        report = {
+            "run": self.name,
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%S"),
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "python": sys.version.split()[0],
+            "metadata": self.metadata,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+        if self.peak_kib is not None:
+            report["peak_kib"] = round(self.peak_kib, 1)
+        if self.profile_stats is not None:
+            report["profile"] = self.profile_stats
+        if self.children:
+            report["children"] = self.children
+        return report
+
+    def file_stem(self):
+        """Nom de base des fichiers du rapport (script, date, processus)."""
+        return f"{self.name}_{self.started_at.strftime('%Y-%m-%d_%H-%M-%S')}_{os.getpid()}"
+
+    def write(self, report_dir=REPORT_DIR):
+        """
+        Écrit le rapport JSON de façon atomique (fichier temporaire puis renommage).
+
+        Returns:
+            str: Chemin du rapport.
+        """
+        path = os.path.join(report_dir, self.file_stem() + ".json")
+        with atomic_write(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+def current_report():
+    """Retourne le rapport de l'exécution en cours, ou None."""
+    return _current_report
+
+def span(name, **attributes):
+    """
+    Mesure une étape de l'exécution en cours (bloc `with`). Sans rapport ouvert, l'étape est
+    seulement chronométrée (`duration_ms`) et n'est enregistrée nulle part.
+    """
+    return Span(name, _current_report, **attributes)
+
+def instrumented(name=None, records=None):
+    """
+    Décorateur : mesure chaque appel de la fonction comme une étape.
+
+    Args:
+        name (str, optional): Nom de l'étape (par défaut : nom de la fonction).
+        records (callable, optional): Calcule le nombre d'enregistrements à partir du résultat (ex. `len`).
+    """
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            report = _current_report
+            if report is None:
+                return function(*args, **kwargs)
+            with report.span(span_name) as stage:
+                result = function(*args, **kwargs)
+                if records is not None:
+                    stage.records = records(result)
+                return result
+        return wrapper
+    return decorator
+
+def add_report_arguments(parser):
+    """Ajoute les options --trace-memory et --profile à un parser argparse (lues par start_run)."""
+    parser.add_argument("--trace-memory", action="store_true", help="mesurer le pic de mémoire de chaque étape (tracemalloc)")
+    parser.add_argument("--profile", action="store_true", help="profiler l'exécution (cProfile)")
+
+@contextmanager
+def start_run(name, memory=None, profile=None, report_dir=REPORT_DIR):
+    """
+    Ouvre le rapport d'une exécution et l'écrit en sortie du bloc `with`.
+
+    Args:
+        name (str): Nom de l'exécution (nom du script).
+        memory (bool, optional): Mesure du pic de mémoire (par défaut : option --trace-memory de la ligne de commande).
+        profile (bool, optional): Profil cProfile (par défaut : option --profile de la ligne de commande).
+        report_dir (str | None): Dossier des rapports (None : rien n'est écrit, voir add_child).
+
+    Yields:
+        RunReport: Rapport en cours (`report.metadata` peut être complété par le script).
+    """
+    global _current_report
+
+    memory = "--trace-memory" in sys.argv if memory is None else memory
+    profile = "--profile" in sys.argv if profile is None else profile
+    report = RunReport(name, memory=memory, profile=profile)
+    previous_report, _current_report = _current_report, report
+
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield report
+    except BaseException as error:
+        report.status = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        report.finish(profiler)
+        if started_tracing:
+            tracemalloc.stop()
+        _current_report = previous_report
+
+        if report_dir is not None:
+            path = report.write(report_dir)
+            if profiler is not None:
+                profiler.dump_stats(os.path.join(report_dir, report.file_stem() + ".prof"))
+            print(f"Rapport d'exécution : {path}")
@@ -0,0 +1,326 @@
+"""
+motif_index.py
+
+Ce script construit un index persistant des motifs extraits (sortie filtrée de PrefixSpan) pour répondre
+en quelques millisecondes à des recherches comme « motifs qui contiennent le port X » ou « motifs qui
+partent de X et arrivent à Y », sans relire `outputfiltre.txt` ni `sequences.txt`.
+- Les motifs sont stockés en colonnes NumPy (.npy) : tous les ports à la suite, bornes de chaque motif, supports.
+  L'identifiant d'un motif est son rang dans le fichier d'origine.
+- Index inversé : pour chaque port, la liste triée des motifs qui le contiennent (format CSR : ports,
+  bornes des listes, identifiants à la suite).
+- Index par premier port, dernier port et longueur : identifiants triés par clé, plage trouvée par
+  recherche dichotomique.
+- Une requête intersecte les listes des critères, de la plus courte à la plus longue ; les colonnes sont
+  ouvertes en memory-map, seules les parties lues sont chargées.
+
+Usage :
+    python3 processing/motif_index.py build [--input text_files/outputfiltre.txt]
+    python3 processing/motif_index.py query --contains FRLEH --first NLRTM --last GBFXT --limit 20
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.baseEntier import load_json
+from processing.filter_motifs import iter_patterns
+from processing.decode_patterns import decode_pattern, format_named_pattern
+from processing.instrumentation import start_run, span, add_report_arguments
+
+INDEX_DIR = "../Data/motif_index"
+PATTERNS_FILE = "text_files/outputfiltre.txt"
+PORT_MAPPING_FILE = "../Data/port_mapping.json"
+
+# Index triés par clé (fichiers <nom>_keys.npy et <nom>_order.npy)
+SORTED_INDEXES = ("first", "last", "length")
+
+def _sorted_index(keys):
+    """Trie les identifiants par clé (tri stable : identifiants croissants à clé égale)."""
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    return keys[order], order
+
+def build_motif_index(patterns, index_dir=INDEX_DIR, source=None):
+    """
+    Construit l'index des motifs et l'écrit dans `index_dir` (remplacé en une fois s'il existe déjà).
+
+    Args:
+        patterns (iterable[tuple]): Motifs (ports (IDs entiers), support), dans l'ordre des identifiants.
+        index_dir (str): Dossier de l'index.
+        source (str, optional): Fichier d'origine des motifs (enregistré pour signaler un index obsolète).
+
+    Returns:
+        int: Nombre de motifs indexés.
+    """
+    lengths, supports, flat_items = [], [], []
+    for ports, support in patterns:
+        lengths.append(len(ports))
+        supports.append(support)
+        flat_items.extend(ports)
+
+    lengths = np.array(lengths, dtype=np.int32)
+    columns = {
+        "items": np.array(flat_items, dtype=np.int32),
+        "offsets": np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+        "supports": np.array(supports, dtype=np.int64),
+    }
+    pattern_count = len(lengths)
+    items, offsets = columns["items"], columns["offsets"]
+
+    # Index inversé : couples (port, motif) uniques, triés par port puis par motif
+    stride = max(pattern_count, 1)
+    owners = np.repeat(np.arange(pattern_count, dtype=np.int64), lengths)
+    pairs = np.unique(items.astype(np.int64) * stride + owners)
+    port_ids, posting_starts = np.unique(pairs // stride, return_index=True)
+    columns["port_ids"] = port_ids.astype(np.int32)
+    columns["posting_offsets"] = np.append(posting_starts, len(pairs)).astype(np.int64)
+    columns["postings"] = (pairs % stride).astype(np.int32)
+
+    # Index par premier port, dernier port (-1 pour un motif vide) et longueur
+    non_empty = lengths > 0
+    first_ports = np.full(pattern_count, -1, dtype=np.int32)
+    last_ports = np.full(pattern_count, -1, dtype=np.int32)
+    first_ports[non_empty] = items[offsets[:-1][non_empty]]
+    last_ports[non_empty] = items[offsets[1:][non_empty] - 1]
+    keys = {"first": first_ports, "last": last_ports, "length": lengths}
+    for name in SORTED_INDEXES:
+        columns[f"{name}_keys"], columns[f"{name}_order"] = _sorted_index(keys[name])
+
+    # Écriture dans un dossier temporaire puis remplacement de l'ancien index
+    tmp_dir = index_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+
+    meta = {"patterns": pattern_count, "source": source}
+    if source is not None:
+        stat = os.stat(source)
+        meta.update({"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns})
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+    return pattern_count
+
+def build_motif_index_from_file(patterns_file=PATTERNS_FILE, index_dir=INDEX_DIR):
+    """Construit l'index à partir d'un fichier de motifs au format SPMF (ex. `outputfiltre.txt`), lu en flux."""
+    with open(patterns_file, 'r') as f:
+        return build_motif_index(iter_patterns(f), index_dir, source=patterns_file)
+
+def index_exists(index_dir=INDEX_DIR):
+    """Indique si l'index des motifs a déjà été construit."""
+    return os.path.isfile(os.path.join(index_dir, "meta.json"))
+
+class MotifIndex:
+    """Accès en lecture à l'index des motifs (colonnes ouvertes en memory-map)."""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        def column(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.items = column("items")
+        self.offsets = column("offsets")
+        self.supports = column("supports")
+        self.port_ids = column("port_ids")
+        self.posting_offsets = column("posting_offsets")
+        self.postings = column("postings")
+        self.sorted_indexes = {name: (column(f"{name}_keys"), column(f"{name}_order")) for name in SORTED_INDEXES}
+
+        with open(os.path.join(index_dir, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+
+    def __len__(self):
+        return len(self.supports)
+
+    def is_stale(self):
+        """Indique si le fichier d'origine a changé depuis la construction de l'index."""
+        source = self.meta.get("source")
+        if not source or not os.path.exists(source):
+            return False
+        stat = os.stat(source)
+        return (stat.st_size, stat.st_mtime_ns) != (self.meta.get("source_size"), self.meta.get("source_mtime_ns"))
+
+    def pattern(self, pattern_id):
+        """Retourne le motif (ports (tuple d'IDs), support) d'un identifiant."""
+        start, end = self.offsets[pattern_id], self.offsets[pattern_id + 1]
+        return tuple(self.items[start:end].tolist()), int(self.supports[pattern_id])
+
+    def patterns(self, pattern_ids):
+        """Retourne les motifs (ports, support) d'une liste d'identifiants, dans le même ordre."""
+        return [self.pattern(pattern_id) for pattern_id in np.asarray(pattern_ids).tolist()]
+
+    def with_port(self, port):
+        """Identifiants (croissants) des motifs qui contiennent `port`."""
+        position = np.searchsorted(self.port_ids, port)
+        if position == len(self.port_ids) or self.port_ids[position] != port:
+            return np.empty(0, dtype=np.int32)
+        return np.asarray(self.postings[self.posting_offsets[position]:self.posting_offsets[position + 1]])
+
+    def _key_range(self, name, low, high):
+        """Identifiants (croissants) des motifs dont la clé `name` est comprise entre `low` et `high`."""
+        keys, order = self.sorted_indexes[name]
+        start = np.searchsorted(keys, low, side="left")
+        end = np.searchsorted(keys, high, side="right")
+        ids = np.asarray(order[start:end])
+        # Une seule valeur de clé : déjà triés par identifiant (tri stable)
+        return ids if low == high else np.sort(ids)
+
+    def starting_with(self, port):
+        """Identifiants (croissants) des motifs dont le premier port est `port`."""
+        return self._key_range("first", port, port)
+
+    def ending_with(self, port):
+        """Identifiants (croissants) des motifs dont le dernier port est `port`."""
+        return self._key_range("last", port, port)
+
+    def with_length(self, min_length=None, max_length=None):
+        """Identifiants (croissants) des motifs dont la longueur est dans [min_length, max_length]."""
+        keys, _ = self.sorted_indexes["length"]
+        low = 0 if min_length is None else min_length
+        high = (int(keys[-1]) if len(keys) else 0) if max_length is None else max_length
+        return self._key_range("length", low, high)
+
+    def _in_order(self, pattern_ids, ports):
+        """
+        Garde les motifs qui contiennent `ports` dans cet ordre (sous-séquence), en une passe vectorisée par port :
+        pour chaque motif, on avance jusqu'à la première occurrence du port suivant après la position courante.
+        """
+        starts = np.asarray(self.offsets[pattern_ids])
+        lengths = np.asarray(self.offsets[pattern_ids + 1]) - starts
+        owners = np.repeat(np.arange(len(pattern_ids)), lengths)
+        ranks = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        items = np.asarray(self.items[np.repeat(starts, lengths) + ranks])
+
+        positions = np.full(len(pattern_ids), -1, dtype=np.int64)
+        alive = np.ones(len(pattern_ids), dtype=bool)
+        for port in ports:
+            matches = np.flatnonzero((items == port) & (ranks > positions[owners]))
+            # Occurrences triées par motif puis par rang : la première de chaque motif est la plus proche
+            found, first_match = np.unique(owners[matches], return_index=True)
+            alive[np.setdiff1d(np.flatnonzero(alive), found, assume_unique=True)] = False
+            positions[found] = ranks[matches[first_match]]
+        return pattern_ids[alive]
+
+    def query(self, contains=(), ordered=False, first=None, last=None, min_length=None, max_length=None, min_support=None):
+        """
+        Recherche les motifs qui vérifient tous les critères donnés.
+
+        Args:
+            contains (iterable[int]): Ports que le motif doit tous contenir.
+            ordered (bool): Les ports de `contains` doivent apparaître dans cet ordre (sous-séquence).
+            first (int, optional): Premier port du motif.
+            last (int, optional): Dernier port du motif.
+            min_length (int, optional): Longueur minimale du motif.
+            max_length (int, optional): Longueur maximale du motif.
+            min_support (int, optional): Support minimal (nombre de séquences).
+
+        Returns:
+            np.ndarray: Identifiants des motifs trouvés, croissants.
+        """
+        contains = list(contains)
+        candidate_lists = [self.with_port(port) for port in set(contains)]
+        if first is not None:
+            candidate_lists.append(self.starting_with(first))
+        if last is not None:
+            candidate_lists.append(self.ending_with(last))
+        if min_length is not None or max_length is not None:
+            candidate_lists.append(self.with_length(min_length, max_length))
+
+        if not candidate_lists:
+            ids = np.arange(len(self), dtype=np.int32)
+        else:
+            # Intersection de la liste la plus courte vers la plus longue
+            candidate_lists.sort(key=len)
+            ids = candidate_lists[0]
+            for candidates in candidate_lists[1:]:
+                if len(ids) == 0:
+                    break
+                ids = np.intersect1d(ids, candidates, assume_unique=True)
+
+        if min_support is not None and len(ids):
+            ids = ids[np.asarray(self.supports[ids]) >= min_support]
+        if ordered and len(contains) > 1 and len(ids):
+            ids = self._in_order(ids, contains)
+        return ids
+
+    def top(self, pattern_ids, limit=None):
+        """Trie des identifiants par support décroissant (rang croissant à égalité) et garde les `limit` premiers."""
+        pattern_ids = np.asarray(pattern_ids)
+        order = np.argsort(-np.asarray(self.supports[pattern_ids]), kind="stable")
+        return pattern_ids[order[:limit]]
+
+def resolve_port(value, port_to_id):
+    """Convertit un port donné en ligne de commande (nom ou ID entier) en ID, ou None s'il est inconnu."""
+    if value is None:
+        return None
+    if value in port_to_id:
+        return port_to_id[value]
+    return int(value) if value.lstrip("-").isdigit() else None
+
+# === Point d'entrée principal ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index des motifs extraits : construction et recherche.")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="dossier de l'index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="construire l'index à partir d'un fichier de motifs (format SPMF)")
+    build_parser.add_argument("--input", default=PATTERNS_FILE, help="fichier de motifs (ex. outputfiltre.txt, outputreduit.txt)")
+
+    query_parser = subparsers.add_parser("query", help="rechercher des motifs (ports par nom ou par ID)")
+    query_parser.add_argument("--contains", nargs="+", default=[], help="ports que le motif doit contenir")
+    query_parser.add_argument("--ordered", action="store_true", help="les ports de --contains doivent apparaître dans cet ordre")
+    query_parser.add_argument("--first", default=None, help="premier port du motif")
+    query_parser.add_argument("--last", default=None, help="dernier port du motif")
+    query_parser.add_argument("--min-length", type=int, default=None, help="longueur minimale")
+    query_parser.add_argument("--max-length", type=int, default=None, help="longueur maximale")
+    query_parser.add_argument("--min-support", type=int, default=None, help="support minimal (nombre de séquences)")
+    query_parser.add_argument("--limit", type=int, default=20, help="nombre de motifs affichés (par support décroissant, 0 : tous)")
+    query_parser.add_argument("--mapping", default=PORT_MAPPING_FILE, help="mapping des ports (nom -> ID)")
+
+    for subparser in (build_parser, query_parser):
+        add_report_arguments(subparser)
+    args = parser.parse_args()
+
+    with start_run(f"motif_index_{args.command}"):
+        if args.command == "build":
+            with span("build", source=args.input) as build:
+                build.records = build_motif_index_from_file(args.input, args.index_dir)
+            print(f"✅ Index de {build.records} motifs créé dans '{args.index_dir}' ({build.duration_ms:.2f} ms)")
+        else:
+            if not index_exists(args.index_dir):
+                sys.exit(f"Aucun index dans '{args.index_dir}' : lancez d'abord `python3 processing/motif_index.py build`.")
+
+            port_to_id = load_json(args.mapping) if os.path.exists(args.mapping) else {}
+            port_id_to_name = {port_id: port_name for port_name, port_id in port_to_id.items()}
+
+            # Ports de la requête (noms ou IDs) convertis en IDs
+            requested = [value for value in args.contains + [args.first, args.last] if value is not None]
+            unknown = [value for value in requested if resolve_port(value, port_to_id) is None]
+            if unknown:
+                sys.exit(f"Port(s) inconnu(s) : {', '.join(unknown)}")
+
+            index = MotifIndex(args.index_dir)
+            if index.is_stale():
+                print(f"⚠️ '{index.meta['source']}' a changé depuis la construction de l'index : relancez `build`.")
+
+            with span("query") as query:
+                ids = index.query(
+                    contains=[resolve_port(port, port_to_id) for port in args.contains],
+                    ordered=args.ordered,
+                    first=resolve_port(args.first, port_to_id),
+                    last=resolve_port(args.last, port_to_id),
+                    min_length=args.min_length,
+                    max_length=args.max_length,
+                    min_support=args.min_support,
+                )
+                shown = index.top(ids, args.limit or None)
+                query.records = len(ids)
+
+            for ports, support in index.patterns(shown):
+                print(format_named_pattern(decode_pattern(ports, port_id_to_name), support))
+            print(f"\n{len(ids)} motif(s) trouvé(s) sur {len(index)} en {query.duration_ms:.2f} ms ({len(shown)} affiché(s))")
@@ -0,0 +1,137 @@
+"""
+pattern_cache.py
+
+Cache disque des motifs filtrés, adressé par contenu : la clé est l'empreinte SHA-256 du fichier de
+séquences d'entrée, de l'algorithme, du support minimum et des réglages de filtrage. Une même base minée
+au même support (ex. le premier fold d'une validation croisée à graine fixe) n'est donc extraite qu'une fois.
+
+- Chaque entrée est un fichier NumPy compressé (.npz) : tous les ports à la suite (int32),
+  les bornes de chaque motif (int64) et les supports (int64).
+- L'écriture est atomique (atomic_file.atomic_write) : plusieurs processus peuvent partager le cache.
+- La clé inclut aussi le moteur d'extraction et, s'il les applique, les contraintes appliquées pendant
+  l'extraction. Le nombre de processus n'en fait pas partie : il ne change pas les motifs extraits.
+- La taille totale est plafonnée ; au-delà, les entrées les moins récemment utilisées (date de modification,
+  rafraîchie à chaque lecture) sont supprimées.
+"""
+
+import os
+import hashlib
+import numpy as np
+from processing.atomic_file import atomic_write
+
+CACHE_DIR = "../Data/pattern_cache"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(file_path):
+    """Retourne l'empreinte SHA-256 (hexadécimale) du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(input_file, algorithm, min_support, filter_settings, engine="spmf", constrained=False):
+    """
+    Construit la clé d'une extraction.
+
+    Args:
+        input_file (str): Fichier de séquences au format SPMF (seul son contenu compte, pas son chemin).
+        algorithm (str): Nom de l'algorithme (ex. "PrefixSpan").
+        min_support (float): Support minimum relatif.
+        filter_settings (str): Description des filtres appliqués aux motifs.
+        engine (str): Moteur d'extraction ("spmf" ou "python").
+        constrained (bool): Filtres appliqués pendant l'extraction (False pour un moteur qui ne les applique pas).
+
+    Returns:
+        str: Clé hexadécimale.
+    """
+    parameters = (
+        f"{file_digest(input_file)}|{algorithm}|{float(min_support)!r}|{filter_settings}"
+        f"|engine={engine}|constrained={bool(constrained)}"
+    )
+    return hashlib.sha256(parameters.encode("utf-8")).hexdigest()
+
+
+class PatternCache:
+    """Cache disque de motifs (ports, support) avec taille plafonnée et éviction LRU."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Retourne les motifs d'une clé, ou None s'ils ne sont pas en cache.
+
+        Returns:
+            list[tuple] | None: Liste de (ports (tuple d'IDs), support).
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                items, offsets, supports = data["items"], data["offsets"], data["supports"]
+                items, offsets, supports = items.tolist(), offsets.tolist(), supports.tolist()
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+
+        # Marquer l'entrée comme récemment utilisée
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return [
+            (tuple(items[start:end]), support)
+            for start, end, support in zip(offsets[:-1], offsets[1:], supports)
+        ]
+
+    def put(self, key, patterns):
+        """
+        Enregistre des motifs (ports, support) sous une clé, puis applique le plafond de taille.
+
+        Args:
+            key (str): Clé de l'extraction (voir `cache_key`).
+            patterns (list[tuple]): Liste de (ports, support).
+        """
+        lengths = np.array([len(ports) for ports, _ in patterns], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        items = np.fromiter(
+            (port for ports, _ in patterns for port in ports), dtype=np.int32, count=int(offsets[-1])
+        )
+        supports = np.array([support for _, support in patterns], dtype=np.int64)
+
+        with atomic_write(self._path(key)) as f:
+            np.savez_compressed(f, items=items, offsets=offsets, supports=supports)
+
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées tant que le cache dépasse sa taille maximale."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Déjà supprimée par un autre processus
+            total -= size
+
+    def clear(self):
+        """Vide le cache."""
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npz"):
+                    os.remove(entry.path)
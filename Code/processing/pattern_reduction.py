@@ -0,0 +1,138 @@
+"""
+pattern_reduction.py
+
+Ce module réduit un ensemble de motifs séquentiels à ses motifs fermés ou maximaux, sans comparer
+les motifs deux à deux :
+  - fermé : aucun sur-motif (motif qui le contient comme sous-séquence) n'a le même support,
+  - maximal : aucun sur-motif dans l'ensemble.
+
+La réduction se fait en deux passes :
+  1. Passe par suppression d'un item (table de hachage) : chaque motif Q marque ses sous-motifs obtenus en
+     retirant un seul item (s'ils sont dans l'ensemble, et de même support pour les motifs fermés).
+     Si l'ensemble contient tous les sous-motifs de ses motifs (sortie complète de PrefixSpan), cette passe
+     suffit : un motif qui a un sur-motif en a un d'exactement un item de plus. Coût : O(nombre de motifs × longueur).
+  2. Les motifs restants sont vérifiés avec un index inversé (item -> motifs qui le contiennent, groupés par
+     support pour les motifs fermés et triés par longueur) : les candidats sont l'intersection des listes des
+     items du motif, restreinte aux motifs plus longs, puis l'inclusion est vérifiée sur ces seuls candidats.
+     Cette passe rend la réduction exacte pour n'importe quel ensemble (ex. motifs déjà filtrés par filter_motifs).
+     L'index ne contient que les motifs restants : un motif dominé l'est toujours par un motif fermé
+     (resp. maximal), et ceux-ci ne sont jamais éliminés par la passe 1.
+
+L'ordre des motifs conservés est celui de l'entrée.
+"""
+
+import numpy as np
+
+MODES = ("closed", "maximal")
+
+def is_subsequence(pattern, sequence):
+    """Indique si `pattern` est une sous-séquence (pas forcément contiguë) de `sequence`."""
+    remaining = iter(sequence)
+    return all(item in remaining for item in pattern)
+
+class ContainmentIndex:
+    """
+    Index inversé des motifs pour retrouver les sur-motifs d'un motif.
+
+    Les motifs sont renumérotés par (groupe, longueur) : dans la liste d'un item, les motifs d'un groupe
+    plus longs qu'une longueur donnée forment une plage contiguë, trouvée par recherche dichotomique.
+    """
+
+    def __init__(self, patterns, same_support=False):
+        """
+        Args:
+            patterns (list[tuple]): Motifs indexés (ports, support).
+            same_support (bool): Grouper par support (recherche des sur-motifs de même support, motifs fermés).
+        """
+        self.patterns = patterns
+        self.same_support = same_support
+        groups = [support if same_support else 0 for _, support in patterns]
+        lengths = [len(ports) for ports, _ in patterns]
+
+        # Rang de chaque motif dans l'ordre (groupe, longueur)
+        order = np.lexsort((np.array(lengths, dtype=np.int64), np.array(groups, dtype=np.int64)))
+        self.by_rank = order
+        self.group_keys = np.array(groups, dtype=np.int64)[order]
+        self.length_keys = np.array(lengths, dtype=np.int64)[order]
+
+        postings = {}
+        for rank, pattern_id in enumerate(order.tolist()):
+            for item in set(patterns[pattern_id][0]):
+                postings.setdefault(item, []).append(rank)
+        self.postings = {item: np.array(ranks, dtype=np.int64) for item, ranks in postings.items()}
+
+    def _rank_range(self, group, length):
+        """Plage [début, fin) des rangs du groupe dont la longueur est strictement supérieure à `length`."""
+        group_start = np.searchsorted(self.group_keys, group, side="left")
+        group_end = np.searchsorted(self.group_keys, group, side="right")
+        start = group_start + np.searchsorted(self.length_keys[group_start:group_end], length, side="right")
+        return start, group_end
+
+    def has_super_pattern(self, ports, support):
+        """Indique si un motif de l'index contient strictement `ports` (avec le même support si same_support)."""
+        start, end = self._rank_range(support if self.same_support else 0, len(ports))
+        if start >= end:
+            return False
+        if not ports:
+            # Le motif vide est contenu dans tout motif plus long de la plage
+            return True
+
+        # Intersection des listes des items du motif, de la plus courte à la plus longue
+        lists = []
+        for item in set(ports):
+            posting = self.postings.get(item)
+            if posting is None:
+                return False
+            lists.append(posting[np.searchsorted(posting, start):np.searchsorted(posting, end)])
+        lists.sort(key=len)
+
+        candidates = lists[0]
+        for posting in lists[1:]:
+            if len(candidates) == 0:
+                return False
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+        return any(is_subsequence(ports, self.patterns[candidate][0]) for candidate in self.by_rank[candidates].tolist())
+
+def reduce_patterns(patterns, mode="closed"):
+    """
+    Réduit un ensemble de motifs à ses motifs fermés ou maximaux.
+
+    Args:
+        patterns (list[tuple]): Motifs (ports, support), ports sous forme de tuple ou de liste.
+        mode (str): "closed" (motifs fermés) ou "maximal" (motifs maximaux).
+
+    Returns:
+        list[tuple]: Motifs conservés (ports, support), dans l'ordre de l'entrée.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode de réduction inconnu : {mode} (attendu : {', '.join(MODES)})")
+
+    patterns = [(tuple(ports), support) for ports, support in patterns]
+    same_support = mode == "closed"
+    pattern_ids = {ports: pattern_id for pattern_id, (ports, _) in enumerate(patterns)}
+    dominated = np.zeros(len(patterns), dtype=bool)
+
+    # Passe 1 : chaque motif marque ses sous-motifs à un item de moins
+    for ports, support in patterns:
+        for position in range(len(ports)):
+            sub_id = pattern_ids.get(ports[:position] + ports[position + 1:])
+            if sub_id is not None and (not same_support or patterns[sub_id][1] == support):
+                dominated[sub_id] = True
+
+    # Passe 2 : vérification exacte des motifs restants, avec un index inversé limité à ces motifs
+    remaining = np.flatnonzero(~dominated).tolist()
+    index = ContainmentIndex([patterns[pattern_id] for pattern_id in remaining], same_support=same_support)
+    for pattern_id in remaining:
+        if index.has_super_pattern(*patterns[pattern_id]):
+            dominated[pattern_id] = True
+
+    return [pattern for pattern, is_dominated in zip(patterns, dominated.tolist()) if not is_dominated]
+
+def closed_patterns(patterns):
+    """Retourne les motifs fermés (aucun sur-motif de même support)."""
+    return reduce_patterns(patterns, "closed")
+
+def maximal_patterns(patterns):
+    """Retourne les motifs maximaux (aucun sur-motif dans l'ensemble)."""
+    return reduce_patterns(patterns, "maximal")
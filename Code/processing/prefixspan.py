@@ -0,0 +1,275 @@
+"""
+prefixspan.py
+
+Ce module implémente l'algorithme PrefixSpan directement en Python (avec NumPy),
+comme alternative au jar SPMF lancé par `run_spmf`.
+
+- Les séquences sont encodées dans deux tableaux plats : un tableau d'items (IDs de ports)
+  et un tableau d'offsets indiquant le début de chaque séquence.
+- Les bases projetées ne sont jamais recopiées : une projection est représentée par
+  des couples (séquence, position de début du suffixe) (pseudo-projection).
+- Les motifs sont retournés directement sous forme d'objets Python `(items, support)`,
+  et peuvent être écrits au format de sortie SPMF (`... -1 #SUP: n`).
+- Les critères de qualité de filter_motifs peuvent être appliqués pendant l'extraction (`constrained=True`) :
+  une extension qui répète le dernier item n'est jamais comptée ni développée (toute sa descendance
+  serait rejetée), et les motifs avec trop peu d'items distincts sont développés sans être retournés.
+  Le résultat est exactement celui de l'extraction complète suivie du filtrage, dans le même ordre.
+- Extraction parallèle (`workers`) : les items fréquents de longueur 1 sont calculés une seule fois, puis
+  la base projetée de chaque premier item (indépendante des autres) est explorée dans un processus de travail.
+  Les résultats sont fusionnés dans l'ordre des premiers items : la sortie est identique à l'extraction séquentielle.
+
+Seules les bases où chaque itemset contient un unique item (cas des séquences de ports)
+sont prises en charge.
+"""
+
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from processing.instrumentation import instrumented, span
+from processing.filter_motifs import MIN_DISTINCT_PORTS
+
+_worker_database = None  # (items, offsets) de la base, copiés une fois par processus de travail
+
+
+def read_spmf_database(file_path):
+    """
+    Lit un fichier au format SPMF et encode les séquences dans des tableaux plats.
+
+    Args:
+        file_path (str): Chemin du fichier SPMF (séparateurs -1 et -2).
+
+    Returns:
+        tuple: (items, offsets) où `items` contient tous les items à la suite et
+        `offsets[i]:offsets[i + 1]` délimite la séquence i.
+    """
+    items = []
+    offsets = [0]
+
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            # Mêmes lignes ignorées que SPMF (vides, commentaires, métadonnées)
+            if not line or line[0] in "#%@":
+                continue
+
+            itemset_size = 0
+            for token in line.split():
+                if token == "-1":
+                    itemset_size = 0
+                elif token == "-2":
+                    break
+                else:
+                    itemset_size += 1
+                    if itemset_size > 1:
+                        raise ValueError("Le moteur PrefixSpan interne ne gère qu'un item par itemset.")
+                    items.append(int(token))
+            offsets.append(len(items))
+
+    return np.asarray(items, dtype=np.int32), np.asarray(offsets, dtype=np.int64)
+
+
+def absolute_support(min_support, sequence_count):
+    """Convertit un support relatif (entre 0 et 1) en nombre de séquences, comme SPMF."""
+    return max(1, math.ceil(min_support * sequence_count))
+
+
+def _frequent_extensions(items, seq_ends, sequence_count, seq_ids, starts, min_count, excluded_item=None):
+    """
+    Calcule les items fréquents d'une base projetée et leurs nouvelles projections.
+
+    Tous les suffixes de la projection sont parcourus d'un seul coup : chaque occurrence
+    est codée par (item, séquence), et `np.unique` donne à la fois le support de chaque
+    item et la première position où il apparaît dans chaque séquence.
+    Les occurrences de `excluded_item` sont écartées avant le comptage.
+
+    Yields:
+        tuple: (item, ids des séquences, débuts des nouveaux suffixes)
+    """
+    lengths = seq_ends[seq_ids] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return
+
+    segment_starts = np.cumsum(lengths) - lengths
+    positions = np.arange(total) - np.repeat(segment_starts - starts, lengths)
+    owners = np.repeat(seq_ids, lengths)
+    occurrence_items = items[positions]
+
+    if excluded_item is not None:
+        kept = occurrence_items != excluded_item
+        positions, owners, occurrence_items = positions[kept], owners[kept], occurrence_items[kept]
+        if len(positions) == 0:
+            return
+
+    keys = occurrence_items.astype(np.int64) * sequence_count + owners
+    unique_keys, first_index = np.unique(keys, return_index=True)
+    unique_items = unique_keys // sequence_count
+
+    boundaries = np.flatnonzero(np.diff(unique_items)) + 1
+    group_starts = np.concatenate(([0], boundaries))
+    group_ends = np.concatenate((boundaries, [len(unique_keys)]))
+
+    for group in np.flatnonzero(group_ends - group_starts >= min_count):
+        start, end = group_starts[group], group_ends[group]
+        yield (
+            int(unique_items[start]),
+            unique_keys[start:end] % sequence_count,
+            positions[first_index[start:end]] + 1,
+        )
+
+
+def prefixspan(items, offsets, min_count, max_pattern_length=None, no_consecutive_repeat=False, min_distinct=1):
+    """
+    Extrait les motifs séquentiels fréquents par PrefixSpan (pseudo-projection).
+
+    Args:
+        items (np.ndarray): Items de toutes les séquences à la suite.
+        offsets (np.ndarray): Début de chaque séquence dans `items` (+ la fin de la dernière).
+        min_count (int): Support minimal absolu (nombre de séquences).
+        max_pattern_length (int, optional): Longueur maximale des motifs.
+        no_consecutive_repeat (bool): Ne jamais étendre un motif par son dernier item (branche élaguée).
+        min_distinct (int): Nombre minimal d'items distincts d'un motif retourné.
+
+    Returns:
+        list[tuple]: Liste de (items du motif, support), en parcours en profondeur.
+    """
+    return _grow(items, offsets, [_root_state(offsets)], min_count, max_pattern_length, no_consecutive_repeat, min_distinct)
+
+
+def _root_state(offsets):
+    """État initial de l'exploration : motif vide, toutes les séquences depuis leur début."""
+    return ((), 0, np.arange(len(offsets) - 1, dtype=np.int64), offsets[:-1].copy())
+
+
+def _grow(items, offsets, stack, min_count, max_pattern_length, no_consecutive_repeat, min_distinct):
+    """
+    Explore en profondeur les motifs à partir des états de la pile (voir `prefixspan` pour les paramètres).
+
+    Args:
+        stack (list[tuple]): États (motif, support, séquences, débuts de suffixes) à développer.
+
+    Returns:
+        list[tuple]: Liste de (items du motif, support), en parcours en profondeur.
+    """
+    sequence_count = len(offsets) - 1
+    seq_ends = offsets[1:]
+    patterns = []
+
+    # Pile explicite (pas de récursion) : (motif, support, séquences, débuts de suffixes)
+    while stack:
+        prefix, support, seq_ids, starts = stack.pop()
+        if prefix:
+            distinct = len(set(prefix))
+            if distinct >= min_distinct:
+                patterns.append((prefix, support))
+            if max_pattern_length is not None:
+                # Aucun descendant ne peut atteindre min_distinct : inutile de développer
+                remaining = max_pattern_length - len(prefix)
+                if remaining <= 0 or distinct + remaining < min_distinct:
+                    continue
+
+        excluded_item = prefix[-1] if no_consecutive_repeat and prefix else None
+        children = [
+            (prefix + (item,), len(child_ids), child_ids, child_starts)
+            for item, child_ids, child_starts in _frequent_extensions(
+                items, seq_ends, sequence_count, seq_ids, starts, min_count, excluded_item
+            )
+        ]
+        stack.extend(reversed(children))
+
+    return patterns
+
+
+def _init_worker(items, offsets):
+    """Initialise un processus de travail avec la base de séquences (transmise une seule fois)."""
+    global _worker_database
+    _worker_database = (items, offsets)
+
+
+def _mine_partition(state, min_count, max_pattern_length, no_consecutive_repeat, min_distinct):
+    """Explore, dans un processus de travail, la partition d'un premier item (état de longueur 1)."""
+    items, offsets = _worker_database
+    return _grow(items, offsets, [state], min_count, max_pattern_length, no_consecutive_repeat, min_distinct)
+
+
+def parallel_prefixspan(items, offsets, min_count, max_pattern_length=None, no_consecutive_repeat=False, min_distinct=1, workers=None):
+    """
+    PrefixSpan réparti sur plusieurs processus, une partition par premier item fréquent.
+
+    Les paramètres et le résultat (motifs et ordre) sont ceux de `prefixspan`.
+
+    Args:
+        workers (int, optional): Nombre de processus (par défaut : nombre de cœurs).
+
+    Returns:
+        list[tuple]: Liste de (items du motif, support), en parcours en profondeur.
+    """
+    workers = workers or os.cpu_count() or 1
+    sequence_count = len(offsets) - 1
+    _, _, seq_ids, starts = _root_state(offsets)
+
+    # Items fréquents de longueur 1, calculés une seule fois : chacun définit une partition indépendante
+    partitions = [
+        ((item,), len(child_ids), child_ids, child_starts)
+        for item, child_ids, child_starts in _frequent_extensions(items, offsets[1:], sequence_count, seq_ids, starts, min_count)
+    ]
+
+    with span("partitions", first_items=len(partitions), workers=workers) as stage:
+        if workers == 1 or len(partitions) <= 1:
+            results = [_grow(items, offsets, [state], min_count, max_pattern_length, no_consecutive_repeat, min_distinct) for state in partitions]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(items, offsets)) as executor:
+                # Les partitions les plus supportées (les plus longues à explorer) partent en premier
+                by_support = sorted(range(len(partitions)), key=lambda index: partitions[index][1], reverse=True)
+                futures = {
+                    index: executor.submit(_mine_partition, partitions[index], min_count, max_pattern_length, no_consecutive_repeat, min_distinct)
+                    for index in by_support
+                }
+                results = [futures[index].result() for index in range(len(partitions))]
+        patterns = [pattern for partition in results for pattern in partition]
+        stage.records = len(patterns)
+
+    return patterns
+
+
+@instrumented(records=len)
+def mine_prefixspan(input_file, min_support, max_pattern_length=None, constrained=False, workers=1):
+    """
+    Exécute PrefixSpan sur un fichier SPMF sans passer par la JVM.
+
+    Args:
+        input_file (str): Fichier d'entrée au format SPMF.
+        min_support (float): Support minimal relatif (entre 0 et 1).
+        max_pattern_length (int, optional): Longueur maximale des motifs.
+        constrained (bool): Appliquer pendant l'extraction les critères de `filter_motifs.is_relevant_pattern`
+            (même résultat que l'extraction complète suivie du filtrage, en explorant beaucoup moins de branches).
+        workers (int | None): Nombre de processus (1 : extraction séquentielle, None : un par cœur).
+
+    Returns:
+        list[tuple]: Liste de (items du motif, support).
+    """
+    items, offsets = read_spmf_database(input_file)
+    min_count = absolute_support(min_support, len(offsets) - 1)
+    constraints = {"no_consecutive_repeat": True, "min_distinct": MIN_DISTINCT_PORTS} if constrained else {}
+    if workers == 1:
+        return prefixspan(items, offsets, min_count, max_pattern_length, **constraints)
+    return parallel_prefixspan(items, offsets, min_count, max_pattern_length, workers=workers, **constraints)
+
+
+def format_pattern(items, support):
+    """Formate un motif comme une ligne de sortie SPMF (ex. `416 -1 304 -1 #SUP: 3`)."""
+    return "".join(f"{item} -1 " for item in items) + f"#SUP: {support}"
+
+
+def write_patterns(patterns, output_file):
+    """
+    Écrit des motifs au format de sortie SPMF.
+
+    Args:
+        patterns (list[tuple]): Liste de (items du motif, support).
+        output_file (str): Chemin du fichier de sortie.
+    """
+    with open(output_file, 'w') as f:
+        for items, support in patterns:
+            f.write(format_pattern(items, support) + "\n")
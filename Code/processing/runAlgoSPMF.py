@@ -1,7 +1,124 @@
 import os
+import subprocess
+from processing.prefixspan import mine_prefixspan, write_patterns
+from processing.instrumentation import instrumented
+
+# Moteurs disponibles pour PrefixSpan : le jar SPMF ou le moteur Python interne
+ENGINES = ("spmf", "python")
+
+SPMF_JAR = "../Data/spmf.jar"
+BATCH_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SPMFBatch.java")
+BATCH_DONE_MARKER = "@@SPMF_BATCH_DONE"
+
+class SPMFBatchRunner:
+    """
+    Garde une JVM SPMF ouverte pour enchaîner plusieurs exécutions (voir SPMFBatch.java).
+
+    Le démarrage de la JVM (et la compilation du petit programme SPMFBatch.java, lancé
+    directement comme fichier source par Java >= 11) n'est payé qu'une seule fois.
+    S'utilise comme gestionnaire de contexte :
+
+        with SPMFBatchRunner() as runner:
+            run_spmf("PrefixSpan", entree, sortie, "5.0%", runner=runner)
+    """
+
+    def __init__(self, jar_path=SPMF_JAR):
+        self.jar_path = jar_path
+        self.process = None
+
+    def start(self):
+        """Lance la JVM SPMF si elle n'est pas déjà démarrée."""
+        if self.process is None:
+            self.process = subprocess.Popen(
+                ["java", "-cp", self.jar_path, BATCH_SOURCE],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        return self
+
+    def run(self, algorithm, input_file, output_file, parameters):
+        """
+        Soumet une tâche à la JVM et attend sa fin.
+
+        Args:
+            algorithm (str): Nom de l'algorithme SPMF (ex. "PrefixSpan").
+            input_file (str): Fichier d'entrée.
+            output_file (str): Fichier de sortie.
+            parameters (str): Paramètres de l'algorithme, séparés par des espaces (ex. "5.0%").
+        """
+        self.start()
+        job = [algorithm, input_file, output_file] + parameters.split()
+        self.process.stdin.write("\t".join(job) + "\n")
+        self.process.stdin.flush()
+
+        # Relayer la sortie de SPMF jusqu'au marqueur de fin de tâche
+        for line in self.process.stdout:
+            if line.startswith(BATCH_DONE_MARKER):
+                status = int(line.split()[1])
+                break
+            print(line, end="")
+        else:
+            raise RuntimeError("La JVM SPMF s'est arrêtée de manière inattendue.")
+
+        if status != 0:
+            raise RuntimeError(f"Échec de {algorithm} sur {input_file} (voir la sortie de SPMF).")
+
+    def close(self):
+        """Ferme l'entrée de la JVM et attend son arrêt."""
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 # Fonction pour exécuter SPMF et retourner le fichier de sortie
-def run_spmf(algorithm, input_file, output_file, parameters):
-    command = f"java -jar ../Data/spmf.jar run {algorithm} {input_file} {output_file} {parameters}"
+@instrumented()
+def run_spmf(algorithm, input_file, output_file, parameters, runner=None):
+    if runner is not None:
+        runner.run(algorithm, input_file, output_file, parameters)
+        return
+    command = f"java -jar {SPMF_JAR} run {algorithm} {input_file} {output_file} {parameters}"
     os.system(command)
-    
+
+def run_spmf_batch(jobs, jar_path=SPMF_JAR):
+    """
+    Exécute une liste de tâches SPMF dans une seule JVM.
+
+    Args:
+        jobs (list[tuple]): Liste de (algorithme, fichier d'entrée, fichier de sortie, paramètres).
+        jar_path (str): Chemin du jar SPMF.
+    """
+    with SPMFBatchRunner(jar_path) as runner:
+        for algorithm, input_file, output_file, parameters in jobs:
+            runner.run(algorithm, input_file, output_file, parameters)
+
+@instrumented()
+def run_prefixspan_algo(input_file, output_file, min_support, engine="spmf", runner=None, constrained=False, workers=1):
+    """
+    Exécute PrefixSpan avec le moteur choisi et écrit les motifs au format SPMF.
+
+    Args:
+        input_file (str): Fichier d'entrée au format SPMF.
+        output_file (str): Fichier de sortie des motifs (`... -1 #SUP: n`).
+        min_support (float): Support minimal relatif (entre 0 et 1).
+        engine (str): "spmf" (jar Java) ou "python" (moteur interne, sans JVM).
+        runner (SPMFBatchRunner, optional): JVM partagée pour le moteur "spmf".
+        constrained (bool): Avec le moteur "python", n'écrire que les motifs qui passent les filtres
+            de filter_motifs (branches rejetées jamais développées). Sans effet avec SPMF :
+            le filtrage reste fait après coup (process_results), avec le même résultat final.
+        workers (int | None): Avec le moteur "python", nombre de processus d'extraction (1 : séquentiel,
+            None : un par cœur ; voir prefixspan.parallel_prefixspan). Sans effet avec SPMF.
+    """
+    if engine == "spmf":
+        run_spmf("PrefixSpan", input_file, output_file, f"{min_support * 100}%", runner=runner)
+    elif engine == "python":
+        write_patterns(mine_prefixspan(input_file, min_support, constrained=constrained, workers=workers), output_file)
+    else:
+        raise ValueError(f"Moteur inconnu : {engine} (attendu : {', '.join(ENGINES)})")
@@ -0,0 +1,75 @@
+"""
+test_backoff_predictor.py
+
+Compare les prédictions de BackoffPredictor (plus long contexte connu, sinon ordre 0) avec une
+implémentation de référence à base de dictionnaires, et vérifie son évaluation en bloc.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prediction.backoff_predictor import BackoffPredictor
+
+
+def reference_backoff(sequences, max_order, context):
+    """Plus long suffixe connu de `context` et son port suivant le plus fréquent (égalités : première observation)."""
+    def best(order, suffix=None):
+        # Comptes de chaque port suivant après `suffix` (ordre 0 : tous contextes confondus)
+        counts, first_seen = {}, {}
+        rank = 0
+        for sequence in sequences:
+            for position in range(1, len(sequence)):
+                if suffix is None or (position >= order and tuple(sequence[position - order:position]) == suffix):
+                    counts[sequence[position]] = counts.get(sequence[position], 0) + 1
+                    first_seen.setdefault(sequence[position], rank)
+                rank += 1
+        if not counts:
+            return None
+        return max(counts, key=lambda port: (counts[port], -first_seen[port]))
+
+    for order in range(min(len(context), max_order), 0, -1):
+        port = best(order, tuple(context[-order:]))
+        if port is not None:
+            return port, order
+    return best(0), 0
+
+
+def random_sequences(seed, count=30, ports="ABCDEF", max_length=10):
+    """Séquences aléatoires de noms de ports."""
+    rng = random.Random(seed)
+    return [[rng.choice(ports) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+
+
+def test_predict_matches_reference():
+    for seed in range(5):
+        sequences = random_sequences(seed, ports="ABCD")
+        predictor = BackoffPredictor.from_sequences(sequences, 3)
+        for context in random_sequences(seed + 100, count=40, ports="ABCDZ", max_length=5):
+            assert predictor.predict(context) == reference_backoff(sequences, 3, context)
+
+
+def test_evaluate_counts_every_position():
+    train, test = random_sequences(1), random_sequences(2, ports="ABCDEFZ")
+    predictor = BackoffPredictor.from_sequences(train, 2)
+    score, total, precision, order_counts = predictor.evaluate(test)
+
+    expected_score = 0
+    expected_orders = [0] * 3
+    for sequence in test:
+        for position in range(1, len(sequence)):
+            port, order = predictor.predict(sequence[:position])
+            expected_score += port == sequence[position]
+            expected_orders[order] += 1
+    assert total == sum(max(len(sequence) - 1, 0) for sequence in test)
+    assert order_counts.tolist() == expected_orders
+    assert score == expected_score and precision == score / total
+
+
+def test_empty_training_set():
+    predictor = BackoffPredictor.from_sequences([], 2)
+    assert predictor.predict(["A", "B"]) == (None, 0)
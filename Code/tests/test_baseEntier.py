@@ -0,0 +1,98 @@
+"""
+test_baseEntier.py
+
+Compare la base de séquences compressée de `transform_to_integer_database` avec la sortie de
+l'ancienne implémentation (listes d'itemsets triées par date, une ligne SPMF par navire).
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+from collections import defaultdict
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.baseEntier import transform_to_integer_database
+
+
+def reference_spmf_lines(data, port_to_id):
+    """Ancienne implémentation (avant la base compressée), réduite aux lignes SPMF produites."""
+    navire_sequences = defaultdict(list)
+    seen_trips = set()
+    last_item = None
+
+    for voyage in data:
+        navire_id = voyage.get("imo") or voyage.get("mmsi")
+        if not navire_id:
+            continue
+
+        departure_port = voyage.get("departure_port")
+        arrival_port = voyage.get("arrival_port")
+        arrival_date = voyage.get("arrival_date")
+
+        if not (departure_port and arrival_port and arrival_date):
+            continue
+
+        current_trip = (departure_port, arrival_port, arrival_date)
+        if current_trip in seen_trips:
+            continue
+
+        if departure_port and last_item != departure_port:
+            navire_sequences[navire_id].append((arrival_date, port_to_id[departure_port]))
+            last_item = departure_port
+
+        if arrival_port and last_item != arrival_port:
+            navire_sequences[navire_id].append((arrival_date, port_to_id[arrival_port]))
+            last_item = arrival_port
+
+        seen_trips.add(current_trip)
+
+    lines = []
+    for escales in navire_sequences.values():
+        escales.sort(key=lambda escale: escale[0])
+        lines.append(" -1 ".join(str(port) for _, port in escales) + " -2")
+    return lines
+
+
+def random_voyages(seed, count=400, vessels=15, ports="ABCDEFG"):
+    """Voyages aléatoires avec doublons, champs manquants, navires identifiés par MMSI et ports répétés."""
+    rng = random.Random(seed)
+    voyages = []
+    for _ in range(count):
+        vessel = rng.randint(1, vessels)
+        voyage = {
+            "imo": vessel if rng.random() > 0.2 else None,
+            "mmsi": 1000 + vessel if rng.random() > 0.3 else None,
+            "departure_port": rng.choice(ports) if rng.random() > 0.05 else None,
+            "arrival_port": rng.choice(ports) if rng.random() > 0.05 else None,
+            "arrival_date": f"2023-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00" if rng.random() > 0.05 else None,
+        }
+        voyages.append(voyage)
+        if rng.random() < 0.1:
+            voyages.append(dict(voyage))
+    return voyages
+
+
+PORT_TO_ID = {port: index + 1 for index, port in enumerate("ABCDEFG")}
+
+
+def test_vessel_without_kept_escale_has_no_sequence():
+    data = [
+        {"imo": 1, "departure_port": "A", "arrival_port": "B", "arrival_date": "2023-01-01T00:00:00"},
+        {"imo": 2, "departure_port": "B", "arrival_port": "B", "arrival_date": "2023-01-02T00:00:00"},
+    ]
+    database = transform_to_integer_database(data, PORT_TO_ID)
+    assert database.to_spmf_lines() == reference_spmf_lines(data, PORT_TO_ID) == ["1 -1 2 -2"]
+
+
+def test_matches_reference_on_random_voyages():
+    for seed in range(30):
+        data = random_voyages(seed)
+        assert transform_to_integer_database(data, PORT_TO_ID).to_spmf_lines() == reference_spmf_lines(data, PORT_TO_ID)
+
+
+def test_accepts_a_generator():
+    data = random_voyages(0)
+    assert transform_to_integer_database(iter(data), PORT_TO_ID).to_spmf_lines() == reference_spmf_lines(data, PORT_TO_ID)
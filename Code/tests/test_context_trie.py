@@ -0,0 +1,67 @@
+"""
+test_context_trie.py
+
+Vérifie que les modèles de chaque ordre lus sur un ContextTrie sont ceux de TransitionModel
+construits directement sur les mêmes données.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from prediction.transition_model import TransitionModel
+from prediction.context_trie import ContextTrie
+
+
+def model_counts(model):
+    """Comptes d'un TransitionModel, indexés par (contexte en noms de ports, port suivant)."""
+    matrix = model.counts.tocoo()
+    return {
+        (tuple(model.ports[code] for code in model.context_rows[row]), model.ports[column]): count
+        for row, column, count in zip(matrix.row.tolist(), matrix.col.tolist(), matrix.data.tolist())
+    }
+
+
+def random_sequences(seed, count=30, ports="ABCDEF", max_length=10):
+    """Séquences aléatoires de noms de ports."""
+    rng = random.Random(seed)
+    return [[rng.choice(ports) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+
+
+def test_leaves_count_every_transition():
+    for seed in range(10):
+        sequences = random_sequences(seed)
+        trie = ContextTrie.from_sequences(sequences, 3)
+        assert sum(trie.leaf_counts) == sum(max(len(sequence) - 1, 0) for sequence in sequences)
+
+
+def test_models_match_transition_models():
+    for seed in range(10):
+        sequences = random_sequences(seed)
+        trie = ContextTrie.from_sequences(sequences, 3)
+        for order in (1, 2, 3):
+            from_trie, direct = trie.model(order), TransitionModel.from_sequences(sequences, order)
+            assert model_counts(from_trie) == model_counts(direct)
+            assert [from_trie.predict(context) for context in direct.context_index] == \
+                   [direct.predict(context) for context in direct.context_index]
+
+
+def test_models_match_transition_models_from_patterns():
+    rng = random.Random(0)
+    patterns = [{"sequence": sequence, "support": rng.randint(1, 9)} for sequence in random_sequences(0)]
+    trie = ContextTrie.from_patterns(patterns, 2)
+    for order in (1, 2):
+        assert model_counts(trie.model(order)) == model_counts(TransitionModel.from_patterns(patterns, order))
+
+
+def test_order_out_of_range():
+    trie = ContextTrie.from_sequences(random_sequences(0), 2)
+    with pytest.raises(ValueError):
+        trie.model(3)
+    with pytest.raises(ValueError):
+        ContextTrie.from_sequences([], 0)
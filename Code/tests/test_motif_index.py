@@ -0,0 +1,92 @@
+"""
+test_motif_index.py
+
+Compare les recherches de MotifIndex (motif_index.py) avec un parcours de tous les motifs,
+sur un index construit dans un dossier temporaire.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from processing.motif_index import MotifIndex, build_motif_index, build_motif_index_from_file
+from processing.pattern_reduction import is_subsequence
+from processing.prefixspan import write_patterns
+
+
+def brute_force_query(patterns, contains=(), ordered=False, first=None, last=None, min_length=None, max_length=None, min_support=None):
+    """Identifiants des motifs qui vérifient tous les critères, en parcourant tous les motifs."""
+    return [
+        pattern_id
+        for pattern_id, (ports, support) in enumerate(patterns)
+        if (is_subsequence(tuple(contains), ports) if ordered else set(contains) <= set(ports))
+        and (first is None or (ports and ports[0] == first))
+        and (last is None or (ports and ports[-1] == last))
+        and (min_length is None or len(ports) >= min_length)
+        and (max_length is None or len(ports) <= max_length)
+        and (min_support is None or support >= min_support)
+    ]
+
+
+def random_patterns(seed, count=300, ports=8):
+    """Motifs aléatoires (ports répétés possibles, motif vide compris) avec leur support."""
+    rng = random.Random(seed)
+    patterns = [((), 5)]
+    for _ in range(count):
+        patterns.append((tuple(rng.randint(1, ports) for _ in range(rng.randint(1, 6))), rng.randint(1, 20)))
+    return patterns
+
+
+@pytest.fixture(scope="module")
+def indexed_patterns(tmp_path_factory):
+    patterns = random_patterns(0)
+    index_dir = str(tmp_path_factory.mktemp("motifs") / "motif_index")
+    assert build_motif_index(patterns, index_dir) == len(patterns)
+    return patterns, MotifIndex(index_dir)
+
+
+def test_patterns_are_stored_in_input_order(indexed_patterns):
+    patterns, index = indexed_patterns
+    assert len(index) == len(patterns)
+    assert index.patterns(range(len(patterns))) == patterns
+
+
+def test_query_matches_brute_force(indexed_patterns):
+    patterns, index = indexed_patterns
+    rng = random.Random(1)
+    for _ in range(300):
+        criteria = {
+            "contains": [rng.randint(1, 9) for _ in range(rng.choice([0, 0, 1, 2, 3]))],
+            "ordered": rng.random() < 0.5,
+            "first": rng.choice([None, None, rng.randint(1, 9)]),
+            "last": rng.choice([None, None, rng.randint(1, 9)]),
+            "min_length": rng.choice([None, rng.randint(0, 4)]),
+            "max_length": rng.choice([None, rng.randint(1, 6)]),
+            "min_support": rng.choice([None, rng.randint(1, 20)]),
+        }
+        assert index.query(**criteria).tolist() == brute_force_query(patterns, **criteria), criteria
+
+
+def test_top_sorts_by_support(indexed_patterns):
+    patterns, index = indexed_patterns
+    ids = index.query(contains=[1])
+    expected = sorted(ids.tolist(), key=lambda pattern_id: (-patterns[pattern_id][1], pattern_id))
+    assert index.top(ids).tolist() == expected
+    assert index.top(ids, 5).tolist() == expected[:5]
+
+
+def test_index_from_file_detects_stale_source(tmp_path):
+    patterns_file = tmp_path / "outputfiltre.txt"
+    write_patterns(random_patterns(2, count=20)[1:], patterns_file)
+    index_dir = str(tmp_path / "motif_index")
+    build_motif_index_from_file(str(patterns_file), index_dir)
+    assert not MotifIndex(index_dir).is_stale()
+
+    with open(patterns_file, "a") as f:
+        f.write("1 -1 2 -1 #SUP: 3\n")
+    assert MotifIndex(index_dir).is_stale()
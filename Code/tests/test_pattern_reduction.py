@@ -0,0 +1,82 @@
+"""
+test_pattern_reduction.py
+
+Compare la réduction aux motifs fermés et maximaux (pattern_reduction.py) avec une comparaison
+des motifs deux à deux, sur la sortie complète de PrefixSpan et sur une sortie déjà filtrée.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from processing.filter_motifs import is_relevant_pattern
+from processing.pattern_reduction import is_subsequence, reduce_patterns
+from processing.prefixspan import prefixspan
+
+
+def brute_force_reduction(patterns, mode):
+    """Garde les motifs sans sur-motif (de même support pour les motifs fermés), dans l'ordre de l'entrée."""
+    return [
+        (ports, support)
+        for ports, support in patterns
+        if not any(
+            len(other) > len(ports) and is_subsequence(ports, other) and (mode == "maximal" or other_support == support)
+            for other, other_support in patterns
+        )
+    ]
+
+
+def mined_patterns(seed, count=30, items=5, max_length=7):
+    """Sortie complète de PrefixSpan sur des séquences aléatoires."""
+    rng = random.Random(seed)
+    sequences = [[rng.randint(1, items) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+    flat = np.array([item for sequence in sequences for item in sequence], dtype=np.int32)
+    offsets = np.concatenate(([0], np.cumsum([len(sequence) for sequence in sequences]))).astype(np.int64)
+    return prefixspan(flat, offsets, 2)
+
+
+def test_is_subsequence():
+    assert is_subsequence((1, 3), (1, 2, 3))
+    assert is_subsequence((), (1,))
+    assert not is_subsequence((3, 1), (1, 2, 3))
+    assert not is_subsequence((1, 1), (1, 2))
+
+
+@pytest.mark.parametrize("mode", ["closed", "maximal"])
+def test_matches_brute_force_on_full_output(mode):
+    for seed in range(10):
+        patterns = mined_patterns(seed)
+        assert reduce_patterns(patterns, mode) == brute_force_reduction(patterns, mode)
+
+
+@pytest.mark.parametrize("mode", ["closed", "maximal"])
+def test_matches_brute_force_on_filtered_output(mode):
+    # Motifs filtrés : des sous-motifs manquent, la passe d'index inversé doit rester exacte
+    for seed in range(10):
+        patterns = [pattern for pattern in mined_patterns(seed) if is_relevant_pattern(pattern[0])]
+        assert reduce_patterns(patterns, mode) == brute_force_reduction(patterns, mode)
+
+
+@pytest.mark.parametrize("mode", ["closed", "maximal"])
+def test_empty_pattern(mode):
+    # Sans motif d'un seul item, le motif vide n'est éliminé que par la passe d'index inversé
+    patterns = [((), 3), ((1, 2), 3), ((2, 1), 2)]
+    assert reduce_patterns(patterns, mode) == brute_force_reduction(patterns, mode)
+    assert reduce_patterns([((), 3)], mode) == [((), 3)]
+
+
+def test_maximal_is_subset_of_closed():
+    patterns = mined_patterns(0)
+    closed = set(reduce_patterns(patterns, "closed"))
+    assert set(reduce_patterns(patterns, "maximal")) <= closed <= set(patterns)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        reduce_patterns([], "frequent")
@@ -0,0 +1,108 @@
+"""
+test_prefixspan.py
+
+Compare le moteur PrefixSpan interne (prefixspan.py) avec une énumération exhaustive des sous-séquences,
+y compris l'extraction contrainte par les critères de filter_motifs et l'extraction parallèle.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+from itertools import combinations
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.filter_motifs import is_relevant_pattern, iter_patterns
+from processing.prefixspan import (
+    absolute_support, mine_prefixspan, parallel_prefixspan, prefixspan, read_spmf_database, write_patterns
+)
+
+
+def brute_force_patterns(sequences, min_count, max_pattern_length=None):
+    """Supports de toutes les sous-séquences (pas forcément contiguës) présentes dans au moins `min_count` séquences."""
+    supports = {}
+    for sequence in sequences:
+        longest = len(sequence) if max_pattern_length is None else min(len(sequence), max_pattern_length)
+        found = {
+            tuple(sequence[position] for position in positions)
+            for length in range(1, longest + 1)
+            for positions in combinations(range(len(sequence)), length)
+        }
+        for pattern in found:
+            supports[pattern] = supports.get(pattern, 0) + 1
+    return {pattern: support for pattern, support in supports.items() if support >= min_count}
+
+
+def random_sequences(seed, count=25, items=6, max_length=7):
+    """Séquences aléatoires de ports (IDs entiers), avec répétitions et séquences vides."""
+    rng = random.Random(seed)
+    return [[rng.randint(1, items) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+
+
+def flat_database(sequences):
+    """Encode des séquences dans les tableaux plats (items, offsets) du moteur."""
+    items = np.array([item for sequence in sequences for item in sequence], dtype=np.int32)
+    offsets = np.concatenate(([0], np.cumsum([len(sequence) for sequence in sequences]))).astype(np.int64)
+    return items, offsets
+
+
+def write_spmf_database(sequences, path):
+    """Écrit des séquences au format d'entrée SPMF (une ligne par séquence)."""
+    with open(path, "w") as f:
+        for sequence in sequences:
+            f.write("".join(f"{item} -1 " for item in sequence) + "-2\n")
+
+
+def test_matches_brute_force():
+    for seed in range(20):
+        sequences = random_sequences(seed)
+        items, offsets = flat_database(sequences)
+        for min_count in (1, 3, 6):
+            patterns = prefixspan(items, offsets, min_count)
+            assert len(patterns) == len({pattern for pattern, _ in patterns})
+            assert dict(patterns) == brute_force_patterns(sequences, min_count)
+
+
+def test_max_pattern_length():
+    sequences = random_sequences(1)
+    items, offsets = flat_database(sequences)
+    for max_length in (1, 2, 3):
+        assert dict(prefixspan(items, offsets, 2, max_length)) == brute_force_patterns(sequences, 2, max_length)
+
+
+def test_constrained_equals_filtered_full_mining():
+    for seed in range(20):
+        sequences = random_sequences(seed, items=4)
+        items, offsets = flat_database(sequences)
+        full = prefixspan(items, offsets, 2)
+        constrained = prefixspan(items, offsets, 2, no_consecutive_repeat=True, min_distinct=2)
+        assert constrained == [pattern for pattern in full if is_relevant_pattern(pattern[0])]
+
+
+def test_parallel_equals_sequential():
+    sequences = random_sequences(3, count=60)
+    items, offsets = flat_database(sequences)
+    for constraints in ({}, {"no_consecutive_repeat": True, "min_distinct": 2}):
+        sequential = prefixspan(items, offsets, 3, **constraints)
+        assert parallel_prefixspan(items, offsets, 3, workers=1, **constraints) == sequential
+        assert parallel_prefixspan(items, offsets, 3, workers=2, **constraints) == sequential
+
+
+def test_spmf_files_round_trip(tmp_path):
+    sequences = random_sequences(4)
+    input_file = tmp_path / "spmf_input.txt"
+    output_file = tmp_path / "output.txt"
+    write_spmf_database(sequences, input_file)
+
+    items, offsets = read_spmf_database(input_file)
+    assert [items[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])] == sequences
+
+    patterns = mine_prefixspan(input_file, 0.1)
+    assert dict(patterns) == brute_force_patterns(sequences, absolute_support(0.1, len(sequences)))
+
+    write_patterns(patterns, output_file)
+    with open(output_file) as f:
+        assert list(iter_patterns(f)) == [(tuple(pattern), support) for pattern, support in patterns]
@@ -0,0 +1,85 @@
+"""
+test_transition_model.py
+
+Compare les comptes et les prédictions de TransitionModel avec une implémentation de référence
+à base de dictionnaires.
+
+Lancement (depuis le dossier Code) :
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from prediction.transition_model import TransitionModel
+
+
+def reference_counts(sequences, order, weights=None):
+    """Comptes (pondérés) et rang de première observation de chaque transition contexte -> port suivant."""
+    counts, first_seen = {}, {}
+    rank = 0
+    for index, sequence in enumerate(sequences):
+        weight = 1 if weights is None else weights[index]
+        for position in range(order, len(sequence)):
+            key = (tuple(sequence[position - order:position]), sequence[position])
+            counts[key] = counts.get(key, 0) + weight
+            first_seen.setdefault(key, rank)
+            rank += 1
+    return counts, first_seen
+
+
+def model_counts(model):
+    """Comptes d'un TransitionModel, indexés par (contexte en noms de ports, port suivant)."""
+    matrix = model.counts.tocoo()
+    return {
+        (tuple(model.ports[code] for code in model.context_rows[row]), model.ports[column]): count
+        for row, column, count in zip(matrix.row.tolist(), matrix.col.tolist(), matrix.data.tolist())
+    }
+
+
+def random_sequences(seed, count=30, ports="ABCDEF", max_length=10):
+    """Séquences aléatoires de noms de ports."""
+    rng = random.Random(seed)
+    return [[rng.choice(ports) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+
+
+def test_counts_from_sequences():
+    for seed in range(10):
+        sequences = random_sequences(seed)
+        for order in (1, 2, 3):
+            assert model_counts(TransitionModel.from_sequences(sequences, order)) == reference_counts(sequences, order)[0]
+
+
+def test_counts_from_patterns():
+    rng = random.Random(0)
+    sequences = random_sequences(0)
+    supports = [rng.randint(1, 9) for _ in sequences]
+    patterns = [{"sequence": sequence, "support": support} for sequence, support in zip(sequences, supports)]
+    for order in (1, 2):
+        assert model_counts(TransitionModel.from_patterns(patterns, order)) == reference_counts(sequences, order, supports)[0]
+
+
+def test_predict_most_frequent_then_first_seen():
+    for seed in range(10):
+        sequences = random_sequences(seed, ports="ABC")
+        model = TransitionModel.from_sequences(sequences, 2)
+        counts, first_seen = reference_counts(sequences, 2)
+        for context in {key[0] for key in counts}:
+            candidates = [key for key in counts if key[0] == context]
+            expected = max(candidates, key=lambda key: (counts[key], -first_seen[key]))[1]
+            assert model.predict(context) == expected
+        assert model.predict(("Z", "A")) is None
+
+
+def test_lookup_survives_hash_collisions(monkeypatch):
+    # Hachage volontairement faible : tous les contextes de même somme de codes entrent en collision
+    monkeypatch.setattr(TransitionModel, "_hash_contexts", staticmethod(lambda contexts: np.asarray(contexts, dtype=np.int64).sum(axis=1).astype(np.uint64)))
+    sequences = random_sequences(0, ports="ABCDEF")
+    model = TransitionModel.from_sequences(sequences, 2)
+    contexts = [[a, b] for a in range(len(model.ports)) for b in range(len(model.ports))] + [[0, -1]]
+    expected = [model.context_id(tuple(model.ports[code] for code in context)) if -1 not in context else None for context in contexts]
+    found = model.lookup_contexts(np.array(contexts)).tolist()
+    assert found == [-1 if context_id is None else context_id for context_id in expected]